@@ -0,0 +1,422 @@
+document.querySelectorAll('.nav-link').forEach(link => {
+link.addEventListener('click', function(e) {
+e.preventDefault();
+document.querySelectorAll('.nav-link').forEach(l => l.classList.remove('active'));
+this.classList.add('active');
+const targetId = this.getAttribute('href');
+const targetSection = document.querySelector(targetId);
+if (targetSection) {
+targetSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
+}
+});
+});
+const observerOptions = {
+threshold: 0.1,
+rootMargin: '0px 0px -50px 0px'
+};
+const observer = new IntersectionObserver((entries) => {
+entries.forEach(entry => {
+if (entry.isIntersecting) {
+entry.target.style.opacity = '1';
+entry.target.style.transform = 'translateY(0)';
+}
+});
+}, observerOptions);
+document.querySelectorAll('.overview-card, .viz-card, .insight-card, .recommendation-card').forEach(card => {
+card.style.opacity = '0';
+card.style.transform = 'translateY(20px)';
+card.style.transition = 'opacity 0.6s, transform 0.6s';
+observer.observe(card);
+});
+const DEFAULT_DASHBOARD_DATA = {
+uhi_distribution: {
+labels: ['0-1°C', '1-2°C', '2-3°C', '3-4°C', '>4°C'],
+counts: [5, 10, 23, 12, 0]
+},
+regional: {
+labels: ['North (>28°N)', 'North-Central (23-28°N)', 'Central (15-23°N)', 'South (<15°N)'],
+avg_uhi: [2.87, 2.29, 2.44, 1.49]
+},
+land_cover: {
+labels: ['Industrial', 'Urban', 'Mixed Urban', 'Green Space'],
+avg_uhi: [3.31, 2.98, 2.12, 0.91],
+avg_ndvi: [0.09, 0.09, 0.10, 0.22]
+},
+top_factors: {
+labels: ['Impervious Surfaces', 'Building Density', 'NDVI (Vegetation)', 'Albedo', 'Urban Greenness', 'Wind Speed'],
+correlations: [0.742, 0.704, -0.704, -0.699, -0.657, -0.543]
+}
+};
+function applyFigureSources(figures) {
+document.querySelectorAll('img[data-figure]').forEach(img => {
+const src = figures[img.dataset.figure];
+if (src) {
+img.src = src;
+}
+});
+}
+async function loadDashboardData() {
+try {
+const manifestResponse = await fetch('static/data/manifest.json', { cache: 'no-cache' });
+if (!manifestResponse.ok) {
+throw new Error('manifest ' + manifestResponse.status);
+}
+const manifest = await manifestResponse.json();
+applyFigureSources(manifest.figures || {});
+const dataResponse = await fetch(manifest.data);
+if (!dataResponse.ok) {
+throw new Error('data bundle ' + dataResponse.status);
+}
+return await dataResponse.json();
+} catch (error) {
+console.warn('Using built-in chart data:', error.message);
+return DEFAULT_DASHBOARD_DATA;
+}
+}
+document.addEventListener('DOMContentLoaded', async function() {
+const data = await loadDashboardData();
+renderCharts(data);
+});
+function renderCharts(data) {
+const uhiDistCtx = document.getElementById('uhiDistribution');
+if (uhiDistCtx) {
+new Chart(uhiDistCtx, {
+type: 'bar',
+data: {
+labels: data.uhi_distribution.labels,
+datasets: [{
+label: 'Number of Cities',
+data: data.uhi_distribution.counts,
+backgroundColor: [
+'rgba(16, 185, 129, 0.8)',
+'rgba(59, 130, 246, 0.8)',
+'rgba(245, 158, 11, 0.8)',
+'rgba(239, 68, 68, 0.8)',
+'rgba(220, 38, 38, 0.8)'
+],
+borderColor: [
+'rgb(16, 185, 129)',
+'rgb(59, 130, 246)',
+'rgb(245, 158, 11)',
+'rgb(239, 68, 68)',
+'rgb(220, 38, 38)'
+],
+borderWidth: 2
+}]
+},
+options: {
+responsive: true,
+maintainAspectRatio: true,
+plugins: {
+title: {
+display: true,
+text: 'UHI Intensity Distribution Across Cities',
+font: { size: 16, weight: 'bold' }
+},
+legend: {
+display: false
+}
+},
+scales: {
+y: {
+beginAtZero: true,
+title: {
+display: true,
+text: 'Number of Cities'
+}
+},
+x: {
+title: {
+display: true,
+text: 'UHI Intensity Range'
+}
+}
+}
+}
+});
+}
+const regionalCtx = document.getElementById('regionalComparison');
+if (regionalCtx) {
+new Chart(regionalCtx, {
+type: 'doughnut',
+data: {
+labels: data.regional.labels,
+datasets: [{
+label: 'Average UHI Intensity',
+data: data.regional.avg_uhi,
+backgroundColor: [
+'rgba(239, 68, 68, 0.8)',
+'rgba(245, 158, 11, 0.8)',
+'rgba(59, 130, 246, 0.8)',
+'rgba(16, 185, 129, 0.8)'
+],
+borderColor: [
+'rgb(239, 68, 68)',
+'rgb(245, 158, 11)',
+'rgb(59, 130, 246)',
+'rgb(16, 185, 129)'
+],
+borderWidth: 2
+}]
+},
+options: {
+responsive: true,
+maintainAspectRatio: true,
+plugins: {
+title: {
+display: true,
+text: 'Regional UHI Intensity Comparison',
+font: { size: 16, weight: 'bold' }
+},
+legend: {
+position: 'bottom'
+},
+tooltip: {
+callbacks: {
+label: function(context) {
+return context.label + ': ' + context.parsed + '°C';
+}
+}
+}
+}
+}
+});
+}
+const landCoverCtx = document.getElementById('landCoverAnalysis');
+if (landCoverCtx) {
+new Chart(landCoverCtx, {
+type: 'bar',
+data: {
+labels: data.land_cover.labels,
+datasets: [{
+label: 'Avg UHI Intensity (°C)',
+data: data.land_cover.avg_uhi,
+backgroundColor: 'rgba(239, 68, 68, 0.8)',
+borderColor: 'rgb(239, 68, 68)',
+borderWidth: 2,
+yAxisID: 'y'
+}, {
+label: 'Avg NDVI',
+data: data.land_cover.avg_ndvi,
+backgroundColor: 'rgba(16, 185, 129, 0.8)',
+borderColor: 'rgb(16, 185, 129)',
+borderWidth: 2,
+yAxisID: 'y1'
+}]
+},
+options: {
+responsive: true,
+maintainAspectRatio: true,
+plugins: {
+title: {
+display: true,
+text: 'Land Cover Type vs UHI & Vegetation',
+font: { size: 16, weight: 'bold' }
+},
+legend: {
+position: 'bottom'
+}
+},
+scales: {
+y: {
+type: 'linear',
+display: true,
+position: 'left',
+title: {
+display: true,
+text: 'UHI Intensity (°C)'
+}
+},
+y1: {
+type: 'linear',
+display: true,
+position: 'right',
+title: {
+display: true,
+text: 'NDVI (0-1)'
+},
+grid: {
+drawOnChartArea: false
+}
+}
+}
+}
+});
+}
+const topFactorsCtx = document.getElementById('topFactors');
+if (topFactorsCtx) {
+new Chart(topFactorsCtx, {
+type: 'bar',
+data: {
+labels: data.top_factors.labels,
+datasets: [{
+label: 'Correlation Coefficient',
+data: data.top_factors.correlations,
+backgroundColor: function(context) {
+const value = context.parsed.x;
+return value > 0 ? 'rgba(239, 68, 68, 0.8)' : 'rgba(16, 185, 129, 0.8)';
+},
+borderColor: function(context) {
+const value = context.parsed.x;
+return value > 0 ? 'rgb(239, 68, 68)' : 'rgb(16, 185, 129)';
+},
+borderWidth: 2
+}]
+},
+options: {
+indexAxis: 'y',
+responsive: true,
+maintainAspectRatio: true,
+plugins: {
+title: {
+display: true,
+text: 'Top UHI Contributing Factors (Correlation)',
+font: { size: 16, weight: 'bold' }
+},
+legend: {
+display: false
+}
+},
+scales: {
+x: {
+title: {
+display: true,
+text: 'Correlation with UHI Intensity'
+},
+min: -1,
+max: 1
+}
+}
+}
+});
+}
+}
+function animateCounter(element, target, duration = 2000) {
+let start = 0;
+const increment = target / (duration / 16);
+const timer = setInterval(() => {
+start += increment;
+if (start >= target) {
+element.textContent = Math.round(target);
+clearInterval(timer);
+} else {
+element.textContent = Math.round(start);
+}
+}, 16);
+}
+const statsObserver = new IntersectionObserver((entries) => {
+entries.forEach(entry => {
+if (entry.isIntersecting) {
+const statNumbers = entry.target.querySelectorAll('.stat-number');
+statNumbers.forEach(stat => {
+const target = parseFloat(stat.textContent);
+if (!isNaN(target)) {
+animateCounter(stat, target);
+}
+});
+statsObserver.unobserve(entry.target);
+}
+});
+}, { threshold: 0.5 });
+const statBoxes = document.querySelectorAll('.stat-insight');
+statBoxes.forEach(box => statsObserver.observe(box));
+window.addEventListener('scroll', () => {
+const sections = document.querySelectorAll('.section');
+const scrollPos = window.scrollY + 100;
+sections.forEach(section => {
+const sectionTop = section.offsetTop;
+const sectionHeight = section.offsetHeight;
+const sectionId = section.getAttribute('id');
+if (scrollPos >= sectionTop && scrollPos < sectionTop + sectionHeight) {
+document.querySelectorAll('.nav-link').forEach(link => {
+link.classList.remove('active');
+if (link.getAttribute('href') === '#' + sectionId) {
+link.classList.add('active');
+}
+});
+}
+});
+});
+function printReport() {
+window.print();
+}
+function exportData(format) {
+console.log('Exporting data in ' + format + ' format');
+}
+const tooltipElements = document.querySelectorAll('[data-tooltip]');
+tooltipElements.forEach(element => {
+element.addEventListener('mouseenter', function() {
+const tooltip = document.createElement('div');
+tooltip.className = 'tooltip';
+tooltip.textContent = this.getAttribute('data-tooltip');
+document.body.appendChild(tooltip);
+const rect = this.getBoundingClientRect();
+tooltip.style.top = (rect.top - tooltip.offsetHeight - 10) + 'px';
+tooltip.style.left = (rect.left + rect.width / 2 - tooltip.offsetWidth / 2) + 'px';
+});
+element.addEventListener('mouseleave', function() {
+const tooltip = document.querySelector('.tooltip');
+if (tooltip) {
+tooltip.remove();
+}
+});
+});
+console.log('%c Urban Heat Island Dashboard ', 'background: #667eea; color: white; font-size: 20px; padding: 10px;');
+console.log('%c Data for 50 Major Indian Cities | 31 Features | Real-time Analysis ', 'color: #667eea; font-size: 14px;');
+console.log('%c Built with ❤️ for climate-resilient urban planning ', 'color: #10b981; font-size: 12px;');
+window.addEventListener('load', () => {
+document.body.classList.add('loaded');
+});
+const menuToggle = document.createElement('button');
+menuToggle.className = 'menu-toggle';
+menuToggle.innerHTML = '<i class="fas fa-bars"></i>';
+menuToggle.style.display = 'none';
+function checkViewport() {
+if (window.innerWidth <= 768) {
+menuToggle.style.display = 'block';
+} else {
+menuToggle.style.display = 'none';
+}
+}
+window.addEventListener('resize', checkViewport);
+checkViewport();
+const backToTopButton = document.createElement('button');
+backToTopButton.className = 'back-to-top';
+backToTopButton.innerHTML = '<i class="fas fa-arrow-up"></i>';
+backToTopButton.style.cssText = `
+position: fixed;
+bottom: 30px;
+right: 30px;
+width: 50px;
+height: 50px;
+border-radius: 50%;
+background: linear-gradient(135deg, #667eea, #764ba2);
+color: white;
+border: none;
+cursor: pointer;
+display: none;
+z-index: 1000;
+box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+transition: all 0.3s;
+`;
+document.body.appendChild(backToTopButton);
+window.addEventListener('scroll', () => {
+if (window.scrollY > 300) {
+backToTopButton.style.display = 'flex';
+backToTopButton.style.alignItems = 'center';
+backToTopButton.style.justifyContent = 'center';
+} else {
+backToTopButton.style.display = 'none';
+}
+});
+backToTopButton.addEventListener('click', () => {
+window.scrollTo({ top: 0, behavior: 'smooth' });
+});
+backToTopButton.addEventListener('mouseenter', function() {
+this.style.transform = 'translateY(-5px)';
+this.style.boxShadow = '0 6px 12px rgba(0, 0, 0, 0.15)';
+});
+backToTopButton.addEventListener('mouseleave', function() {
+this.style.transform = 'translateY(0)';
+this.style.boxShadow = '0 4px 6px rgba(0, 0, 0, 0.1)';
+});
@@ -5,52 +5,185 @@ Generates insights, correlations, and visualizations
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import warnings
 import os
 import glob
+import json
+import argparse
+import functools
+import hashlib
+import shutil
+import sys
 warnings.filterwarnings('ignore')
 
-# Set plotting style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import DASHBOARD_DIR, OUTPUT_DIR, PROCESSED_DIR, REPORTS_DIR, VISUALIZATIONS_DIR, DATASET_PATTERN, latest_dataset
+from instrumentation import METRICS, timed
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data_collection'))
+from incremental import AnalysisState
+
+# Latitude bands used by regional_analysis and the dashboard (north to south for display)
+REGION_BINS = [0, 15, 23, 28, 90]
+REGION_LABELS = ['South (<15°N)', 'Central (15-23°N)', 'North-Central (23-28°N)', 'North (>28°N)']
+
+# Permutations behind the spatial p-values when the spatial section runs by default
+SPATIAL_PERMUTATIONS = 99
+
+# UHI intensity histogram bins shown on the dashboard
+UHI_BINS = [0, 1, 2, 3, 4, np.inf]
+UHI_BIN_LABELS = ['0-1°C', '1-2°C', '2-3°C', '3-4°C', '>4°C']
+
+# Dashboard labels for the correlation factors
+DASHBOARD_FACTORS = {
+    'Impervious Surface (%)': 'Impervious Surfaces',
+    'Building Density (buildings/km²)': 'Building Density',
+    'NDVI': 'NDVI (Vegetation)',
+    'Albedo': 'Albedo',
+    'Urban Greenness Ratio (%)': 'Urban Greenness',
+    'Wind Speed (km/h)': 'Wind Speed',
+    'Population Density (people/km²)': 'Population Density',
+    'Anthropogenic Heat Flux (W/m²)': 'Anthropogenic Heat',
+    'Distance to Water (km)': 'Distance to Water',
+    'Solar Radiation (MJ/m²/day)': 'Solar Radiation',
+    'Humidity (%)': 'Humidity',
+    'Temperature (°C)': 'Temperature',
+}
+
+FIGURE_KINDS = ['uhi_factors_analysis', 'uhi_correlation_matrix', 'top_cities_uhi', 'ndvi_vs_uhi']
+
+# Factors correlated with UHI intensity in correlation_analysis
+UHI_FACTORS = [
+    'Temperature (°C)',
+    'Impervious Surface (%)',
+    'NDVI',
+    'Albedo',
+    'Urban Greenness Ratio (%)',
+    'Population Density (people/km²)',
+    'Building Density (buildings/km²)',
+    'Anthropogenic Heat Flux (W/m²)',
+    'Wind Speed (km/h)',
+    'Distance to Water (km)',
+    'Solar Radiation (MJ/m²/day)',
+    'Humidity (%)',
+]
+
+# Running statistics kept by the analysis state (see incremental.py)
+ANALYSIS_STATE_CONFIG = {
+    'columns': ['UHI Intensity (°C)'] + UHI_FACTORS + ['Population'],
+    'group_by': ['Region', 'Land Cover'],
+    'bins': {'Region': {'column': 'Latitude', 'bins': REGION_BINS, 'labels': REGION_LABELS}},
+    'group_columns': ['UHI Intensity (°C)', 'Temperature (°C)', 'NDVI', 'Impervious Surface (%)'],
+    'rankings': {
+        'uhi_high': {'column': 'UHI Intensity (°C)', 'largest': True, 'k': 10,
+                     'fields': ['City Name', 'State', 'UHI Intensity (°C)', 'Temperature (°C)',
+                                'Impervious Surface (%)', 'NDVI']},
+        'uhi_low': {'column': 'UHI Intensity (°C)', 'largest': False, 'k': 10,
+                    'fields': ['City Name', 'State', 'UHI Intensity (°C)', 'Temperature (°C)',
+                               'NDVI', 'Urban Greenness Ratio (%)']},
+        'ndvi_high': {'column': 'NDVI', 'largest': True, 'k': 10,
+                      'fields': ['City Name', 'State', 'NDVI', 'Urban Greenness Ratio (%)', 'UHI Intensity (°C)']},
+    },
+    'distinct': ['City Name', 'State'],
+}
+
+# Persistent state for --incremental runs over every collected dataset
+ANALYSIS_STATE_PATH = os.path.join(OUTPUT_DIR, '.analysis_state.json')
+
+@functools.lru_cache(maxsize=None)
+def plotting():
+    """
+    Import matplotlib and seaborn on first use and set the plotting style
+    Text-only runs never pay for these imports
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 8)
+    return plt, sns
+
+@timed('analyzer')
+def load_dataset(path):
+    """Load a UHI dataset, remembering its source path"""
+    print(f"Loading dataset: {path}")
+    df = pd.read_csv(path)
+    df.attrs['source'] = path
+    return df
+
+def analysis_state(data):
+    """
+    AnalysisState behind the text analyses: passed through as-is, or
+    summarized on the fly from a DataFrame
+    """
+    if isinstance(data, AnalysisState):
+        return data
+    return AnalysisState.from_frame(data, **ANALYSIS_STATE_CONFIG)
+
+@timed('analyzer')
+def update_analysis_state(path=ANALYSIS_STATE_PATH, data_dir=None):
+    """Fold rows appended to the processed datasets since the last run into the saved state"""
+    state = AnalysisState.load(path, **ANALYSIS_STATE_CONFIG)
+    files = glob.glob(os.path.join(data_dir or PROCESSED_DIR, DATASET_PATTERN))
+    added = state.ingest_files(files)
+    state.save(path)
+    print(f"Analysis state: {added} new rows ingested, {state.rows} rows from {len(state.files)} datasets")
+    return state
+
+@timed('analyzer')
+def load_harmonized_dataset(paths=None):
+    """
+    Load raw and processed datasets as one unified frame (see harmonize.py);
+    defaults to the raw dataset plus every processed dataset
+    """
+    from harmonize import SOURCE_COLUMN, default_sources, load_harmonized
+    paths = paths or default_sources()
+    for path in paths:
+        print(f"Loading dataset: {path}")
+    df = load_harmonized(paths)
+    df.attrs['source'] = 'harmonized'
+    counts = df[SOURCE_COLUMN].value_counts()
+    print("Harmonized rows: " + ", ".join(f"{source} {count:,}" for source, count in counts.items() if count))
+    return df
 
 def load_latest_dataset():
     """Load the most recent UHI dataset"""
-    data_dir = '../../data/processed'
-    files = glob.glob(f'{data_dir}/*uhi_dataset*.csv')
-    if not files:
+    latest = latest_dataset()
+    if latest is None:
         print("No dataset found! Please run enhanced_collector.py first.")
         return None
     
-    latest = max(files)
-    print(f"Loading dataset: {latest}")
-    df = pd.read_csv(latest)
-    return df
+    return load_dataset(latest)
 
+@timed('analyzer')
 def basic_statistics(df):
     """Display basic statistics"""
+    state = analysis_state(df)
+    stats = state.column_stats()
+    states = sorted(state.distinct['State'])
+    
     print("\n" + "="*80)
     print("DATASET OVERVIEW")
     print("="*80)
-    print(f"Total Cities: {len(df)}")
-    print(f"Total Features: {len(df.columns)}")
-    print(f"\nStates Covered: {df['State'].nunique()}")
-    print(f"States: {', '.join(sorted(df['State'].unique()))}")
+    print(f"Total Cities: {len(state.distinct['City Name'])}")
+    if state.rows != len(state.distinct['City Name']):
+        print(f"Total Rows: {state.rows} (from {len(state.files)} datasets)")
+    print(f"Total Features: {len(state.fields_seen)}")
+    print(f"\nStates Covered: {len(states)}")
+    print(f"States: {', '.join(states)}")
     
     print("\n" + "="*80)
     print("KEY METRICS SUMMARY")
     print("="*80)
     
     metrics = {
-        'Temperature Range': (df['Temperature (°C)'].min(), df['Temperature (°C)'].max()),
-        'UHI Intensity Range': (df['UHI Intensity (°C)'].min(), df['UHI Intensity (°C)'].max()),
-        'Average NDVI': df['NDVI'].mean(),
-        'Average Impervious Surface': df['Impervious Surface (%)'].mean(),
-        'Average Urban Greenness': df['Urban Greenness Ratio (%)'].mean(),
-        'Total Population': df['Population'].sum(),
+        'Temperature Range': (stats.loc['Temperature (°C)', 'min'], stats.loc['Temperature (°C)', 'max']),
+        'UHI Intensity Range': (stats.loc['UHI Intensity (°C)', 'min'], stats.loc['UHI Intensity (°C)', 'max']),
+        'Average NDVI': stats.loc['NDVI', 'mean'],
+        'Average Impervious Surface': stats.loc['Impervious Surface (%)', 'mean'],
+        'Average Urban Greenness': stats.loc['Urban Greenness Ratio (%)', 'mean'],
+        'Total Population': int(stats.loc['Population', 'sum']),
     }
     
     for key, value in metrics.items():
@@ -61,33 +194,21 @@ def basic_statistics(df):
         else:
             print(f"{key}: {value:,}")
 
+@timed('analyzer')
 def correlation_analysis(df):
     """Analyze correlations with UHI intensity"""
     print("\n" + "="*80)
     print("CORRELATION WITH UHI INTENSITY")
     print("="*80)
     
-    # Select numeric columns relevant to UHI
-    uhi_factors = [
-        'Temperature (°C)',
-        'Impervious Surface (%)',
-        'NDVI',
-        'Albedo',
-        'Urban Greenness Ratio (%)',
-        'Population Density (people/km²)',
-        'Building Density (buildings/km²)',
-        'Anthropogenic Heat Flux (W/m²)',
-        'Wind Speed (km/h)',
-        'Distance to Water (km)',
-        'Solar Radiation (MJ/m²/day)',
-        'Humidity (%)',
-    ]
+    state = analysis_state(df)
+    counts = state.column_stats()['count']
+    uhi_corr = state.correlation()['UHI Intensity (°C)']
     
     correlations = []
-    for factor in uhi_factors:
-        if factor in df.columns:
-            corr = df['UHI Intensity (°C)'].corr(df[factor])
-            correlations.append((factor, corr))
+    for factor in UHI_FACTORS:
+        if counts[factor] > 0:
+            correlations.append((factor, uhi_corr[factor]))
     
     # Sort by absolute correlation
     correlations.sort(key=lambda x: abs(x[1]), reverse=True)
@@ -98,6 +219,7 @@ def correlation_analysis(df):
         direction = "↑ Positive" if corr > 0 else "↓ Negative"
         print(f"{i:2d}. {factor:45s} | r = {corr:+.3f} ({direction})")
 
+@timed('analyzer')
 def regional_analysis(df):
     """Analyze UHI by regions"""
     print("\n" + "="*80)
@@ -105,24 +227,42 @@ def regional_analysis(df):
     print("="*80)
     
     # Group by latitude regions
-    df['Region'] = pd.cut(df['Latitude'], 
-                          bins=[0, 15, 23, 28, 90],
-                          labels=['South (<15°N)', 'Central (15-23°N)', 
-                                 'North-Central (23-28°N)', 'North (>28°N)'])
-    
-    regional_stats = df.groupby('Region').agg({
-        'UHI Intensity (°C)': ['mean', 'std', 'min', 'max'],
-        'Temperature (°C)': 'mean',
-        'NDVI': 'mean',
-        'Impervious Surface (%)': 'mean',
-        'City Name': 'count'
-    }).round(2)
+    groups = analysis_state(df).group_stats('Region', order=REGION_LABELS)
+    regional_stats = groups[[
+        ('UHI Intensity (°C)', 'mean'), ('UHI Intensity (°C)', 'std'),
+        ('UHI Intensity (°C)', 'min'), ('UHI Intensity (°C)', 'max'),
+        ('Temperature (°C)', 'mean'), ('NDVI', 'mean'), ('Impervious Surface (%)', 'mean'),
+        ('rows', 'count'),
+    ]].rename(columns={'rows': 'City Name'}).round(2)
     
     print("\nRegional UHI Statistics:")
     print(regional_stats)
 
+@timed('analyzer')
+def spatial_analysis(df, permutations=SPATIAL_PERMUTATIONS, seed=42):
+    """Spatial autocorrelation of UHI and its factors, and UHI hot/cold spots (see spatial.py)"""
+    print("\n" + "="*80)
+    print("SPATIAL AUTOCORRELATION ANALYSIS")
+    print("="*80)
+    
+    try:
+        from spatial import SPATIAL_COLUMNS, SpatialAnalysis, print_global, print_hotspots
+    except ImportError as e:
+        print(f"Skipped: {e}")
+        return None
+    
+    # Neighbours: the 8 nearest cities (fewer when the dataset is small)
+    analysis = SpatialAnalysis(df, k=min(8, len(df) - 1))
+    print_global(analysis.global_table(SPATIAL_COLUMNS, permutations, seed))
+    local = analysis.local_table('UHI Intensity (°C)', permutations, seed)
+    print_hotspots(df, local, 'UHI Intensity (°C)', top=5)
+    return local
+
+@timed('analyzer')
 def top_bottom_cities(df):
     """Display top and bottom cities by various metrics"""
+    state = analysis_state(df)
+    
     print("\n" + "="*80)
     print("RANKING ANALYSIS")
     print("="*80)
@@ -130,10 +270,7 @@ def top_bottom_cities(df):
     # Top 10 UHI intensity cities
     print("\n🔥 TOP 10 CITIES - HIGHEST UHI INTENSITY:")
     print("-" * 80)
-    top_uhi = df.nlargest(10, 'UHI Intensity (°C)')[
-        ['City Name', 'State', 'UHI Intensity (°C)', 'Temperature (°C)', 
-         'Impervious Surface (%)', 'NDVI']
-    ]
+    top_uhi = state.ranking('uhi_high')
     for i, row in enumerate(top_uhi.itertuples(), 1):
         print(f"{i:2d}. {row[1]:20s} ({row[2]:20s}) - UHI: {row[3]:.2f}°C, "
               f"Temp: {row[4]:.1f}°C, Impervious: {row[5]:.1f}%")
@@ -141,10 +278,7 @@ def top_bottom_cities(df):
     # Bottom 10 UHI intensity cities (most livable)
     print("\n🌿 TOP 10 CITIES - LOWEST UHI INTENSITY (Most Livable):")
     print("-" * 80)
-    bottom_uhi = df.nsmallest(10, 'UHI Intensity (°C)')[
-        ['City Name', 'State', 'UHI Intensity (°C)', 'Temperature (°C)', 
-         'NDVI', 'Urban Greenness Ratio (%)']
-    ]
+    bottom_uhi = state.ranking('uhi_low')
     for i, row in enumerate(bottom_uhi.itertuples(), 1):
         print(f"{i:2d}. {row[1]:20s} ({row[2]:20s}) - UHI: {row[3]:.2f}°C, "
               f"NDVI: {row[5]:.3f}, Greenness: {row[6]:.1f}%")
@@ -152,38 +286,37 @@ def top_bottom_cities(df):
     # Highest NDVI cities
     print("\n🌳 TOP 10 CITIES - HIGHEST VEGETATION (NDVI):")
     print("-" * 80)
-    top_ndvi = df.nlargest(10, 'NDVI')[
-        ['City Name', 'State', 'NDVI', 'Urban Greenness Ratio (%)', 'UHI Intensity (°C)']
-    ]
+    top_ndvi = state.ranking('ndvi_high')
     for i, row in enumerate(top_ndvi.itertuples(), 1):
         print(f"{i:2d}. {row[1]:20s} ({row[2]:20s}) - NDVI: {row[3]:.3f}, "
               f"Greenness: {row[4]:.1f}%, UHI: {row[5]:.2f}°C")
 
+@timed('analyzer')
 def land_cover_analysis(df):
     """Analyze by land cover type"""
     print("\n" + "="*80)
     print("LAND COVER ANALYSIS")
     print("="*80)
     
-    lc_stats = df.groupby('Land Cover').agg({
-        'City Name': 'count',
-        'UHI Intensity (°C)': 'mean',
-        'NDVI': 'mean',
-        'Impervious Surface (%)': 'mean',
-        'Temperature (°C)': 'mean'
-    }).round(2)
+    groups = analysis_state(df).group_stats('Land Cover')
+    lc_stats = groups[[
+        ('rows', 'count'), ('UHI Intensity (°C)', 'mean'), ('NDVI', 'mean'),
+        ('Impervious Surface (%)', 'mean'), ('Temperature (°C)', 'mean'),
+    ]].round(2)
     
     lc_stats.columns = ['Count', 'Avg UHI (°C)', 'Avg NDVI', 'Avg Impervious (%)', 'Avg Temp (°C)']
     print(lc_stats)
 
+@timed('analyzer')
 def create_visualizations(df):
     """Create and save visualizations"""
+    plt, sns = plotting()
     print("\n" + "="*80)
     print("GENERATING VISUALIZATIONS")
     print("="*80)
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_dir = '../../outputs/visualizations'
+    output_dir = VISUALIZATIONS_DIR
     os.makedirs(output_dir, exist_ok=True)
     
     # 1. UHI Intensity vs Key Factors
@@ -307,11 +440,197 @@ def create_visualizations(df):
     plt.close()
     
     print(f"\n✓ All visualizations saved successfully!")
+    
+    return {
+        'uhi_factors_analysis': filename1,
+        'uhi_correlation_matrix': filename2,
+        'top_cities_uhi': filename3,
+        'ndvi_vs_uhi': filename4,
+    }
+
+def _round_list(values, digits):
+    """Round an array to plain floats for JSON, mapping NaN to None"""
+    return [None if np.isnan(v) else round(float(v), digits) for v in np.asarray(values, dtype=float)]
 
+# Per-city context carried in the dashboard rankings (key -> column)
+RANKING_DETAILS = {
+    'impervious': 'Impervious Surface (%)',
+    'ndvi': 'NDVI',
+    'greenness': 'Urban Greenness Ratio (%)',
+}
+
+# Dashboard "crisis" and "excellent" UHI thresholds (°C)
+CRISIS_UHI = 3.0
+COOL_UHI = 1.0
+
+def _round_value(value, digits):
+    """Round a scalar to a plain float for JSON, mapping NaN to None"""
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+def _ranking(df, column, ascending, n=10):
+    """Top-n city list for one metric, with the RANKING_DETAILS columns for context"""
+    ranked = df.nsmallest(n, column) if ascending else df.nlargest(n, column)
+    details = {key: col for key, col in RANKING_DETAILS.items() if col in ranked.columns}
+    return [dict({'city': row['City Name'], 'state': row['State'], 'value': round(float(row[column]), 3)},
+                 **{key: _round_value(row[col], 3) for key, col in details.items()})
+            for _, row in ranked.iterrows()]
+
+def _group_ratio(values, codes, labels, numerator, denominator):
+    """Ratio of two group means (e.g. Industrial / Green Space UHI), None when a group is missing"""
+    labels = list(labels)
+    if numerator not in labels or denominator not in labels:
+        return None
+    top = np.nanmean(values[codes == labels.index(numerator)])
+    bottom = np.nanmean(values[codes == labels.index(denominator)])
+    return _round_value(top / bottom, 1) if bottom else None
+
+@timed('analyzer')
+def compute_dashboard_aggregates(df):
+    """Compute every aggregate the dashboard charts need from the processed dataset"""
+    uhi = df['UHI Intensity (°C)'].to_numpy(dtype=float)
+    ndvi = df['NDVI'].to_numpy(dtype=float)
+
+    # Histogram with right-open bins, matching the dashboard labels
+    histogram, _ = np.histogram(uhi[~np.isnan(uhi)], bins=UHI_BINS)
+
+    # Regional and land cover means via integer group codes
+    region_codes = pd.cut(df['Latitude'], bins=REGION_BINS, labels=False)
+    region_codes = np.where(np.isnan(region_codes), -1, region_codes).astype(int)
+    region_uhi = [float(np.nanmean(uhi[region_codes == i])) if (region_codes == i).any() else np.nan
+                  for i in range(len(REGION_LABELS))]
+
+    lc_codes, lc_labels = pd.factorize(df['Land Cover'])
+    lc_uhi = np.array([np.nanmean(uhi[lc_codes == i]) for i in range(len(lc_labels))])
+    lc_ndvi = np.array([np.nanmean(ndvi[lc_codes == i]) for i in range(len(lc_labels))])
+    lc_order = np.argsort(-lc_uhi)
+
+    # Correlations of every factor with UHI in one matrix computation
+    factors = [col for col in DASHBOARD_FACTORS if col in df.columns]
+    corr = df[['UHI Intensity (°C)'] + factors].corr().iloc[0, 1:]
+    corr = corr.dropna().reindex(corr.dropna().abs().sort_values(ascending=False).index)[:6]
+
+    region_cities = [int((region_codes == i).sum()) for i in range(len(REGION_LABELS))]
+
+    # Share of cities whose temperature was observed rather than missing or imputed
+    observed = df['Temperature (°C)'].notna()
+    if 'Imputed Fields' in df.columns:
+        observed &= ~df['Imputed Fields'].fillna('').str.contains('Temperature (°C)', regex=False)
+
+    # UHI change per 0.1 NDVI from a least-squares line (cooling is positive)
+    fit = ~np.isnan(uhi) & ~np.isnan(ndvi)
+    ndvi_cooling = -np.polyfit(ndvi[fit], uhi[fit], 1)[0] * 0.1 if fit.sum() > 1 else np.nan
+
+    hottest, coolest = np.nanargmax(uhi), np.nanargmin(uhi)
+    features = [col for col in df.columns if col != 'Imputed Fields']
+
+    return {
+        'summary': {
+            'cities': int(len(df)),
+            'states': int(df['State'].nunique()),
+            'features': len(features),
+            'population': int(df['Population'].sum()) if 'Population' in df.columns else None,
+            'success_rate': round(float(observed.mean() * 100), 1) if len(df) else None,
+            'avg_uhi': round(float(np.nanmean(uhi)), 2),
+            'max_uhi': round(float(uhi[hottest]), 2),
+            'max_uhi_city': df['City Name'].iloc[hottest],
+            'min_uhi': round(float(uhi[coolest]), 2),
+            'min_uhi_city': df['City Name'].iloc[coolest],
+            'crisis_cities': int((uhi > CRISIS_UHI).sum()),
+            'cool_cities': int((uhi < COOL_UHI).sum()),
+            'avg_ndvi': round(float(np.nanmean(ndvi)), 3),
+            'avg_impervious': round(float(df['Impervious Surface (%)'].mean()), 1),
+            'ndvi_cooling': _round_value(ndvi_cooling, 1),
+            'industrial_vs_green': _group_ratio(uhi, lc_codes, lc_labels, 'Industrial', 'Green Space'),
+            'north_vs_south': _round_value(region_uhi[-1] / region_uhi[0], 1) if region_uhi[0] else None,
+        },
+        'uhi_distribution': {'labels': UHI_BIN_LABELS, 'counts': histogram.tolist()},
+        # Dashboard shows regions north to south
+        'regional': {'labels': REGION_LABELS[::-1], 'avg_uhi': _round_list(region_uhi[::-1], 2),
+                     'cities': region_cities[::-1]},
+        'land_cover': {
+            'labels': [str(lc_labels[i]) for i in lc_order],
+            'avg_uhi': _round_list(lc_uhi[lc_order], 2),
+            'avg_ndvi': _round_list(lc_ndvi[lc_order], 2),
+        },
+        'top_factors': {
+            'labels': [DASHBOARD_FACTORS[col] for col in corr.index],
+            'correlations': _round_list(corr.values, 3),
+        },
+        'rankings': {
+            'highest_uhi': _ranking(df, 'UHI Intensity (°C)', ascending=False),
+            'lowest_uhi': _ranking(df, 'UHI Intensity (°C)', ascending=True),
+            'highest_ndvi': _ranking(df, 'NDVI', ascending=False),
+        },
+    }
+
+@timed('analyzer')
+def build_dashboard_data(df, figures=None, dataset_name=None):
+    """
+    Build the dashboard's chart data bundle
+
+    Writes a content-fingerprinted static/data/dashboard_data.<hash>.json plus a
+    small manifest.json pointing at it and at the latest figure images.
+    Returns the manifest path.
+    """
+    data_dir = os.path.join(DASHBOARD_DIR, 'static', 'data')
+    images_dir = os.path.join(DASHBOARD_DIR, 'static', 'images')
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(images_dir, exist_ok=True)
+
+    bundle = compute_dashboard_aggregates(df)
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()[:12]
+    bundle_name = f'dashboard_data.{digest}.json'
+    bundle_path = f'{data_dir}/{bundle_name}'
+
+    if not os.path.exists(bundle_path):
+        with open(bundle_path, 'wb') as f:
+            f.write(payload)
+    # Drop superseded bundles
+    for old in glob.glob(f'{data_dir}/dashboard_data.*.json'):
+        if os.path.basename(old) != bundle_name:
+            os.remove(old)
+
+    # Use the figures from this run, falling back to the newest ones on disk
+    figures = dict(figures or {})
+    for kind in FIGURE_KINDS:
+        if kind not in figures:
+            existing = glob.glob(os.path.join(VISUALIZATIONS_DIR, f'{kind}_*.png'))
+            if existing:
+                figures[kind] = max(existing)
+
+    figure_refs = {}
+    for kind, path in figures.items():
+        target = f'{images_dir}/{os.path.basename(path)}'
+        if not os.path.exists(target):
+            shutil.copy2(path, target)
+        figure_refs[kind] = f'static/images/{os.path.basename(path)}'
+    # Drop copies of earlier figures that the manifest no longer points at
+    referenced = {os.path.basename(ref) for ref in figure_refs.values()}
+    for kind in FIGURE_KINDS:
+        for old in glob.glob(f'{images_dir}/{kind}_*.png'):
+            if os.path.basename(old) not in referenced:
+                os.remove(old)
+
+    manifest = {
+        'data': f'static/data/{bundle_name}',
+        'figures': figure_refs,
+        'dataset': dataset_name,
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    manifest_path = f'{data_dir}/manifest.json'
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✓ Dashboard data: {bundle_path} ({len(payload):,} bytes)")
+    print(f"✓ Dashboard manifest: {manifest_path}")
+    return manifest_path
+
+@timed('analyzer')
 def export_summary(df):
     """Export summary statistics to file"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_dir = '../../outputs/reports'
+    output_dir = REPORTS_DIR
     os.makedirs(output_dir, exist_ok=True)
     filename = f'{output_dir}/uhi_analysis_summary_{timestamp}.txt'
     
@@ -343,28 +662,73 @@ def export_summary(df):
                 f.write(f"{factor:45s}: {corr:+.3f}\n")
     
     print(f"\n✓ Summary exported to: {filename}")
+    return filename
 
-def main():
+def build_parser():
+    """Command-line options for the analyzer"""
+    parser = argparse.ArgumentParser(description='Urban Heat Island data analysis')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Report over every collected dataset, updating the saved '
+                             'analysis state with only the rows added since the last run')
+    parser.add_argument('--state', default=ANALYSIS_STATE_PATH,
+                        help='Analysis state file used by --incremental')
+    parser.add_argument('--sources', nargs='*', metavar='PATH',
+                        help='Analyze raw and processed files merged into one unified frame '
+                             '(no paths: the raw dataset plus every processed dataset)')
+    parser.add_argument('--spatial-permutations', type=int, default=None,
+                        help="Permutations behind the spatial Moran's I and hotspot p-values "
+                             f"(default: {SPATIAL_PERMUTATIONS}, or no spatial section with --text-only; "
+                             "0: skip the spatial section)")
+    parser.add_argument('--text-only', action='store_true',
+                        help='Print statistics and export the summary report only; skips figures, '
+                             'the dashboard bundle and (unless --spatial-permutations is given) the '
+                             'spatial section, so matplotlib and seaborn are never imported')
+    return parser
+
+def main(args=None):
     """Main analysis function"""
+    args = args or build_parser().parse_args([])
     print("\n" + "="*80)
     print("URBAN HEAT ISLAND DATA ANALYSIS")
     print("="*80)
     
     # Load data
-    df = load_latest_dataset()
+    df = load_harmonized_dataset(args.sources) if args.sources is not None else load_latest_dataset()
     if df is None:
         return
     
+    # Text analyses read running statistics: the whole history with --incremental,
+    # otherwise a state summarized from the latest dataset
+    state = update_analysis_state(args.state) if args.incremental else analysis_state(df)
+    
     # Run analyses
-    basic_statistics(df)
-    correlation_analysis(df)
-    regional_analysis(df)
-    land_cover_analysis(df)
-    top_bottom_cities(df)
+    basic_statistics(state)
+    correlation_analysis(state)
+    regional_analysis(state)
+    land_cover_analysis(state)
+    top_bottom_cities(state)
+    permutations = args.spatial_permutations
+    if permutations is None:
+        permutations = 0 if args.text_only else SPATIAL_PERMUTATIONS
+    if permutations:
+        spatial_analysis(df, permutations)
+    
+    if args.text_only:
+        summary = export_summary(df)
+        print("\n" + "="*80)
+        print("SUMMARY COMPLETE!")
+        print("="*80)
+        print(f"Summary report: {summary}")
+        print("="*80 + "\n")
+        if METRICS.enabled:
+            print("Step timings:")
+            METRICS.summary('uhi_stage_duration_seconds')
+        return
     
     # Create visualizations
+    figures = None
     try:
-        create_visualizations(df)
+        figures = create_visualizations(df)
     except Exception as e:
         print(f"Warning: Visualization creation failed: {e}")
         print("Make sure matplotlib and seaborn are installed: pip install matplotlib seaborn")
@@ -372,6 +736,9 @@ def main():
     # Export summary
     export_summary(df)
     
+    # Build dashboard chart data
+    build_dashboard_data(df, figures, dataset_name=os.path.basename(df.attrs.get('source', '')))
+    
     print("\n" + "="*80)
     print("ANALYSIS COMPLETE!")
     print("="*80)
@@ -381,13 +748,19 @@ def main():
     print("  • Top cities bar chart")
     print("  • NDVI vs UHI bubble chart")
     print("  • Summary statistics text file")
+    print("  • Dashboard chart data bundle")
     print("\nRecommended next steps:")
     print("  1. Review visualizations for patterns")
     print("  2. Identify cities requiring UHI mitigation")
     print("  3. Develop targeted green infrastructure strategies")
     print("  4. Monitor seasonal changes with repeated data collection")
     print("="*80 + "\n")
+    
+    if METRICS.enabled:
+        print("Step timings:")
+        METRICS.summary('uhi_stage_duration_seconds')
 
 if __name__ == "__main__":
-    main()
+    from profiling import run_with_profiling
+    run_with_profiling(main, 'analyzer', parser=build_parser())
 
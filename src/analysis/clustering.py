@@ -0,0 +1,401 @@
+"""
+City Typology Clustering
+Standardizes the enhanced UHI features and groups cities (or grid cells) into
+typologies with mini-batch k-means. Every pass streams chunks, so memory is
+bounded by the chunk size and the init sample whether the input is 50 cities
+or millions of cells; clusters are named from their standardized profiles
+"""
+
+from typing import Callable, Iterable, Iterator, List, Optional
+import argparse
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data_collection'))
+from paths import REPORTS_DIR, latest_dataset
+from instrumentation import timed
+from incremental import PairwiseMoments
+
+# Clustering features: log-scaled when heavily skewed, and the words used to
+# describe a cluster that sits well above (high) or below (low) the average
+TYPOLOGY_FEATURES = {
+    'Impervious Surface (%)': {'log': False, 'high': 'dense', 'low': 'open'},
+    'Building Density (buildings/km²)': {'log': True, 'high': 'built-up', 'low': 'sparsely built'},
+    'Population Density (people/km²)': {'log': True, 'high': 'crowded', 'low': 'sparsely populated'},
+    'NDVI': {'log': False, 'high': 'green', 'low': 'low-NDVI'},
+    'Urban Greenness Ratio (%)': {'log': False, 'high': 'leafy', 'low': 'grey'},
+    'Albedo': {'log': False, 'high': 'reflective', 'low': 'dark-surfaced'},
+    'Anthropogenic Heat Flux (W/m²)': {'log': True, 'high': 'high-emission', 'low': 'low-emission'},
+    'Distance to Water (km)': {'log': True, 'high': 'inland', 'low': 'waterside'},
+    'Elevation (m)': {'log': True, 'high': 'highland', 'low': 'lowland'},
+    'Temperature (°C)': {'log': False, 'high': 'hot', 'low': 'mild'},
+    'Humidity (%)': {'log': False, 'high': 'humid', 'low': 'dry'},
+    'UHI Intensity (°C)': {'log': False, 'high': 'strong-UHI', 'low': 'weak-UHI'},
+}
+
+# Standardized centroid offset a feature needs to appear in a typology name
+NAME_THRESHOLD = 0.5
+NAME_WORDS = 3
+
+TYPOLOGY_COLUMN = 'UHI Typology'
+CLUSTER_COLUMN = 'Cluster'
+LABEL_COLUMNS = ['City Name', 'State', 'Latitude', 'Longitude']
+
+
+def feature_matrix(chunk: pd.DataFrame, features: List[str]) -> np.ndarray:
+    """(rows, features) float block with log1p applied to skewed features; NaN when missing"""
+    block = np.full((len(chunk), len(features)), np.nan)
+    for j, feature in enumerate(features):
+        if feature in chunk.columns:
+            values = pd.to_numeric(chunk[feature], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            block[:, j] = np.log1p(np.maximum(values, 0.0)) if TYPOLOGY_FEATURES[feature]['log'] else values
+    return block
+
+
+def _sq_distances(x: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """(rows, k) squared Euclidean distances"""
+    distances = (x ** 2).sum(axis=1)[:, None] - 2.0 * x @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.maximum(distances, 0.0)
+
+
+def kmeans_plus_plus(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding: each new center drawn with probability proportional to D²"""
+    centers = [x[rng.integers(len(x))]]
+    closest = _sq_distances(x, centers[0][None, :])[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(x), p=closest / total) if total > 0 else rng.integers(len(x))
+        centers.append(x[index])
+        closest = np.minimum(closest, _sq_distances(x, x[index][None, :])[:, 0])
+    return np.array(centers)
+
+
+def lloyd(x: np.ndarray, centers: np.ndarray, max_iter: int = 100, tol: float = 1e-6):
+    """Full-batch k-means refinement; returns (centers, inertia)"""
+    k = len(centers)
+    for _ in range(max_iter):
+        labels = _sq_distances(x, centers).argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, x)
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        shift = np.abs(updated - centers).max()
+        centers = updated
+        if shift < tol:
+            break
+    inertia = _sq_distances(x, centers).min(axis=1).sum()
+    return centers, inertia
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means over streamed, already standardized blocks
+
+    Centers are seeded by best-of-n_init k-means++ and Lloyd runs on a uniform
+    sample, then refined with per-center learning rates 1/count (Sculley 2010).
+    Counts start from the sample's cluster sizes, so the seed acts as a prior
+    and a single noisy batch cannot drag a center away
+    """
+
+    def __init__(self, k: int = 4, batch_size: int = 4096, n_init: int = 5, seed: Optional[int] = None):
+        self.k = k
+        self.batch_size = batch_size
+        self.n_init = n_init
+        self.rng = np.random.default_rng(seed)
+        self.centers = None
+        self.counts = np.zeros(k)
+
+    def init(self, sample: np.ndarray) -> float:
+        """Seed centers from a sample; returns the sample inertia of the best start"""
+        best = None
+        for _ in range(self.n_init):
+            centers, inertia = lloyd(sample, kmeans_plus_plus(sample, self.k, self.rng))
+            if best is None or inertia < best[1]:
+                best = (centers, inertia)
+        self.centers = best[0]
+        self.counts = np.bincount(self.predict(sample)[0], minlength=self.k).astype(float)
+        return best[1]
+
+    def partial_fit(self, x: np.ndarray):
+        """Fold one block of rows into the centers, batch by batch in random order"""
+        order = self.rng.permutation(len(x))
+        for start in range(0, len(x), self.batch_size):
+            batch = x[order[start:start + self.batch_size]]
+            labels = _sq_distances(batch, self.centers).argmin(axis=1)
+            counts = np.bincount(labels, minlength=self.k)
+            sums = np.zeros_like(self.centers)
+            np.add.at(sums, labels, batch)
+            total = self.counts + counts
+            moved = counts > 0
+            self.centers[moved] += (sums[moved] - counts[moved, None] * self.centers[moved]) / total[moved, None]
+            self.counts = total
+
+    def predict(self, x: np.ndarray):
+        """(labels, squared distance to the assigned center)"""
+        distances = _sq_distances(x, self.centers)
+        labels = distances.argmin(axis=1)
+        return labels, distances[np.arange(len(x)), labels]
+
+
+class TypologyModel:
+    """Streaming standardization, mini-batch k-means and cluster profiles"""
+
+    def __init__(self, k: int = 4, features: List[str] = None, batch_size: int = 4096,
+                 init_size: int = 20000, n_init: int = 5, max_epochs: int = 10,
+                 tol: float = 1e-3, seed: Optional[int] = None):
+        self.features = list(features or TYPOLOGY_FEATURES)
+        self.k = k
+        self.init_size = init_size
+        self.max_epochs = max_epochs
+        self.tol = tol
+        self.seed = seed
+        self.kmeans = MiniBatchKMeans(k, batch_size, n_init, seed)
+        self.moments = PairwiseMoments(len(self.features))
+        self.mean = self.scale = None
+        self.rows = 0
+        self.epochs = 0
+        self.profiles = None
+        self.names = None
+
+    def standardize(self, block: np.ndarray) -> np.ndarray:
+        """z-scores; a missing value sits at the feature mean (0)"""
+        z = (block - self.mean) / self.scale
+        return np.where(np.isnan(z), 0.0, z)
+
+    def _scan(self, chunks: Iterable[pd.DataFrame]) -> np.ndarray:
+        """
+        First pass: feature moments and a uniform init sample (rows with the
+        init_size smallest random keys, kept chunk by chunk)
+        """
+        rng = np.random.default_rng(self.seed)
+        sample, keys = np.empty((0, len(self.features))), np.empty(0)
+        for chunk in chunks:
+            block = feature_matrix(chunk, self.features)
+            self.moments.update(block)
+            self.rows += len(block)
+            sample = np.vstack([sample, block])
+            keys = np.concatenate([keys, rng.random(len(block))])
+            if len(keys) > self.init_size:
+                keep = np.argpartition(keys, self.init_size)[:self.init_size]
+                sample, keys = sample[keep], keys[keep]
+        return sample
+
+    @timed('clustering')
+    def fit(self, chunks: Callable[[], Iterator[pd.DataFrame]]) -> 'TypologyModel':
+        """
+        chunks() returns a fresh iterator over the data each time it is called;
+        the data is read once for moments, then once per epoch
+        """
+        sample = self._scan(chunks())
+        # Features the data does not have (or that never vary) would only add noise
+        keep = (self.moments.count() > 1) & (np.nan_to_num(self.moments.std()) > 0)
+        self.features = [f for f, kept in zip(self.features, keep) if kept]
+        self.mean = self.moments.means()[keep]
+        self.scale = self.moments.std()[keep]
+        sample = sample[:, keep]
+        self.kmeans.k = min(self.k, len(sample))
+        self.kmeans.init(self.standardize(sample))
+
+        if self.rows > len(sample):
+            # The sample already was the whole dataset otherwise, and Lloyd converged on it
+            for self.epochs in range(1, self.max_epochs + 1):
+                previous = self.kmeans.centers.copy()
+                for chunk in chunks():
+                    self.kmeans.partial_fit(self.standardize(feature_matrix(chunk, self.features)))
+                if np.abs(self.kmeans.centers - previous).max() < self.tol:
+                    break
+        self._relabel()
+        return self
+
+    def _relabel(self):
+        """Order clusters by their center's UHI intensity (hottest first), when available"""
+        uhi = 'UHI Intensity (°C)'
+        if uhi in self.features:
+            order = np.argsort(-self.kmeans.centers[:, self.features.index(uhi)], kind='stable')
+            self.kmeans.centers = self.kmeans.centers[order]
+
+    def predict(self, chunk: pd.DataFrame):
+        """(cluster labels, distance to the cluster center in standard units)"""
+        labels, sq_distances = self.kmeans.predict(self.standardize(feature_matrix(chunk, self.features)))
+        return labels, np.sqrt(sq_distances)
+
+    def name_clusters(self) -> List[str]:
+        """Short descriptive names from each center's strongest standardized offsets"""
+        names = []
+        for center in self.kmeans.centers:
+            words = []
+            for j in np.argsort(-np.abs(center)):
+                if abs(center[j]) < NAME_THRESHOLD or len(words) == NAME_WORDS:
+                    break
+                word = TYPOLOGY_FEATURES[self.features[j]]['high' if center[j] > 0 else 'low']
+                if word not in words:
+                    words.append(word)
+            name = ', '.join(words) if words else 'average'
+            name = name[0].upper() + name[1:]
+            while name in names:
+                name += ' (alt)'
+            names.append(name)
+        self.names = names
+        return names
+
+    @timed('clustering')
+    def profile(self, chunks: Iterable[pd.DataFrame], examples: int = 5,
+                label_column: str = 'City Name', on_chunk: Callable = None) -> pd.DataFrame:
+        """
+        Stream the data once more: per-cluster size, inertia, feature means in
+        original units and the members closest to each center. on_chunk(chunk,
+        labels, distances) receives every labelled chunk, e.g. to write it out
+        """
+        k = len(self.kmeans.centers)
+        names = self.names or self.name_clusters()
+        counts = np.zeros(k)
+        inertia = np.zeros(k)
+        sums = np.zeros((k, len(self.features)))
+        present = np.zeros((k, len(self.features)))
+        closest = [[] for _ in range(k)]
+        for chunk in chunks:
+            labels, distances = self.predict(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk, labels, distances)
+            raw = np.column_stack([pd.to_numeric(chunk[f], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                                   for f in self.features])
+            counts += np.bincount(labels, minlength=k)
+            inertia += np.bincount(labels, weights=distances ** 2, minlength=k)
+            np.add.at(sums, labels, np.nan_to_num(raw))
+            np.add.at(present, labels, ~np.isnan(raw))
+            if label_column in chunk.columns:
+                members = chunk[label_column].to_numpy()
+                for c in range(k):
+                    in_cluster = np.flatnonzero(labels == c)
+                    nearest = in_cluster[np.argsort(distances[in_cluster], kind='stable')[:examples]]
+                    merged = closest[c] + [(distances[i], str(members[i])) for i in nearest]
+                    closest[c] = sorted(merged)[:examples]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / present
+        profiles = pd.DataFrame(means, columns=self.features)
+        profiles.insert(0, 'Inertia', inertia)
+        profiles.insert(0, 'Share (%)', 100.0 * counts / max(counts.sum(), 1))
+        profiles.insert(0, 'Count', counts.astype(int))
+        profiles.insert(0, TYPOLOGY_COLUMN, names)
+        profiles['Closest Members'] = [', '.join(name for _, name in members) for members in closest]
+        profiles.index.name = CLUSTER_COLUMN
+        self.profiles = profiles
+        return profiles
+
+
+def frame_chunks(df: pd.DataFrame, chunksize: int = 250000) -> Callable[[], Iterator[pd.DataFrame]]:
+    """Re-iterable chunk source over an in-memory frame"""
+    def chunks():
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    return chunks
+
+
+def file_chunks(paths: List[str], chunksize: int = 250000) -> Callable[[], Iterator[pd.DataFrame]]:
+    """Re-iterable chunk source over raw/processed files mapped onto the unified schema"""
+    from harmonize import iter_harmonized
+    return lambda: iter_harmonized(paths, chunksize)
+
+
+def cluster_frame(df: pd.DataFrame, k: int = 4, seed: int = 42) -> pd.DataFrame:
+    """Copy of df with its typology and cluster id, for in-memory use"""
+    model = TypologyModel(k=k, seed=seed).fit(frame_chunks(df))
+    labels, distances = model.predict(df)
+    names = model.name_clusters()
+    result = df.copy()
+    result[CLUSTER_COLUMN] = labels
+    result[TYPOLOGY_COLUMN] = [names[c] for c in labels]
+    return result
+
+
+def print_profiles(model: TypologyModel):
+    """Cluster sizes, standardized centers and example members"""
+    profiles = model.profiles
+    print(f"\n{'Cluster':8s} {'Typology':45s} {'Count':>10s} {'Share':>7s}")
+    print("-" * 80)
+    for cluster, row in profiles.iterrows():
+        print(f"{cluster:<8d} {row[TYPOLOGY_COLUMN]:45s} {row['Count']:>10,d} {row['Share (%)']:6.1f}%")
+        if row['Closest Members']:
+            print(f"{'':8s} e.g. {row['Closest Members']}")
+
+    print("\nCluster centers (standard deviations from the mean):")
+    centers = pd.DataFrame(model.kmeans.centers, columns=model.features).T
+    centers.columns = [f"C{c}" for c in centers.columns]
+    print(centers.round(2).to_string())
+
+    print("\nCluster profiles (means in original units):")
+    print(profiles[model.features].T.round(2).rename(columns=lambda c: f"C{c}").to_string())
+
+
+def main(argv=None):
+    """Cluster a dataset into UHI typologies"""
+    parser = argparse.ArgumentParser(description='UHI typology clustering with mini-batch k-means')
+    parser.add_argument('paths', nargs='*', help='Dataset files, raw or processed (default: latest processed dataset)')
+    parser.add_argument('--k', type=int, default=4, help='Number of typologies')
+    parser.add_argument('--features', nargs='+', choices=list(TYPOLOGY_FEATURES), metavar='FEATURE',
+                        help='Features to cluster on (default: all enhanced features)')
+    parser.add_argument('--batch-size', type=int, default=4096, help='Rows per mini-batch')
+    parser.add_argument('--chunksize', type=int, default=250000, help='Rows read per chunk')
+    parser.add_argument('--init-size', type=int, default=20000, help='Sample rows used to seed the centers')
+    parser.add_argument('--epochs', type=int, default=10, help='Maximum passes over the data')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--output', help='Per-row typology CSV (default: outputs/reports/)')
+    args = parser.parse_args(argv)
+
+    paths = args.paths or ([latest_dataset()] if latest_dataset() else [])
+    if not paths:
+        print("No dataset found! Please run enhanced_collector.py first.")
+        return None
+
+    print("=" * 80)
+    print("UHI TYPOLOGY CLUSTERING")
+    print("=" * 80)
+    for path in paths:
+        print(f"Dataset: {path}")
+
+    started = time.perf_counter()
+    chunks = file_chunks(paths, args.chunksize)
+    model = TypologyModel(k=args.k, features=args.features, batch_size=args.batch_size,
+                          init_size=args.init_size, max_epochs=args.epochs, seed=args.seed).fit(chunks)
+    print(f"{model.rows:,} rows, {len(model.features)} features, k={len(model.kmeans.centers)}, "
+          f"{model.epochs} mini-batch epochs")
+
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(REPORTS_DIR, f'uhi_typologies_{timestamp}.csv')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    names = np.array(model.name_clusters(), dtype=object)
+    written = {'rows': 0}
+
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        def write(chunk, labels, distances):
+            columns = [c for c in LABEL_COLUMNS if c in chunk.columns]
+            labelled = chunk[columns].reset_index(drop=True)
+            labelled[CLUSTER_COLUMN] = labels
+            labelled[TYPOLOGY_COLUMN] = names[labels]
+            labelled['Distance to Center'] = distances.round(4)
+            labelled.to_csv(f, header=written['rows'] == 0, index=False)
+            written['rows'] += len(labelled)
+
+        model.profile(chunks(), on_chunk=write)
+
+    print_profiles(model)
+    profiles_path = os.path.join(os.path.dirname(os.path.abspath(output)), f'uhi_typology_profiles_{timestamp}.csv')
+    model.profiles.to_csv(profiles_path)
+    print(f"\n✓ Typologies for {written['rows']:,} rows saved to: {output}")
+    print(f"✓ Cluster profiles saved to: {profiles_path}")
+    print(f"Completed in {time.perf_counter() - started:.2f}s")
+    print("=" * 80)
+    return model
+
+
+if __name__ == "__main__":
+    main()
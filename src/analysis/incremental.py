@@ -0,0 +1,349 @@
+"""
+Incremental Analysis State
+Mergeable running statistics for the analyzer: pairwise moments and
+co-moments (means, variances, correlations), per-group aggregates and
+top-k city rankings. New rows are folded in with Chan's parallel update, so
+appending to the dataset history costs O(new rows), and the state is saved
+as JSON between runs
+"""
+
+from typing import Dict, List, Sequence
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class PairwiseMoments:
+    """
+    Running means, second moments and co-moments over pairwise-complete rows
+
+    Entry [i, j] of n / mean / m2 covers the rows where columns i and j are
+    both present (mean and m2 are those of column i), so correlations match
+    pandas' pairwise NaN handling; the diagonal holds each column's own moments.
+    """
+
+    def __init__(self, p: int):
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+        self.min = np.full(p, np.inf)
+        self.max = np.full(p, -np.inf)
+        self.total = np.zeros(p)
+
+    def update(self, values: np.ndarray):
+        """Fold in an (n_rows, p) block; NaN marks a missing value"""
+        present = ~np.isnan(values)
+        if not present.any():
+            return
+        weights = present.astype(float)
+        x = np.where(present, values, 0.0)
+
+        n_b = weights.T @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, (x.T @ weights) / n_b, 0.0)
+            m2_b = np.maximum((x ** 2).T @ weights - n_b * mean_b ** 2, 0.0)
+            comoment_b = x.T @ x - n_b * mean_b * mean_b.T
+
+            # Chan et al. merge of (n, mean, m2, comoment) with the block's
+            n = self.n + n_b
+            delta = np.where(n > 0, mean_b - self.mean, 0.0)
+            factor = np.where(n > 0, self.n * n_b / n, 0.0)
+            self.comoment += comoment_b + delta * delta.T * factor
+            self.m2 += m2_b + delta ** 2 * factor
+            self.mean += np.where(n > 0, delta * n_b / n, 0.0)
+            self.n = n
+
+        self.min = np.fmin(self.min, np.nanmin(np.where(present, values, np.inf), axis=0))
+        self.max = np.fmax(self.max, np.nanmax(np.where(present, values, -np.inf), axis=0))
+        self.total += x.sum(axis=0)
+
+    def count(self) -> np.ndarray:
+        return np.diag(self.n).copy()
+
+    def means(self) -> np.ndarray:
+        return np.where(self.count() > 0, np.diag(self.mean), np.nan)
+
+    def std(self) -> np.ndarray:
+        """Sample standard deviation (ddof=1), like pandas"""
+        n = self.count()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 1, np.sqrt(np.diag(self.m2) / (n - 1)), np.nan)
+
+    def corr(self) -> np.ndarray:
+        """Pearson correlation matrix over pairwise-complete rows"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        return np.where(self.n > 1, corr, np.nan)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name).tolist()
+                for name in ['n', 'mean', 'm2', 'comoment', 'min', 'max', 'total']}
+
+    @classmethod
+    def from_dict(cls, document: Dict) -> 'PairwiseMoments':
+        moments = cls(len(document['min']))
+        for name, values in document.items():
+            setattr(moments, name, np.asarray(values, dtype=float))
+        return moments
+
+
+class AnalysisState:
+    """
+    Persistent, mergeable summary of every row ingested so far
+
+    columns:        numeric columns with running moments and correlations
+    group_by:       categorical columns (or names in bins) with per-group
+                    moments of group_columns
+    bins:           derived groupings, name -> {'column', 'bins', 'labels'}
+                    (pd.cut of a numeric column, e.g. latitude bands)
+    group_columns:  numeric columns aggregated within each group
+    rankings:       name -> {'column', 'largest', 'k', 'fields'} top-k cities
+                    (one entry per city, by its best value seen)
+    distinct:       columns whose distinct values are counted (e.g. State)
+    """
+
+    def __init__(self, columns: Sequence[str], group_by: Sequence[str] = (),
+                 group_columns: Sequence[str] = (), rankings: Dict = None,
+                 distinct: Sequence[str] = (), bins: Dict = None, key: str = 'City Name'):
+        self.columns = list(columns)
+        self.group_by = list(group_by)
+        self.bins = dict(bins or {})
+        self.group_columns = list(group_columns)
+        self.rankings = dict(rankings or {})
+        self.distinct_columns = list(distinct)
+        self.key = key
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.fields_seen = []
+        self.moments = PairwiseMoments(len(self.columns))
+        self.groups = {column: {} for column in self.group_by}
+        self.top = {name: [] for name in self.rankings}
+        self.distinct = {column: set() for column in self.distinct_columns}
+        self.files = {}
+
+    def _column_block(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        block = np.full((len(df), len(columns)), np.nan)
+        for j, column in enumerate(columns):
+            if column in df.columns:
+                block[:, j] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        return block
+
+    def update(self, df: pd.DataFrame):
+        """Fold a batch of new rows into every running statistic"""
+        if df.empty:
+            return
+        self.rows += len(df)
+        self.fields_seen += [c for c in df.columns if c not in self.fields_seen]
+        self.moments.update(self._column_block(df, self.columns))
+
+        block = self._column_block(df, self.group_columns)
+        for column in self.group_by:
+            keys = self._group_keys(df, column)
+            if keys is None:
+                continue
+            for group in pd.unique(keys):
+                if group is None:
+                    continue
+                rows = keys == group
+                entry = self.groups[column].get(str(group))
+                if entry is None:
+                    entry = self.groups[column][str(group)] = {
+                        'rows': 0, 'moments': PairwiseMoments(len(self.group_columns))}
+                entry['rows'] += int(rows.sum())
+                entry['moments'].update(block[rows])
+
+        for name, spec in self.rankings.items():
+            self._update_ranking(name, spec, df)
+
+        for column in self.distinct_columns:
+            if column in df.columns:
+                self.distinct[column].update(df[column].dropna().astype(str))
+
+    def _group_keys(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Group label per row (None where missing), or None when the batch lacks the column"""
+        if column in self.bins:
+            spec = self.bins[column]
+            if spec['column'] not in df.columns:
+                return None
+            values = pd.cut(df[spec['column']], bins=spec['bins'], labels=spec['labels'])
+        elif column in df.columns:
+            values = df[column]
+        else:
+            return None
+        return values.astype(object).where(values.notna(), None).to_numpy()
+
+    def _update_ranking(self, name: str, spec: Dict, df: pd.DataFrame):
+        column, largest, k = spec['column'], spec.get('largest', True), spec.get('k', 10)
+        if column not in df.columns:
+            return
+        fields = [f for f in spec['fields'] if f in df.columns]
+        # Best row per city within the batch, then merge with the retained top-k
+        best = (df[fields].dropna(subset=[column])
+                .sort_values(column, ascending=not largest, kind='stable')
+                .drop_duplicates(self.key).head(k))
+        candidates = {}
+        for record in self.top[name] + best.to_dict('records'):
+            current = candidates.get(record[self.key])
+            if current is None or (record[column] > current[column] if largest else record[column] < current[column]):
+                candidates[record[self.key]] = record
+        ordered = sorted(candidates.values(), key=lambda r: r[column], reverse=largest)
+        self.top[name] = [{f: (v.item() if hasattr(v, 'item') else v) for f, v in r.items()} for r in ordered[:k]]
+
+    # -- Incremental file ingestion -------------------------------------------------
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Fold in the rows appended to a CSV since it was last ingested
+        Only the bytes past the stored offset are read; a partially written
+        last line is left for the next run. Returns the number of new rows, or
+        None when the file was rewritten (the state must then be rebuilt).
+        """
+        name = os.path.basename(path)
+        entry = self.files.get(name)
+        with open(path, 'rb') as f:
+            header = f.readline()
+            header_hash = hashlib.sha1(header).hexdigest()
+            size = os.fstat(f.fileno()).st_size
+            if entry is not None and (entry['header'] != header_hash or size < entry['offset']):
+                return None
+            start = entry['offset'] if entry is not None else len(header)
+            f.seek(start)
+            tail = f.read()
+
+        complete = tail[:tail.rfind(b'\n') + 1]
+        self.files[name] = {'offset': start + len(complete), 'header': header_hash,
+                            'rows': (entry or {}).get('rows', 0)}
+        if not complete.strip():
+            return 0
+        df = pd.read_csv(io.BytesIO(header + complete))
+        self.update(df)
+        self.files[name]['rows'] += len(df)
+        return len(df)
+
+    def ingest_files(self, paths: Sequence[str]) -> int:
+        """Ingest new rows from several files; rebuilds from scratch if one was rewritten"""
+        added = 0
+        for path in sorted(paths):
+            rows = self.ingest_file(path)
+            if rows is None:
+                print(f"{os.path.basename(path)} changed since it was ingested; rebuilding analysis state")
+                self.reset()
+                return sum(self.ingest_file(p) for p in sorted(paths))
+            added += rows
+        return added
+
+    # -- Views used by the analyzer ------------------------------------------------
+
+    def column_stats(self) -> pd.DataFrame:
+        """count / mean / std / min / max / sum per tracked column"""
+        m = self.moments
+        count = m.count()
+        return pd.DataFrame({
+            'count': count,
+            'mean': m.means(),
+            'std': m.std(),
+            'min': np.where(count > 0, m.min, np.nan),
+            'max': np.where(count > 0, m.max, np.nan),
+            'sum': m.total,
+        }, index=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        return pd.DataFrame(self.moments.corr(), index=self.columns, columns=self.columns)
+
+    def group_stats(self, column: str, order: Sequence[str] = None) -> pd.DataFrame:
+        """
+        Per-group rows plus count / mean / std / min / max of group_columns,
+        with a (column, statistic) MultiIndex on the columns
+        """
+        groups = self.groups.get(column, {})
+        keys = list(order) if order is not None else sorted(groups)
+        frame = {}
+        for j, value_column in enumerate(self.group_columns):
+            for stat in ['count', 'mean', 'std', 'min', 'max']:
+                values = []
+                for key in keys:
+                    entry = groups.get(key)
+                    if entry is None or entry['moments'].count()[j] == 0:
+                        values.append(0 if stat == 'count' else np.nan)
+                        continue
+                    m = entry['moments']
+                    values.append({'count': m.count()[j], 'mean': m.means()[j], 'std': m.std()[j],
+                                   'min': m.min[j], 'max': m.max[j]}[stat])
+                frame[(value_column, stat)] = values
+        stats = pd.DataFrame(frame, index=pd.Index(keys, name=column))
+        stats[('rows', 'count')] = [groups[k]['rows'] if k in groups else 0 for k in keys]
+        return stats
+
+    def ranking(self, name: str) -> pd.DataFrame:
+        spec = self.rankings[name]
+        return pd.DataFrame(self.top[name], columns=spec['fields'])
+
+    # -- Persistence ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            'config': {'columns': self.columns, 'group_by': self.group_by,
+                       'group_columns': self.group_columns, 'rankings': self.rankings,
+                       'distinct': self.distinct_columns, 'bins': self.bins, 'key': self.key},
+            'rows': self.rows,
+            'fields_seen': self.fields_seen,
+            'moments': self.moments.to_dict(),
+            'groups': {column: {key: {'rows': entry['rows'], 'moments': entry['moments'].to_dict()}
+                                for key, entry in groups.items()}
+                       for column, groups in self.groups.items()},
+            'top': self.top,
+            'distinct': {column: sorted(values) for column, values in self.distinct.items()},
+            'files': self.files,
+        }
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_dict(cls, document: Dict) -> 'AnalysisState':
+        state = cls(**document['config'])
+        state.rows = document['rows']
+        state.fields_seen = document['fields_seen']
+        state.moments = PairwiseMoments.from_dict(document['moments'])
+        state.groups = {column: {key: {'rows': entry['rows'], 'moments': PairwiseMoments.from_dict(entry['moments'])}
+                                 for key, entry in groups.items()}
+                        for column, groups in document['groups'].items()}
+        state.top = document['top']
+        state.distinct = {column: set(values) for column, values in document['distinct'].items()}
+        state.files = document['files']
+        return state
+
+    @classmethod
+    def load(cls, path: str, **config) -> 'AnalysisState':
+        """
+        Saved state from path, or a fresh state when the file is missing or
+        was written with a different configuration
+        """
+        fresh = cls(**config)
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    document = json.load(f)
+                if document['config'] == fresh.to_dict()['config']:
+                    return cls.from_dict(document)
+                print("Analysis configuration changed; rebuilding analysis state")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not read analysis state {path}: {e}; rebuilding")
+        return fresh
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **config) -> 'AnalysisState':
+        state = cls(**config)
+        state.update(df)
+        return state
@@ -0,0 +1,404 @@
+"""
+Spatial Autocorrelation and Hotspot Analysis
+Global and Local Moran's I and Getis-Ord Gi* over sparse k-nearest-neighbour
+or distance-band weights built from latitude/longitude. Every statistic and
+permutation test is a sparse matrix-vector (or matrix-block) product, so the
+cost grows with the number of neighbour links rather than N², and gridded or
+ward-level data with millions of points fits in memory
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data_collection'))
+from paths import REPORTS_DIR, latest_dataset
+from instrumentation import timed
+from imputation import CitySpatialIndex, EARTH_RADIUS_KM
+
+try:
+    from scipy import sparse
+    from scipy.special import ndtr
+except ImportError:
+    raise ImportError("scipy is required for spatial statistics: pip install scipy")
+
+# Variables tested for spatial clustering by default
+SPATIAL_COLUMNS = [
+    'UHI Intensity (°C)',
+    'Temperature (°C)',
+    'Impervious Surface (%)',
+    'NDVI',
+    'Urban Greenness Ratio (%)',
+    'Population Density (people/km²)',
+    'Anthropogenic Heat Flux (W/m²)',
+]
+
+# Local Moran cluster codes (value vs spatial lag, both relative to the mean)
+QUADRANTS = {0: 'Not Significant', 1: 'High-High', 2: 'Low-High', 3: 'Low-Low', 4: 'High-Low'}
+
+# Upper bound on floats held by one block of permutations
+PERMUTATION_BLOCK_ELEMENTS = 2 ** 23
+
+
+class SpatialWeights:
+    """
+    Sparse spatial weights: W[i, j] > 0 when j is a neighbour of i
+    The diagonal is always zero; Gi* adds the self weight itself
+    """
+
+    def __init__(self, matrix, transform: str = 'r'):
+        self.binary = sparse.csr_matrix(matrix, dtype=float)
+        self.binary.setdiag(0)
+        self.binary.eliminate_zeros()
+        self.binary.sort_indices()
+        self.n = self.binary.shape[0]
+        self.cardinalities = np.diff(self.binary.indptr)
+        self.transform = transform
+        if transform == 'r':
+            # Row-standardize; islands (no neighbours) keep an empty row
+            scale = 1.0 / np.maximum(self.cardinalities, 1)
+            self.matrix = sparse.diags(scale) @ self.binary
+        elif transform == 'b':
+            self.matrix = self.binary
+        else:
+            raise ValueError(f"Unknown weights transform: {transform} (use 'r' or 'b')")
+        self.matrix = sparse.csr_matrix(self.matrix)
+
+    @classmethod
+    def knn(cls, lat, lon, k: int = 8, transform: str = 'r') -> 'SpatialWeights':
+        """Each point's k nearest other points on the sphere"""
+        index = CitySpatialIndex(lat, lon)
+        n = len(index)
+        k = min(k, n - 1)
+        _, indices = index.query(index.lat, index.lon, k=k + 1)
+        # Drop each point itself; with more than k+1 coincident points self may
+        # not be returned, in which case the farthest candidate is dropped instead
+        keep = indices != np.arange(n)[:, None]
+        keep[keep.all(axis=1), -1] = False
+        columns = indices[keep].reshape(n, k)
+        rows = np.repeat(np.arange(n), k)
+        matrix = sparse.csr_matrix((np.ones(n * k), (rows, columns.ravel())), shape=(n, n))
+        return cls(matrix, transform)
+
+    @classmethod
+    def distance_band(cls, lat, lon, distance_km: float, transform: str = 'r') -> 'SpatialWeights':
+        """Every pair of points within distance_km (great-circle) of each other"""
+        index = CitySpatialIndex(lat, lon)
+        if index.tree is None:
+            raise ImportError("scipy is required for distance-band weights: pip install scipy")
+        # Great-circle distance -> chord length between unit vectors
+        chord = 2.0 * np.sin(min(distance_km / (2.0 * EARTH_RADIUS_KM), np.pi / 2))
+        pairs = index.tree.query_pairs(chord, output_type='ndarray')
+        n = len(index)
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        columns = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(n, n))
+        return cls(matrix, transform)
+
+    @property
+    def nnz(self) -> int:
+        return self.matrix.nnz
+
+    @property
+    def islands(self) -> int:
+        return int((self.cardinalities == 0).sum())
+
+    def moments(self) -> Dict[str, float]:
+        """S0, S1 and S2 sums used by the analytical Moran's I variance"""
+        w = self.matrix
+        symmetric = w + w.T
+        row, column = np.asarray(w.sum(axis=1)).ravel(), np.asarray(w.sum(axis=0)).ravel()
+        return {
+            's0': float(w.sum()),
+            's1': 0.5 * float(symmetric.multiply(symmetric).sum()),
+            's2': float(((row + column) ** 2).sum()),
+        }
+
+    def summary(self) -> str:
+        mean = self.cardinalities.mean() if self.n else 0.0
+        return (f"{self.n:,} points, {self.binary.nnz:,} links, "
+                f"{mean:.1f} neighbours on average, {self.islands} islands")
+
+
+def _blocks(permutations: int, per_permutation: int):
+    """Split permutations into blocks that keep per_permutation * block floats in memory"""
+    block = max(1, min(permutations, PERMUTATION_BLOCK_ELEMENTS // max(per_permutation, 1)))
+    for start in range(0, permutations, block):
+        yield min(block, permutations - start)
+
+
+def _pseudo_p(larger: np.ndarray, permutations: int) -> np.ndarray:
+    """Folded pseudo p-value from the count of simulated values >= the observed one"""
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1.0) / (permutations + 1.0)
+
+
+def _conditional_lags(weights: SpatialWeights, z: np.ndarray, size: int,
+                      rng: np.random.Generator) -> np.ndarray:
+    """
+    Spatial lags of z under conditional randomization: each point keeps its
+    value and its weights, and every neighbour value is redrawn from the other
+    n-1 points. Returns an (n, size) block as one sparse product
+    Neighbours are drawn with replacement, which matches drawing without
+    replacement for k << n
+    """
+    w = weights.matrix
+    n = weights.n
+    rows = np.repeat(np.arange(n), np.diff(w.indptr))
+    draws = rng.integers(0, n - 1, size=(w.nnz, size))
+    draws += draws >= rows[:, None]
+    # Row i of `gather` sums the (weighted) draws that belong to point i
+    gather = sparse.csr_matrix((w.data, np.arange(w.nnz), w.indptr), shape=(n, w.nnz))
+    return gather @ z[draws]
+
+
+@timed('spatial')
+def global_moran(x, weights: SpatialWeights, permutations: int = 999, seed: Optional[int] = None) -> Dict:
+    """
+    Global Moran's I with its analytical (normality) z-score and, when
+    permutations > 0, a pseudo p-value from random relabellings of x
+    """
+    z = np.asarray(x, dtype=float)
+    z = z - z.mean()
+    n = weights.n
+    moments = weights.moments()
+    s0 = moments['s0']
+    denominator = float(z @ z)
+    statistic = n / s0 * float(z @ (weights.matrix @ z)) / denominator
+
+    expected = -1.0 / (n - 1)
+    variance = ((n * n * moments['s1'] - n * moments['s2'] + 3 * s0 * s0)
+                / ((n * n - 1) * s0 * s0) - expected ** 2)
+    z_norm = (statistic - expected) / np.sqrt(variance)
+    result = {
+        'I': statistic, 'expected': expected, 'z_norm': z_norm,
+        'p_norm': 2.0 * ndtr(-abs(z_norm)), 'n': n,
+    }
+
+    if permutations:
+        rng = np.random.default_rng(seed)
+        simulated = []
+        for size in _blocks(permutations, n):
+            shuffled = rng.permuted(np.tile(z, (size, 1)), axis=1).T
+            lags = weights.matrix @ shuffled
+            simulated.append(n / s0 * (shuffled * lags).sum(axis=0) / denominator)
+        simulated = np.concatenate(simulated)
+        result['p_sim'] = float(_pseudo_p(np.array((simulated >= statistic).sum()), permutations))
+        result['z_sim'] = (statistic - simulated.mean()) / simulated.std()
+    return result
+
+
+@timed('spatial')
+def local_moran(x, weights: SpatialWeights, permutations: int = 999, seed: Optional[int] = None,
+                alpha: float = 0.05) -> pd.DataFrame:
+    """
+    Local Moran's I per point with conditional-permutation pseudo p-values
+    and the LISA cluster (High-High, Low-Low, ...) of significant points
+    """
+    z = np.asarray(x, dtype=float)
+    z = z - z.mean()
+    m2 = float(z @ z) / weights.n
+    lag = weights.matrix @ z
+    statistic = z * lag / m2
+
+    quadrant = np.where(z > 0, np.where(lag > 0, 1, 4), np.where(lag > 0, 2, 3))
+    result = {'Local I': statistic, 'Spatial Lag': lag}
+    if permutations:
+        rng = np.random.default_rng(seed)
+        larger = np.zeros(weights.n)
+        for size in _blocks(permutations, weights.nnz + weights.n):
+            simulated = z[:, None] * _conditional_lags(weights, z, size, rng) / m2
+            larger += (simulated >= statistic[:, None]).sum(axis=1)
+        p_sim = _pseudo_p(larger, permutations)
+        result['p_sim'] = p_sim
+        quadrant = np.where(p_sim <= alpha, quadrant, 0)
+    result['Cluster'] = pd.Categorical.from_codes(quadrant, categories=list(QUADRANTS.values()))
+    return pd.DataFrame(result)
+
+
+@timed('spatial')
+def getis_ord_g_star(x, weights: SpatialWeights, permutations: int = 0, seed: Optional[int] = None,
+                     alpha: float = 0.05) -> pd.DataFrame:
+    """
+    Getis-Ord Gi* z-scores (each point counts as its own neighbour, binary
+    weights). Positive significant scores are hot spots, negative cold spots
+    """
+    x = np.asarray(x, dtype=float)
+    n = weights.n
+    mean = x.mean()
+    s = np.sqrt((x @ x) / n - mean ** 2)
+    w = weights.binary
+    # Self weight 1 on top of the neighbour links
+    weight_sum = weights.cardinalities + 1.0
+    weight_sq = np.asarray(w.multiply(w).sum(axis=1)).ravel() + 1.0
+    spread = s * np.sqrt((n * weight_sq - weight_sum ** 2) / (n - 1))
+    local_sum = x + w @ x
+    z_score = (local_sum - mean * weight_sum) / spread
+
+    p_norm = 2.0 * ndtr(-np.abs(z_score))
+    result = {'Gi* z': z_score, 'p_norm': p_norm}
+    significant = p_norm <= alpha
+    if permutations:
+        rng = np.random.default_rng(seed)
+        binary = SpatialWeights(w, transform='b')
+        larger = np.zeros(n)
+        for size in _blocks(permutations, w.nnz + n):
+            simulated = (x[:, None] + _conditional_lags(binary, x, size, rng)
+                         - mean * weight_sum[:, None]) / spread[:, None]
+            larger += (simulated >= z_score[:, None]).sum(axis=1)
+        result['p_sim'] = _pseudo_p(larger, permutations)
+        significant = result['p_sim'] <= alpha
+    codes = np.where(significant, np.where(z_score > 0, 1, 2), 0)
+    result['Hotspot'] = pd.Categorical.from_codes(codes, categories=['Not Significant', 'Hot Spot', 'Cold Spot'])
+    return pd.DataFrame(result)
+
+
+def build_weights(lat, lon, k: int = 8, distance_km: float = None, transform: str = 'r') -> SpatialWeights:
+    """kNN weights, or distance-band weights when distance_km is given"""
+    if distance_km is not None:
+        return SpatialWeights.distance_band(lat, lon, distance_km, transform)
+    return SpatialWeights.knn(lat, lon, k, transform)
+
+
+class SpatialAnalysis:
+    """
+    Runs the spatial statistics over the columns of a frame, building weights
+    once per set of complete rows (columns with missing values get weights over
+    their own observed points)
+    """
+
+    def __init__(self, df: pd.DataFrame, k: int = 8, distance_km: float = None,
+                 transform: str = 'r', lat_column: str = 'Latitude', lon_column: str = 'Longitude'):
+        self.df = df
+        self.k = k
+        self.distance_km = distance_km
+        self.transform = transform
+        self.lat = pd.to_numeric(df[lat_column], errors='coerce').to_numpy(dtype=float)
+        self.lon = pd.to_numeric(df[lon_column], errors='coerce').to_numpy(dtype=float)
+        self._weights = {}
+
+    def weights_for(self, mask: np.ndarray) -> SpatialWeights:
+        key = mask.tobytes()
+        if key not in self._weights:
+            self._weights[key] = build_weights(self.lat[mask], self.lon[mask], self.k,
+                                               self.distance_km, self.transform)
+        return self._weights[key]
+
+    def _column(self, column: str):
+        values = pd.to_numeric(self.df[column], errors='coerce').to_numpy(dtype=float)
+        mask = np.isfinite(values) & np.isfinite(self.lat) & np.isfinite(self.lon)
+        return values[mask], mask
+
+    def global_table(self, columns: List[str], permutations: int = 999, seed: Optional[int] = None) -> pd.DataFrame:
+        """Global Moran's I for each column, strongest clustering first"""
+        rows = []
+        for column in columns:
+            if column not in self.df.columns:
+                continue
+            values, mask = self._column(column)
+            if mask.sum() < 3 or np.nanstd(values) == 0:
+                continue
+            result = global_moran(values, self.weights_for(mask), permutations, seed)
+            rows.append(dict(Variable=column, **result))
+        table = pd.DataFrame(rows)
+        return table.sort_values('I', ascending=False, ignore_index=True) if len(table) else table
+
+    def local_table(self, column: str, permutations: int = 999, seed: Optional[int] = None,
+                    alpha: float = 0.05, gi_permutations: int = 0) -> pd.DataFrame:
+        """Local Moran's I and Gi* per point of one column, indexed like the frame"""
+        values, mask = self._column(column)
+        weights = self.weights_for(mask)
+        lisa = local_moran(values, weights, permutations, seed, alpha)
+        gi = getis_ord_g_star(values, weights, gi_permutations, seed, alpha)
+        table = pd.concat([lisa, gi.rename(columns={'p_norm': 'Gi* p_norm', 'p_sim': 'Gi* p_sim'})], axis=1)
+        table.index = self.df.index[mask]
+        table.insert(0, column, values)
+        return table
+
+
+def print_global(table: pd.DataFrame, weights: Optional[SpatialWeights] = None):
+    """Global Moran's I table"""
+    if weights is not None:
+        print(f"Weights: {weights.summary()}")
+    print(f"\n{'Variable':40s} {'Moran I':>9s} {'z (norm)':>9s} {'p (norm)':>9s} {'p (perm)':>9s}")
+    print("-" * 80)
+    for row in table.itertuples(index=False):
+        p_sim = getattr(row, 'p_sim', np.nan)
+        print(f"{row.Variable:40s} {row.I:+9.3f} {row.z_norm:+9.2f} {row.p_norm:9.4f} {p_sim:9.4f}")
+
+
+def print_hotspots(df: pd.DataFrame, table: pd.DataFrame, column: str, top: int = 10,
+                   label_column: str = 'City Name'):
+    """Cluster counts and the strongest hot and cold spots of one column"""
+    print(f"\nLISA clusters ({column}):")
+    for cluster, count in table['Cluster'].value_counts().reindex(list(QUADRANTS.values())).items():
+        print(f"  {cluster:16s} {count:,}")
+    print(f"Getis-Ord Gi* ({column}):")
+    for hotspot, count in table['Hotspot'].value_counts().items():
+        print(f"  {hotspot:16s} {count:,}")
+
+    labels = df[label_column].reindex(table.index) if label_column in df.columns else \
+        pd.Series(table.index.astype(str), index=table.index)
+    for title, ranked in [("🔥 Strongest hot spots", table.nlargest(top, 'Gi* z')),
+                          ("🌿 Strongest cold spots", table.nsmallest(top, 'Gi* z'))]:
+        print(f"\n{title}:")
+        for i, (index, row) in enumerate(ranked.iterrows(), 1):
+            print(f"{i:2d}. {str(labels[index]):20s} Gi* z = {row['Gi* z']:+.2f} "
+                  f"({row['Hotspot']}), {column} = {row[column]:.2f}, LISA: {row['Cluster']}")
+
+
+def main():
+    """Spatial autocorrelation and hotspots of a UHI dataset"""
+    parser = argparse.ArgumentParser(description='Spatial autocorrelation and hotspot analysis')
+    parser.add_argument('path', nargs='?', help='Dataset CSV (default: latest processed dataset)')
+    parser.add_argument('--columns', nargs='+', default=SPATIAL_COLUMNS, help='Variables to test')
+    parser.add_argument('--local', default='UHI Intensity (°C)', help='Variable for local statistics')
+    parser.add_argument('--k', type=int, default=8, help='Nearest neighbours per point')
+    parser.add_argument('--distance-km', type=float, help='Use distance-band weights instead of kNN')
+    parser.add_argument('--transform', choices=['r', 'b'], default='r',
+                        help='Row-standardized (r) or binary (b) weights for Moran\'s I')
+    parser.add_argument('--permutations', type=int, default=999, help='Permutations for pseudo p-values')
+    parser.add_argument('--gi-permutations', type=int, default=0,
+                        help='Permutations for Gi* (default: normal approximation only)')
+    parser.add_argument('--alpha', type=float, default=0.05, help='Significance level for clusters')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the permutations')
+    parser.add_argument('--output', help='Save local statistics to this CSV (default: outputs/reports/)')
+    args = parser.parse_args()
+
+    path = args.path or latest_dataset()
+    if path is None:
+        print("No dataset found! Please run enhanced_collector.py first.")
+        return
+    print("=" * 80)
+    print("SPATIAL AUTOCORRELATION ANALYSIS")
+    print("=" * 80)
+    print(f"Dataset: {path}")
+    df = pd.read_csv(path)
+
+    started = time.perf_counter()
+    analysis = SpatialAnalysis(df, k=args.k, distance_km=args.distance_km, transform=args.transform)
+    table = analysis.global_table(args.columns, args.permutations, args.seed)
+    complete = np.isfinite(analysis.lat) & np.isfinite(analysis.lon)
+    print_global(table, analysis.weights_for(complete) if complete.all() else None)
+
+    local = analysis.local_table(args.local, args.permutations, args.seed, args.alpha, args.gi_permutations)
+    print_hotspots(df, local, args.local)
+
+    output = args.output or os.path.join(REPORTS_DIR, f"spatial_hotspots_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    columns = [c for c in ['City Name', 'State', 'Latitude', 'Longitude'] if c in df.columns]
+    df[columns].join(local, how='inner').to_csv(output, index=False)
+    print(f"\n✓ Local statistics saved to: {output}")
+    print(f"Completed in {time.perf_counter() - started:.2f}s")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
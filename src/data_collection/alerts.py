@@ -0,0 +1,579 @@
+"""
+Heatwave and UHI Alert Engine
+Long-running service that polls live weather for every location through the
+batched, cached weather provider and evaluates threshold and persistence
+rules (IMD-style heatwave criteria, UHI intensity above X for N hours) over
+per-location state held in fixed-size arrays. Each update is a handful of
+vectorized operations over all locations, constant work per location, and
+raised / cleared alerts go to local sinks (JSON lines, SQLite, webhook, console)
+"""
+
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Sequence
+import argparse
+import json
+import sqlite3
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import ALERTS_DIR, latest_dataset
+from indian_cities import get_catalogue
+from imputation import CitySpatialIndex
+from uncertainty import uhi_intensity
+from heat_stress import heat_index
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Static per-location features taken from the nearest city of the latest dataset
+STATIC_FEATURES = {
+    'impervious': 'Impervious Surface (%)',
+    'ndvi': 'NDVI',
+    'albedo': 'Albedo',
+    'elevation': 'Elevation (m)',
+    'distance_to_water': 'Distance to Water (km)',
+}
+
+# IMD heatwave criteria: a station qualifies once Tmax reaches the base for its
+# terrain and departs from normal by 4.5°C (6.5°C: severe); in the plains Tmax
+# >= 45°C (47°C: severe) qualifies regardless of the normal. Declared once the
+# criteria hold on `days` consecutive days.
+HEATWAVE_BASE = {'plains': 40.0, 'coastal': 37.0, 'hilly': 30.0}
+HILLY_ELEVATION_M = 1000.0
+COASTAL_MAX_ELEVATION_M = 50.0
+COASTAL_MAX_DISTANCE_KM = 20.0
+
+# Alert rules
+#   threshold: field (optionally smoothed over window_minutes) above a value for hours
+#   heatwave:  IMD criteria on daily maximum temperature
+DEFAULT_RULES = [
+    {'name': 'heatwave', 'type': 'heatwave', 'days': 2, 'normal_days': 30, 'min_normal_days': 7},
+    {'name': 'extreme_heat', 'type': 'threshold', 'field': 'temperature', 'above': 45.0,
+     'hours': 1, 'severity': 'severe'},
+    {'name': 'uhi_intensity', 'type': 'threshold', 'field': 'uhi_intensity', 'above': 3.5,
+     'hours': 3, 'window_minutes': 60, 'severity': 'warning'},
+    {'name': 'heat_stress_humidity', 'type': 'threshold', 'field': 'heat_index', 'above': 41.0,
+     'hours': 2, 'window_minutes': 30, 'severity': 'warning'},
+]
+
+ALERT_FIELDS = ['time', 'rule', 'severity', 'status', 'location', 'state', 'lat', 'lon',
+                'value', 'threshold', 'duration_hours']
+
+
+class RingBuffer:
+    """
+    Fixed-size rolling window for n locations at once: push() overwrites the
+    oldest column and keeps running sums, so mean() never rescans the window
+    """
+
+    def __init__(self, n: int, size: int):
+        self.values = np.full((n, max(size, 1)), np.nan)
+        self.head = 0
+        self.sum = np.zeros(n)
+        self.count = np.zeros(n)
+
+    def push(self, values: np.ndarray):
+        oldest = self.values[:, self.head]
+        present = ~np.isnan(oldest)
+        self.sum -= np.where(present, oldest, 0.0)
+        self.count -= present
+        self.values[:, self.head] = values
+        present = ~np.isnan(values)
+        self.sum += np.where(present, values, 0.0)
+        self.count += present
+        self.head = (self.head + 1) % self.values.shape[1]
+
+    def mean(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.sum / self.count, np.nan)
+
+
+class ThresholdRule:
+    """
+    Raised once a field (or its rolling mean) stays above a threshold for
+    `hours`; cleared when it drops back. Missing values neither extend nor
+    break a run, so a failed poll does not reset persistence
+    """
+
+    def __init__(self, name: str, n: int, field: str, above: float, hours: float = 0.0,
+                 window_minutes: float = 0.0, interval: float = 60.0, severity: str = 'warning'):
+        self.name = name
+        self.field = field
+        self.threshold = above
+        self.duration = hours * 3600.0
+        self.severity = severity
+        samples = int(round(window_minutes * 60.0 / interval))
+        self.window = RingBuffer(n, samples) if samples > 1 else None
+        self.since = np.full(n, np.nan)
+        self.active = np.zeros(n, dtype=bool)
+
+    def update(self, t: float, fields: Dict[str, np.ndarray]) -> List:
+        """[(status, severity, indices, values)] for locations whose alert state changed"""
+        values = fields[self.field]
+        if self.window is not None:
+            self.window.push(values)
+            values = self.window.mean()
+        known = ~np.isnan(values)
+        met = known & (values > self.threshold)
+        self.since = np.where(known & ~met, np.nan, np.where(met & np.isnan(self.since), t, self.since))
+        active = ~np.isnan(self.since) & (t - self.since >= self.duration)
+        raised, cleared = active & ~self.active, ~active & self.active
+        self.active = active
+        return [('raised', self.severity, np.flatnonzero(raised), values),
+                ('cleared', self.severity, np.flatnonzero(cleared), values)]
+
+    def durations(self, t: float, indices: np.ndarray) -> np.ndarray:
+        return np.nan_to_num(t - self.since[indices]) / 3600.0
+
+
+class HeatwaveRule:
+    """
+    IMD-style heatwave on daily maximum temperature per location
+    Today's running maximum is compared with the terrain base and with the
+    normal, the mean of the last normal_days completed days (a ring buffer);
+    streaks of qualifying days are counted at each local-day rollover. Until
+    the provider's temp_max is known for the day, the running maximum is only
+    a lower bound, so it can raise but never clear or downgrade an alert
+    """
+
+    def __init__(self, name: str, n: int, terrain: np.ndarray, days: int = 2, normal_days: int = 30,
+                 min_normal_days: int = 7, departure: float = 4.5, severe_departure: float = 6.5,
+                 absolute: float = 45.0, severe_absolute: float = 47.0):
+        self.name = name
+        self.field = 'temp_max'
+        self.days = days
+        self.min_normal_days = min_normal_days
+        self.departure, self.severe_departure = departure, severe_departure
+        self.base = np.array([HEATWAVE_BASE[kind] for kind in terrain])
+        plains = np.asarray(terrain) == 'plains'
+        self.absolute = np.where(plains, absolute, np.inf)
+        self.severe_absolute = np.where(plains, severe_absolute, np.inf)
+        self.history = RingBuffer(n, normal_days)
+        self.today = np.full(n, np.nan)
+        self.complete = np.zeros(n, dtype=bool)
+        self.day = None
+        self.streak = np.zeros(n, dtype=np.int32)
+        self.active = np.zeros(n, dtype=bool)
+        self.severe = np.zeros(n, dtype=bool)
+
+    def _criteria(self, tmax: np.ndarray):
+        normal = np.where(self.history.count >= self.min_normal_days, self.history.mean(), np.nan)
+        departure = tmax - normal
+        with np.errstate(invalid='ignore'):
+            above_base = tmax >= self.base
+            heatwave = (above_base & (departure >= self.departure)) | (tmax >= self.absolute)
+            severe = (above_base & (departure >= self.severe_departure)) | (tmax >= self.severe_absolute)
+        return heatwave, severe
+
+    def update(self, t: float, fields: Dict[str, np.ndarray]) -> List:
+        day = int((t + IST.utcoffset(None).total_seconds()) // 86400)
+        if self.day is not None and day != self.day:
+            # Close the finished day: extend or reset streaks, then add it to the normal.
+            # A day without the provider's daily max only extends a streak, and stays out of the normal
+            qualified, _ = self._criteria(self.today)
+            self.streak = np.where(qualified, self.streak + 1, np.where(self.complete, 0, self.streak))
+            self.history.push(np.where(self.complete, self.today, np.nan))
+            self.today = np.full_like(self.today, np.nan)
+            self.complete[:] = False
+        self.day = day
+
+        self.complete |= ~np.isnan(fields['temp_max'])
+        self.today = np.fmax(self.today, np.fmax(fields['temp_max'], fields['temperature']))
+        heatwave, severe = self._criteria(self.today)
+        active = heatwave & (self.streak + 1 >= self.days)
+        severe = active & severe
+        # Carry the last state forward while today's maximum is incomplete
+        active = np.where(self.complete, active, active | self.active)
+        severe = np.where(self.complete, severe, severe | self.severe)
+        raised, cleared = active & ~self.active, ~active & self.active
+        escalated = severe & ~self.severe & ~raised
+        self.active, self.severe = active, severe
+        return [('raised', 'severe', np.flatnonzero(raised & severe), self.today),
+                ('raised', 'warning', np.flatnonzero(raised & ~severe), self.today),
+                ('escalated', 'severe', np.flatnonzero(escalated), self.today),
+                ('cleared', 'warning', np.flatnonzero(cleared), self.today)]
+
+    @property
+    def threshold(self):
+        return self.base
+
+    def durations(self, t: float, indices: np.ndarray) -> np.ndarray:
+        return (self.streak[indices] + 1) * 24.0
+
+
+def terrain_classes(elevation: np.ndarray, distance_to_water: np.ndarray) -> np.ndarray:
+    """IMD terrain class per location: hilly, coastal or plains"""
+    return np.select(
+        [elevation >= HILLY_ELEVATION_M,
+         (elevation < COASTAL_MAX_ELEVATION_M) & (distance_to_water <= COASTAL_MAX_DISTANCE_KM)],
+        ['hilly', 'coastal'],
+        default='plains',
+    )
+
+
+def static_features(lat: np.ndarray, lon: np.ndarray, dataset: str = None) -> Dict[str, np.ndarray]:
+    """Per-location land surface features from the nearest city in the latest dataset"""
+    path = dataset or latest_dataset()
+    if path is None:
+        print("No dataset found; UHI intensity uses typical urban values")
+        defaults = {'impervious': 60.0, 'ndvi': 0.1, 'albedo': 0.15, 'elevation': 200.0,
+                    'distance_to_water': 25.0}
+        return {key: np.full(len(lat), value) for key, value in defaults.items()}
+    df = pd.read_csv(path, usecols=['Latitude', 'Longitude'] + list(STATIC_FEATURES.values()))
+    _, nearest = CitySpatialIndex(df['Latitude'], df['Longitude']).query(lat, lon, k=1)
+    return {key: df[column].to_numpy(dtype=float)[nearest[:, 0]] for key, column in STATIC_FEATURES.items()}
+
+
+class AlertEngine:
+    """Derived fields and every rule's state for a fixed set of locations"""
+
+    def __init__(self, names: Sequence[str], states: Sequence[str], lat, lon,
+                 features: Dict[str, np.ndarray], rules: List[Dict] = None, interval: float = 60.0):
+        self.names = np.asarray(names, dtype=object)
+        self.states = np.asarray(states, dtype=object)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.features = features
+        self.terrain = terrain_classes(features['elevation'], features['distance_to_water'])
+        self.rules = [self.build_rule(spec, interval) for spec in (rules or DEFAULT_RULES)]
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def build_rule(self, spec: Dict, interval: float):
+        n = len(self)
+        if spec['type'] == 'threshold':
+            return ThresholdRule(spec['name'], n, spec['field'], spec['above'], spec.get('hours', 0.0),
+                                 spec.get('window_minutes', 0.0), interval, spec.get('severity', 'warning'))
+        if spec['type'] == 'heatwave':
+            options = {key: value for key, value in spec.items() if key not in ('name', 'type')}
+            return HeatwaveRule(spec['name'], n, self.terrain, **options)
+        raise ValueError(f"Unknown rule type '{spec['type']}'")
+
+    def derive(self, weather: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Weather fields plus UHI intensity and heat index"""
+        fields = dict(weather)
+        fields['uhi_intensity'] = uhi_intensity(self.features['impervious'], self.features['ndvi'],
+                                                self.features['albedo'], weather['wind_speed'])
+        # A failed poll leaves wind NaN, which uhi_intensity treats as calm; keep it missing instead
+        fields['uhi_intensity'] = np.where(np.isnan(weather['temperature']), np.nan, fields['uhi_intensity'])
+        fields['heat_index'] = heat_index(weather['temperature'], weather['humidity'])
+        return fields
+
+    def update(self, t: float, weather: Dict[str, np.ndarray]) -> List[Dict]:
+        """Fold one observation per location into every rule; returns the alerts that changed"""
+        fields = self.derive(weather)
+        alerts = []
+        stamp = datetime.fromtimestamp(t, IST).isoformat(timespec='seconds')
+        for rule in self.rules:
+            for status, severity, indices, values in rule.update(t, fields):
+                if not len(indices):
+                    continue
+                threshold = np.broadcast_to(rule.threshold, len(self))[indices]
+                durations = rule.durations(t, indices)
+                for i, index in enumerate(indices):
+                    alerts.append({
+                        'time': stamp, 'rule': rule.name, 'severity': severity, 'status': status,
+                        'location': self.names[index], 'state': self.states[index],
+                        'lat': float(self.lat[index]), 'lon': float(self.lon[index]),
+                        'value': round(float(values[index]), 2), 'threshold': float(threshold[i]),
+                        'duration_hours': round(float(durations[i]), 2),
+                    })
+        self.updates += 1
+        return alerts
+
+    def active_counts(self) -> Dict[str, int]:
+        return {rule.name: int(rule.active.sum()) for rule in self.rules}
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+class JsonLinesSink:
+    """Appends one JSON object per alert"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, alerts: List[Dict]):
+        for alert in alerts:
+            self.file.write(json.dumps(alert, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SQLiteSink:
+    """Inserts alerts into an `alerts` table"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS alerts ({', '.join(ALERT_FIELDS)})")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS alerts_location ON alerts (location, time)")
+
+    def write(self, alerts: List[Dict]):
+        if alerts:
+            placeholders = ', '.join('?' * len(ALERT_FIELDS))
+            self.connection.executemany(f"INSERT INTO alerts VALUES ({placeholders})",
+                                        [tuple(alert[field] for field in ALERT_FIELDS) for alert in alerts])
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class WebhookSink:
+    """POSTs each batch of alerts as a JSON array; a stub that only logs without a URL"""
+
+    def __init__(self, url: str = None, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def write(self, alerts: List[Dict]):
+        if not alerts:
+            return
+        if not self.url:
+            print(f"[webhook stub] would POST {len(alerts)} alerts")
+            return
+        import requests
+        try:
+            response = requests.post(self.url, json=alerts, timeout=self.timeout)
+            if response.status_code >= 400:
+                print(f"Webhook error: {response.status_code}")
+        except Exception as e:
+            print(f"Webhook delivery failed: {e}")
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    """Prints each alert on one line"""
+
+    def write(self, alerts: List[Dict]):
+        for alert in alerts:
+            print(f"  [{alert['status'].upper():9s}] {alert['rule']:20s} {alert['severity']:8s} "
+                  f"{alert['location']:20s} value={alert['value']} threshold={alert['threshold']} "
+                  f"({alert['duration_hours']}h)")
+
+    def close(self):
+        pass
+
+
+def build_sink(spec: str):
+    """file:PATH (JSON lines), sqlite:PATH, webhook[:URL] or console"""
+    kind, _, target = spec.partition(':')
+    if kind == 'file':
+        return JsonLinesSink(target or os.path.join(ALERTS_DIR, 'alerts.jsonl'))
+    if kind == 'sqlite':
+        return SQLiteSink(target or os.path.join(ALERTS_DIR, 'alerts.sqlite'))
+    if kind == 'webhook':
+        return WebhookSink(target or None)
+    if kind == 'console':
+        return ConsoleSink()
+    raise ValueError(f"Unknown alert sink '{spec}'")
+
+
+# ---------------------------------------------------------------------------
+# Feeds
+# ---------------------------------------------------------------------------
+
+class ProviderFeed:
+    """
+    Live weather for every location through the configured weather provider,
+    wrapped in a cache: Open-Meteo current conditions only change every 15
+    minutes, so minute-level polls mostly cost nothing
+    """
+
+    def __init__(self, points: List[Dict], cache_ttl: float = 900.0):
+        from providers import CachingProvider, get_providers
+        provider = get_providers()['weather']
+        if cache_ttl and not isinstance(provider, CachingProvider):
+            provider = CachingProvider(provider, ttl_seconds=cache_ttl)
+        self.provider = provider
+        self.points = points
+
+    def poll(self, t: float) -> Dict[str, np.ndarray]:
+        return self.provider.fetch(self.points)
+
+
+class SimulatedFeed:
+    """
+    Synthetic diurnal weather for load tests and dry runs: a daily cycle
+    peaking mid-afternoon around each location's base temperature, plus noise
+    """
+
+    def __init__(self, n: int, base_temperature: np.ndarray = None, heat: float = 0.0, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.base = (np.full(n, 30.0) if base_temperature is None else np.asarray(base_temperature)) + heat
+        self.anomaly = np.zeros(n)
+
+    def poll(self, t: float) -> Dict[str, np.ndarray]:
+        n = len(self.base)
+        hour = datetime.fromtimestamp(t, IST)
+        hour = hour.hour + hour.minute / 60.0
+        # Slow-moving anomaly (AR(1)) plus a 6°C diurnal amplitude peaking at 15:00
+        self.anomaly = 0.999 * self.anomaly + 0.05 * self.rng.standard_normal(n)
+        daily = self.base + self.anomaly
+        temperature = daily + 6.0 * np.cos((hour - 15.0) / 24.0 * 2 * np.pi)
+        return {
+            'temperature': temperature,
+            'temp_max': daily + 6.0,
+            'temp_min': daily - 6.0,
+            'humidity': np.clip(45 - 1.5 * (temperature - daily) + 5 * self.rng.standard_normal(n), 5, 100),
+            'wind_speed': np.abs(8 + 4 * self.rng.standard_normal(n)),
+            'cloud_cover': np.clip(20 + 10 * self.rng.standard_normal(n), 0, 100),
+            'precipitation_sum': np.zeros(n),
+        }
+
+
+class AlertService:
+    """Poll -> update -> deliver loop at a fixed cadence"""
+
+    def __init__(self, engine: AlertEngine, feed, sinks: List, interval: float = 60.0,
+                 clock=time.time, sleep=time.sleep):
+        self.engine = engine
+        self.feed = feed
+        self.sinks = sinks
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self.totals = {'raised': 0, 'escalated': 0, 'cleared': 0}
+        self.timings = {'poll': 0.0, 'update': 0.0}
+
+    def tick(self, t: float) -> List[Dict]:
+        started = time.perf_counter()
+        weather = self.feed.poll(t)
+        polled = time.perf_counter()
+        alerts = self.engine.update(t, weather)
+        updated = time.perf_counter()
+        for sink in self.sinks:
+            sink.write(alerts)
+        self.timings['poll'] += polled - started
+        self.timings['update'] += updated - polled
+        for alert in alerts:
+            self.totals[alert['status']] += 1
+        return alerts
+
+    def run(self, ticks: int = None, verbose_every: int = 1):
+        """Run for `ticks` updates (forever when None); Ctrl+C stops cleanly"""
+        count = 0
+        try:
+            while ticks is None or count < ticks:
+                t = self.clock()
+                alerts = self.tick(t)
+                count += 1
+                if verbose_every and count % verbose_every == 0:
+                    stamp = datetime.fromtimestamp(t, IST).strftime('%Y-%m-%d %H:%M')
+                    active = ', '.join(f"{name} {n}" for name, n in self.engine.active_counts().items())
+                    print(f"{stamp} tick {count}: {len(alerts)} changes; active: {active}")
+                if ticks is None or count < ticks:
+                    self.sleep(max(0.0, self.interval - (self.clock() - t)))
+        except KeyboardInterrupt:
+            print("\nStopping alert service")
+        finally:
+            for sink in self.sinks:
+                sink.close()
+        return count
+
+
+class VirtualClock:
+    """Simulated time advancing one interval per sleep, for fast-forward runs"""
+
+    def __init__(self, start: float, interval: float):
+        self.now = start
+        self.interval = interval
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += self.interval
+
+
+def main():
+    """Run the alert service"""
+    parser = argparse.ArgumentParser(description='Heatwave and UHI alert service')
+    parser.add_argument('--interval', type=float, default=60.0, help='Seconds between updates')
+    parser.add_argument('--ticks', type=int, help='Stop after this many updates (default: run until Ctrl+C)')
+    parser.add_argument('--sink', action='append',
+                        help='file[:PATH], sqlite[:PATH], webhook[:URL] or console (repeatable; '
+                             'default: file and console)')
+    parser.add_argument('--rules', help='JSON file with a list of rule specs (default: built-in rules)')
+    parser.add_argument('--cache-ttl', type=float, default=900.0, help='Weather cache lifetime in seconds')
+    parser.add_argument('--simulate', action='store_true',
+                        help='Use synthetic weather on a virtual clock (no network, no waiting)')
+    parser.add_argument('--locations', type=int,
+                        help='With --simulate: replicate the catalogue to this many locations')
+    parser.add_argument('--heat', type=float, default=0.0, help='With --simulate: warm all locations by this °C')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for --simulate')
+    parser.add_argument('--quiet', action='store_true', help='Only print a summary every 60 ticks')
+    args = parser.parse_args()
+
+    catalogue = get_catalogue()
+    names, states, lat, lon = catalogue.names, catalogue.states, catalogue.lat, catalogue.lon
+    if args.simulate and args.locations:
+        # Jitter copies of the catalogue within ~20 km to stand in for wards or grid cells
+        rng = np.random.default_rng(args.seed)
+        index = np.arange(args.locations) % len(names)
+        names = np.array([f"{names[i]} #{j}" for j, i in enumerate(index)], dtype=object)
+        states = states[index]
+        lat = lat[index] + rng.uniform(-0.2, 0.2, args.locations)
+        lon = lon[index] + rng.uniform(-0.2, 0.2, args.locations)
+
+    rules = None
+    if args.rules:
+        with open(args.rules, encoding='utf-8') as f:
+            rules = json.load(f)
+
+    print("=" * 80)
+    print("HEATWAVE AND UHI ALERT SERVICE")
+    print("=" * 80)
+    features = static_features(lat, lon)
+    engine = AlertEngine(names, states, lat, lon, features, rules, args.interval)
+    terrain = pd.Series(engine.terrain).value_counts()
+    print(f"Locations: {len(engine):,} ({', '.join(f'{k} {v}' for k, v in terrain.items())})")
+    print(f"Rules: {', '.join(rule.name for rule in engine.rules)}")
+
+    sinks = [build_sink(spec) for spec in (args.sink or ['file', 'console'])]
+    if args.simulate:
+        feed = SimulatedFeed(len(engine), heat=args.heat, seed=args.seed)
+        clock = VirtualClock(time.time(), args.interval)
+        service = AlertService(engine, feed, sinks, args.interval, clock=clock, sleep=clock.sleep)
+    else:
+        points = [{'name': n, 'lat': a, 'lon': o} for n, a, o in zip(names, lat, lon)]
+        feed = ProviderFeed(points, args.cache_ttl)
+        service = AlertService(engine, feed, sinks, args.interval)
+    print(f"Update interval: {args.interval:g}s, sinks: {', '.join(type(s).__name__ for s in sinks)}")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    ticks = service.run(args.ticks, verbose_every=60 if args.quiet else 1)
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 80)
+    print(f"{ticks} updates over {len(engine):,} locations in {elapsed:.2f}s")
+    if ticks:
+        print(f"  poll:   {1000 * service.timings['poll'] / ticks:8.2f} ms per update")
+        print(f"  update: {1000 * service.timings['update'] / ticks:8.2f} ms per update "
+              f"({1e6 * service.timings['update'] / ticks / max(len(engine), 1):.3f} µs per location)")
+    print(f"Alerts: {service.totals['raised']} raised, {service.totals['escalated']} escalated, "
+          f"{service.totals['cleared']} cleared")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+City and Ward Catalogue
+Compact struct-of-arrays storage for large sets of city or ward records,
+with fast tier/state/bounding-box filters and cheap iteration
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+CATALOGUE_COLUMNS = ['name', 'state', 'lat', 'lon', 'tier']
+
+
+class CityCatalogue:
+    """
+    Struct-of-arrays catalogue of locations
+
+    Coordinates are float64 arrays, tier is int8 and state is an int16 code into
+    state_labels. Names are kept as one shared UTF-8 buffer with per-record
+    start/end offsets, so filtered views share the buffer instead of copying it.
+    """
+
+    def __init__(self, name_buffer: np.ndarray, name_start: np.ndarray, name_end: np.ndarray,
+                 state_codes: np.ndarray, state_labels: Sequence[str],
+                 lat: np.ndarray, lon: np.ndarray, tier: np.ndarray):
+        self._name_buffer = name_buffer
+        self._name_start = name_start
+        self._name_end = name_end
+        self.state_codes = state_codes
+        self.state_labels = list(state_labels)
+        self.lat = lat
+        self.lon = lon
+        self.tier = tier
+        self._names = None
+        self._index = None
+
+    @classmethod
+    def from_columns(cls, names: Sequence[str], states: Sequence[str], lat: Sequence[float],
+                     lon: Sequence[float], tier: Sequence[int]) -> 'CityCatalogue':
+        """Build a catalogue from parallel column sequences"""
+        encoded = [str(name).encode('utf-8') for name in names]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        name_end = np.cumsum(lengths)
+        name_start = name_end - lengths
+        buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+        codes, labels = pd.factorize(pd.Series(states, dtype=object), sort=True)
+        return cls(
+            name_buffer=buffer,
+            name_start=name_start.astype(np.int32),
+            name_end=name_end.astype(np.int32),
+            state_codes=codes.astype(np.int16),
+            state_labels=list(labels),
+            lat=np.asarray(lat, dtype=np.float64),
+            lon=np.asarray(lon, dtype=np.float64),
+            tier=np.asarray(tier, dtype=np.int8),
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'CityCatalogue':
+        """Build a catalogue from city dicts like INDIAN_CITIES"""
+        return cls.from_columns(
+            [r['name'] for r in records],
+            [r['state'] for r in records],
+            [r['lat'] for r in records],
+            [r['lon'] for r in records],
+            [r['tier'] for r in records],
+        )
+
+    @classmethod
+    def from_csv(cls, path: str, chunksize: int = 500000) -> 'CityCatalogue':
+        """
+        Load city or ward records from a CSV with name, state, lat, lon, tier columns
+        The file is read in chunks so only the compact arrays are held in memory
+        """
+        parts = {column: [] for column in CATALOGUE_COLUMNS}
+        dtypes = {'name': str, 'state': str, 'lat': np.float64, 'lon': np.float64, 'tier': np.int8}
+        for chunk in pd.read_csv(path, usecols=CATALOGUE_COLUMNS, dtype=dtypes, chunksize=chunksize):
+            for column in CATALOGUE_COLUMNS:
+                parts[column].append(chunk[column].to_numpy())
+        columns = {column: np.concatenate(values) if values else np.array([])
+                   for column, values in parts.items()}
+        return cls.from_columns(columns['name'], columns['state'], columns['lat'],
+                                columns['lon'], columns['tier'])
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def names(self) -> np.ndarray:
+        """All names decoded into an object array (cached)"""
+        if self._names is None:
+            raw = self._name_buffer.tobytes()
+            self._names = np.array([raw[s:e].decode('utf-8')
+                                    for s, e in zip(self._name_start.tolist(), self._name_end.tolist())],
+                                   dtype=object)
+        return self._names
+
+    @property
+    def states(self) -> np.ndarray:
+        """State label per record"""
+        return np.asarray(self.state_labels, dtype=object)[self.state_codes]
+
+    def index_of(self, name: str) -> int:
+        """Return the first record with this name, or -1 when there is none"""
+        if self._index is None:
+            self._index = {}
+            for i, city in enumerate(self.names.tolist()):
+                self._index.setdefault(city, i)
+        return self._index.get(name, -1)
+
+    def name(self, i: int) -> str:
+        """Decode a single record's name"""
+        return self._name_buffer[self._name_start[i]:self._name_end[i]].tobytes().decode('utf-8')
+
+    def _take(self, rows: np.ndarray) -> 'CityCatalogue':
+        """View of the selected rows; the name buffer and state labels are shared"""
+        return CityCatalogue(self._name_buffer, self._name_start[rows], self._name_end[rows],
+                             self.state_codes[rows], self.state_labels,
+                             self.lat[rows], self.lon[rows], self.tier[rows])
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]):
+        """Integer -> record dict; slice, index or boolean array -> catalogue view"""
+        if isinstance(key, (int, np.integer)):
+            return self.record(int(key))
+        return self._take(key)
+
+    def record(self, i: int) -> Dict:
+        """Return record i as a dict in the INDIAN_CITIES format"""
+        return {
+            'name': self.name(i),
+            'state': self.state_labels[self.state_codes[i]],
+            'lat': float(self.lat[i]),
+            'lon': float(self.lon[i]),
+            'tier': int(self.tier[i]),
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over record dicts, building each one lazily"""
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def iter_rows(self) -> Iterator[Tuple[str, str, float, float, int]]:
+        """Iterate over (name, state, lat, lon, tier) tuples without building dicts"""
+        labels = self.state_labels
+        return zip(self.names.tolist(), (labels[c] for c in self.state_codes.tolist()),
+                   self.lat.tolist(), self.lon.tolist(), self.tier.tolist())
+
+    def to_records(self) -> List[Dict]:
+        """Materialize all records as a list of dicts"""
+        return [{'name': name, 'state': state, 'lat': lat, 'lon': lon, 'tier': tier}
+                for name, state, lat, lon, tier in self.iter_rows()]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the catalogue as a DataFrame with a categorical state column"""
+        return pd.DataFrame({
+            'name': self.names,
+            'state': pd.Categorical.from_codes(self.state_codes, categories=self.state_labels),
+            'lat': self.lat,
+            'lon': self.lon,
+            'tier': self.tier,
+        })
+
+    def to_csv(self, path: str):
+        """Write the catalogue in the format read by from_csv"""
+        self.to_frame().to_csv(path, index=False)
+
+    def filter(self, tier: Union[int, Sequence[int]] = None, state: Union[str, Sequence[str]] = None,
+               bbox: Tuple[float, float, float, float] = None) -> 'CityCatalogue':
+        """
+        Return a view of the records matching every given filter
+        bbox is (min_lat, min_lon, max_lat, max_lon)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if tier is not None:
+            mask &= np.isin(self.tier, np.atleast_1d(tier))
+        if state is not None:
+            wanted = [self.state_labels.index(s) for s in np.atleast_1d(state) if s in self.state_labels]
+            mask &= np.isin(self.state_codes, wanted)
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            mask &= (self.lat >= min_lat) & (self.lat <= max_lat) & (self.lon >= min_lon) & (self.lon <= max_lon)
+        return self._take(np.flatnonzero(mask))
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this catalogue's arrays"""
+        arrays = [self._name_buffer, self._name_start, self._name_end, self.state_codes,
+                  self.lat, self.lon, self.tier]
+        return sum(a.nbytes for a in arrays) + sum(len(s) for s in self.state_labels)
@@ -0,0 +1,239 @@
+"""
+Offline Elevation from a Local DEM
+Reads SRTM .hgt tiles (and GeoTIFF tiles when rasterio is installed) through
+memory maps, keeps an LRU cache of decoded tiles and answers bulk point
+queries with vectorized bilinear interpolation
+"""
+
+from collections import OrderedDict
+from typing import Dict
+import argparse
+import functools
+import glob
+import re
+import threading
+import time
+import os
+
+import numpy as np
+
+try:
+    import rasterio
+except ImportError:  # rasterio is optional; only .hgt tiles are read without it
+    rasterio = None
+
+# Directory of DEM tiles used by the collectors instead of the elevation API
+DEM_DIR_ENV = 'UHI_DEM_DIR'
+
+HGT_VOID = -32768
+HGT_NAME = re.compile(r'^([NS])(\d{2})([EW])(\d{3})\.hgt$', re.IGNORECASE)
+
+
+class DEMTile:
+    """
+    Decoded elevation grid with its geographic bounds
+    Row 0 is the northern edge and column 0 the western edge; voids are NaN
+    """
+
+    def __init__(self, data: np.ndarray, south: float, west: float, north: float, east: float):
+        self.data = data
+        self.south, self.west, self.north, self.east = south, west, north, east
+        rows, cols = data.shape
+        self.row_scale = (rows - 1) / (north - south)
+        self.col_scale = (cols - 1) / (east - west)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def bilinear(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """
+        Vectorized bilinear interpolation at points inside the tile
+        Void corners are dropped and the remaining weights renormalized
+        """
+        rows, cols = self.data.shape
+        r = np.clip((self.north - lat) * self.row_scale, 0, rows - 1)
+        c = np.clip((lon - self.west) * self.col_scale, 0, cols - 1)
+        r0 = np.minimum(r.astype(np.intp), rows - 2)
+        c0 = np.minimum(c.astype(np.intp), cols - 2)
+        fr, fc = r - r0, c - c0
+
+        corners = np.stack([self.data[r0, c0], self.data[r0, c0 + 1],
+                            self.data[r0 + 1, c0], self.data[r0 + 1, c0 + 1]])
+        weights = np.stack([(1 - fr) * (1 - fc), (1 - fr) * fc, fr * (1 - fc), fr * fc])
+        valid = ~np.isnan(corners)
+        weights = np.where(valid, weights, 0.0)
+        total = weights.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, (weights * np.where(valid, corners, 0.0)).sum(axis=0) / total, np.nan)
+
+
+def read_hgt(path: str) -> DEMTile:
+    """Memory-map an SRTM .hgt tile (1201x1201 SRTM3 or 3601x3601 SRTM1, big-endian int16)"""
+    match = HGT_NAME.match(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"not an SRTM tile name: {path}")
+    ns, lat, ew, lon = match.groups()
+    south = int(lat) * (1 if ns.upper() == 'N' else -1)
+    west = int(lon) * (1 if ew.upper() == 'E' else -1)
+
+    size = int(round(np.sqrt(os.path.getsize(path) // 2)))
+    raw = np.memmap(path, dtype='>i2', mode='r', shape=(size, size))
+    data = raw.astype(np.float32)
+    data[raw == HGT_VOID] = np.nan
+    return DEMTile(data, south, west, south + 1, west + 1)
+
+
+def read_geotiff(path: str) -> DEMTile:
+    """Read a single-band GeoTIFF in a geographic CRS (requires rasterio)"""
+    if rasterio is None:
+        raise ImportError("rasterio is required for GeoTIFF DEM tiles: pip install rasterio")
+    with rasterio.open(path) as src:
+        data = src.read(1, masked=True).astype(np.float32).filled(np.nan)
+        # Pixel-is-area bounds -> centres of the edge pixels, matching .hgt conventions
+        half_x, half_y = abs(src.res[0]) / 2, abs(src.res[1]) / 2
+        bounds = src.bounds
+        return DEMTile(data, bounds.bottom + half_y, bounds.left + half_x,
+                       bounds.top - half_y, bounds.right - half_x)
+
+
+class LocalDEM:
+    """
+    Elevation lookups over a directory of DEM tiles
+    Tiles are decoded on first use and kept in an LRU cache bounded by max_bytes
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # SRTM tiles are addressed by their south-west integer corner
+        self.hgt_tiles = {}
+        for path in glob.glob(os.path.join(directory, '**', '*.hgt'), recursive=True):
+            match = HGT_NAME.match(os.path.basename(path))
+            if match:
+                ns, lat, ew, lon = match.groups()
+                key = (int(lat) * (1 if ns.upper() == 'N' else -1), int(lon) * (1 if ew.upper() == 'E' else -1))
+                self.hgt_tiles[key] = path
+
+        # GeoTIFF tiles are matched by their bounds
+        self.tif_tiles = {}
+        if rasterio is not None:
+            for path in glob.glob(os.path.join(directory, '**', '*.tif'), recursive=True):
+                with rasterio.open(path) as src:
+                    self.tif_tiles[path] = tuple(src.bounds)
+
+    def __len__(self):
+        return len(self.hgt_tiles) + len(self.tif_tiles)
+
+    def tile(self, path: str) -> DEMTile:
+        """Decoded tile from the LRU cache, reading it on a miss"""
+        with self._lock:
+            tile = self._cache.get(path)
+            if tile is not None:
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        tile = read_hgt(path) if path.lower().endswith('.hgt') else read_geotiff(path)
+        with self._lock:
+            if path not in self._cache:
+                self._cache[path] = tile
+                self._cache_bytes += tile.nbytes
+                while self._cache_bytes > self.max_bytes and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= evicted.nbytes
+        return tile
+
+    def elevation(self, lat, lon) -> np.ndarray:
+        """
+        Bilinear elevation (m) at many points at once; NaN where no tile covers a point
+        Points are grouped by tile so each tile is decoded and interpolated once
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        result = np.full(lat.shape, np.nan)
+        pending = np.isfinite(lat) & np.isfinite(lon)
+
+        if self.hgt_tiles and pending.any():
+            rows = np.flatnonzero(pending)
+            # One integer key per 1x1 degree cell, then a single sort to group points by tile
+            keys = (np.floor(lat[rows]).astype(np.int64) + 90) * 360 + (np.floor(lon[rows]).astype(np.int64) + 180)
+            order = np.argsort(keys, kind='stable')
+            cells, starts = np.unique(keys[order], return_index=True)
+            for cell, start, stop in zip(cells.tolist(), starts.tolist(), starts[1:].tolist() + [len(order)]):
+                path = self.hgt_tiles.get((cell // 360 - 90, cell % 360 - 180))
+                if path is None:
+                    continue
+                idx = rows[order[start:stop]]
+                result[idx] = self.tile(path).bilinear(lat[idx], lon[idx])
+            pending &= np.isnan(result)
+
+        for path, (left, bottom, right, top) in self.tif_tiles.items():
+            if not pending.any():
+                break
+            inside = pending & (lat >= bottom) & (lat <= top) & (lon >= left) & (lon <= right)
+            if inside.any():
+                result[inside] = self.tile(path).bilinear(lat[inside], lon[inside])
+                pending &= np.isnan(result)
+
+        return result
+
+    def cache_info(self) -> Dict:
+        return {'tiles': len(self._cache), 'bytes': self._cache_bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+@functools.lru_cache(maxsize=None)
+def get_local_dem() -> LocalDEM:
+    """DEM over UHI_DEM_DIR, or None when the variable is unset or has no tiles"""
+    directory = os.environ.get(DEM_DIR_ENV)
+    if not directory or not os.path.isdir(directory):
+        return None
+    dem = LocalDEM(directory)
+    return dem if len(dem) else None
+
+
+def main():
+    """Look up points or benchmark bulk queries against a DEM directory"""
+    parser = argparse.ArgumentParser(description='Elevation lookups from local DEM tiles')
+    parser.add_argument('directory', nargs='?', default=os.environ.get(DEM_DIR_ENV),
+                        help=f'Directory of .hgt/.tif tiles (default: ${DEM_DIR_ENV})')
+    parser.add_argument('--point', nargs=2, type=float, action='append', metavar=('LAT', 'LON'),
+                        help='Point to look up (repeatable)')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='Query N random points within the available tiles')
+    args = parser.parse_args()
+
+    if not args.directory:
+        parser.error(f"pass a DEM directory or set {DEM_DIR_ENV}")
+    dem = LocalDEM(args.directory)
+    print(f"DEM directory: {args.directory} ({len(dem)} tiles)")
+
+    for lat, lon in args.point or []:
+        print(f"  ({lat:.4f}, {lon:.4f}) -> {dem.elevation(lat, lon)[0]:.1f} m")
+
+    if args.benchmark:
+        if not dem.hgt_tiles:
+            print("Benchmark needs .hgt tiles")
+            return
+        rng = np.random.default_rng(0)
+        corners = np.array(list(dem.hgt_tiles))[rng.integers(len(dem.hgt_tiles), size=args.benchmark)]
+        lat = corners[:, 0] + rng.random(args.benchmark)
+        lon = corners[:, 1] + rng.random(args.benchmark)
+        for label in ['cold', 'warm']:
+            started = time.perf_counter()
+            values = dem.elevation(lat, lon)
+            elapsed = time.perf_counter() - started
+            print(f"  {label}: {args.benchmark:,} points in {elapsed:.2f}s "
+                  f"({args.benchmark / elapsed:,.0f} points/s), {np.isnan(values).sum():,} NaN")
+        print(f"  cache: {dem.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,6 @@ Enhanced UHI Data Collector with Additional Factors
 Includes NDVI estimates, albedo, impervious surfaces, and other UHI-specific metrics
 """
 
-import requests
-import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
@@ -15,38 +13,32 @@ import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from reference_data import get_reference_data
+from paths import PROCESSED_DIR, REPORTS_DIR
+from instrumentation import METRICS, instrument_methods, timed
+from http_client import get_default_client
+from uncertainty import (seasonal_ndvi_bounds, ndvi_from_greenness, albedo_from_ndvi,
+                         impervious_from_density, uhi_intensity, traffic_density, anthropogenic_heat)
 
+@instrument_methods('enhanced_collector')
 class EnhancedUHICollector:
     """Enhanced collector with additional UHI factors"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.client = get_default_client()
+        self.session = self.client.session
     
     def calculate_distance_to_water(self, lat: float, lon: float, city_name: str) -> float:
         """
         Calculate approximate distance to nearest major water body (km)
         Based on known locations of rivers/coasts for Indian cities
         """
-        # Coastal cities (distance = 0-5 km)
-        coastal_cities = {
-            'Mumbai': 2, 'Chennai': 3, 'Visakhapatnam': 1, 'Thiruvananthapuram': 5,
-            'Surat': 8, 'Kolkata': 15
-        }
-        
-        # River cities (distance = 1-10 km)
-        river_cities = {
-            'Delhi': 5, 'Ahmedabad': 8, 'Pune': 12, 'Hyderabad': 7,
-            'Varanasi': 2, 'Allahabad': 1, 'Patna': 3, 'Kanpur': 4,
-            'Lucknow': 6, 'Agra': 3, 'Srinagar': 1, 'Guwahati': 2
-        }
-        
-        if city_name in coastal_cities:
-            return coastal_cities[city_name]
-        elif city_name in river_cities:
-            return river_cities[city_name]
+        # Known coastal (0-15 km) and river (1-12 km) cities from the reference registry
+        ref = get_reference_data()
+        i = ref.index_of(city_name)
+        if i >= 0 and not np.isnan(ref.distance_to_water_km[i]):
+            return float(ref.distance_to_water_km[i])
         else:
             # Estimate based on geography
             return np.random.uniform(15, 50)
@@ -59,19 +51,10 @@ class EnhancedUHICollector:
         """
         # NDVI correlates with urban greenness
         # Urban areas: 0.1-0.3, Moderate vegetation: 0.3-0.5, Dense vegetation: 0.5-0.8
-        
-        base_ndvi = (greenness_ratio / 100) * 0.6  # Scale to NDVI range
-        
-        # Add seasonal variation based on latitude
-        if lat < 15:  # Southern India - tropical
-            seasonal_factor = np.random.uniform(-0.05, 0.1)
-        elif lat > 28:  # Northern India - more seasonal
-            seasonal_factor = np.random.uniform(-0.15, 0.05)
-        else:  # Central India
-            seasonal_factor = np.random.uniform(-0.1, 0.05)
-        
-        ndvi = base_ndvi + seasonal_factor
-        return max(0.05, min(0.85, ndvi))  # Clamp between realistic values
+        # Seasonal variation by latitude band (the coefficients live in uncertainty.py)
+        low, high = seasonal_ndvi_bounds(lat)
+        seasonal_factor = np.random.uniform(low, high)
+        return float(ndvi_from_greenness(greenness_ratio, seasonal_factor))
     
     def estimate_albedo(self, land_cover: str, ndvi: float) -> float:
         """
@@ -80,50 +63,28 @@ class EnhancedUHICollector:
         Urban areas typically have lower albedo (0.10-0.20)
         Green spaces have moderate albedo (0.20-0.30)
         """
-        # Base albedo by land cover type
-        albedo_map = {
-            'Urban': np.random.uniform(0.12, 0.18),
-            'Industrial': np.random.uniform(0.10, 0.15),
-            'Green Space': np.random.uniform(0.20, 0.30),
-            'Mixed Urban': np.random.uniform(0.15, 0.22),
-            'Water': np.random.uniform(0.05, 0.10)
-        }
-        
-        base_albedo = albedo_map.get(land_cover, 0.15)
+        # Base albedo by land cover type (one draw from that type's range)
+        ref = get_reference_data()
+        code = ref.land_cover_code(land_cover)
+        if code >= 0:
+            base_albedo = np.random.uniform(ref.albedo_low[code], ref.albedo_high[code])
+        else:
+            base_albedo = ref.default_albedo
         
         # Adjust based on NDVI (more vegetation = higher albedo)
-        ndvi_adjustment = (ndvi - 0.3) * 0.1
-        
-        return max(0.05, min(0.40, base_albedo + ndvi_adjustment))
+        return float(albedo_from_ndvi(base_albedo, ndvi))
     
     def estimate_impervious_surface(self, population_density: float, land_cover: str) -> float:
         """
         Estimate percentage of impervious surfaces (concrete, asphalt, buildings)
         Critical factor for UHI effect
         """
-        if land_cover == 'Urban':
-            base_impervious = 70
-        elif land_cover == 'Industrial':
-            base_impervious = 75
-        elif land_cover == 'Green Space':
-            base_impervious = 30
-        elif land_cover == 'Mixed Urban':
-            base_impervious = 55
-        else:
-            base_impervious = 45
+        ref = get_reference_data()
+        code = ref.land_cover_code(land_cover)
+        base_impervious = ref.impervious_base[code] if code >= 0 else ref.default_impervious_base
         
         # Adjust based on population density
-        if population_density > 20000:
-            density_factor = 15
-        elif population_density > 10000:
-            density_factor = 10
-        elif population_density > 5000:
-            density_factor = 5
-        else:
-            density_factor = 0
-        
-        impervious = base_impervious + density_factor + np.random.uniform(-5, 5)
-        return max(20, min(90, impervious))
+        return float(impervious_from_density(base_impervious, population_density, np.random.uniform(-5, 5)))
     
     def estimate_building_density(self, population_density: float, impervious_surface: float) -> float:
         """
@@ -161,31 +122,8 @@ class EnhancedUHICollector:
         Source of anthropogenic heat
         Based on population, city tier, and urbanization level
         """
-        # Vehicle ownership rate varies by city tier and urbanization
-        # Tier 1 cities have higher vehicle ownership
-        if tier == 1:
-            vehicle_ownership_rate = 0.25  # vehicles per person
-        else:
-            vehicle_ownership_rate = 0.15  # vehicles per person
-        
-        # Adjust for population density (more dense = more vehicles)
-        if population_density > 20000:
-            vehicle_ownership_rate *= 1.3
-        elif population_density > 10000:
-            vehicle_ownership_rate *= 1.1
-        
-        total_vehicles = population * vehicle_ownership_rate
-        
-        # Estimate road area (roughly 10-15% of urban area)
-        urban_area = population / 5000  # rough estimate in km²
-        road_area = urban_area * 0.12
-        
-        if road_area > 0:
-            traffic_density = total_vehicles / road_area
-        else:
-            traffic_density = 1000
-        
-        return max(100, min(10000, traffic_density))
+        # Vehicle ownership by tier and density over an estimated road area
+        return float(traffic_density(population, tier, population_density))
     
     def estimate_anthropogenic_heat(self, energy_consumption: float, population: float, 
                                     traffic_density: float) -> float:
@@ -193,17 +131,8 @@ class EnhancedUHICollector:
         Estimate anthropogenic heat flux (W/m²)
         Heat released from human activities
         """
-        # Energy consumption component
-        energy_heat = (energy_consumption / 1000000) * 10  # Convert to heat flux
-        
-        # Traffic component
-        traffic_heat = (traffic_density / 1000) * 5
-        
-        # Population density component (body heat, small appliances)
-        population_heat = (population / 1000000) * 8
-        
-        total_heat = energy_heat + traffic_heat + population_heat
-        return max(5, min(200, total_heat))
+        # Energy, traffic and population (body heat, small appliances) components
+        return float(anthropogenic_heat(energy_consumption, population, traffic_density))
     
     def estimate_urban_sprawl_rate(self, population: float, tier: int) -> float:
         """
@@ -233,27 +162,8 @@ class EnhancedUHICollector:
         Calculate estimated UHI intensity (°C difference from rural areas)
         Based on multiple factors
         """
-        # Base UHI from temperature
-        base_uhi = 2.0
-        
-        # Impervious surface factor (more impervious = stronger UHI)
-        impervious_factor = (impervious_surface / 100) * 3
-        
-        # Vegetation factor (more vegetation = weaker UHI)
-        vegetation_factor = -(ndvi * 5)
-        
-        # Albedo factor (lower albedo = stronger UHI)
-        albedo_factor = -(albedo - 0.15) * 5
-        
-        # Wind speed factor (higher wind = weaker UHI)
-        if not np.isnan(wind_speed):
-            wind_factor = -(wind_speed / 10) * 1.5
-        else:
-            wind_factor = 0
-        
-        uhi_intensity = base_uhi + impervious_factor + vegetation_factor + albedo_factor + wind_factor
-        
-        return max(0.5, min(10, uhi_intensity))
+        # More impervious surface strengthens the UHI; vegetation, albedo and wind weaken it
+        return float(uhi_intensity(impervious_surface, ndvi, albedo, wind_speed))
     
     def estimate_cooling_degree_days(self, temp_max: float, temp_min: float) -> float:
         """
@@ -269,15 +179,47 @@ class EnhancedUHICollector:
         return 0
 
 
-def collect_enhanced_data(base_collector, enhanced_collector, city: Dict) -> Dict:
+@timed('enhanced_collector')
+def collect_enhanced_data(base_collector, enhanced_collector, city: Dict,
+                          donor_rows: List[Dict] = None) -> Dict:
     """
     Collect both base and enhanced UHI data for a city
+    Failed API fields are imputed as in build_enhanced_dataset, with donor_rows
+    (other cities' base rows) as the neighbours
     """
-    from collector import UHIDataCollector
-    
     # Get base data
     base_data = base_collector.collect_city_data(city, delay=1.5)
+    base_data = impute_base_rows(base_collector, [base_data], donor_rows)[0][0]
     
+    return add_enhanced_features(enhanced_collector, city, base_data)
+
+
+def impute_base_rows(base_collector, base_rows: List[Dict], donor_rows: List[Dict] = None):
+    """
+    Fill failed API fields of base_rows from neighbouring cities (base_rows plus
+    donor_rows), re-deriving the health impact of filled rows
+    Returns (filled base_rows, number of imputed values)
+    """
+    import pandas as pd
+    from imputation import impute_missing_fields
+
+    frame = pd.DataFrame(list(base_rows) + list(donor_rows or []))
+    filled, imputed_mask = impute_missing_fields(frame)
+    n = len(base_rows)
+    rows = filled.iloc[:n].to_dict('records')
+    row_imputed = imputed_mask.to_numpy()[:n].any(axis=1)
+    for base_data, was_imputed in zip(rows, row_imputed):
+        if was_imputed:
+            base_data['Health Impact (Mortality Rate/100k)'] = base_collector.estimate_health_impact(
+                base_data['Air Quality Index (AQI)'], base_data['Temperature (°C)'])
+    return rows, int(imputed_mask.to_numpy()[:n].sum())
+
+
+@timed('enhanced_collector')
+def add_enhanced_features(enhanced_collector, city: Dict, base_data: Dict) -> Dict:
+    """
+    Calculate enhanced UHI features for a city from its (possibly imputed) base data
+    """
     # Calculate enhanced features
     lat, lon = city['lat'], city['lon']
     city_name = city['name']
@@ -309,6 +251,15 @@ def collect_enhanced_data(base_collector, enhanced_collector, city: Dict) -> Dic
                                                                 impervious_surface, wind_speed)
     cooling_dd = enhanced_collector.estimate_cooling_degree_days(temp_max, temp_min)
     
+    # Derived features that fell back to defaults because an input was missing
+    imputed = [field for field in base_data.get('Imputed Fields', '').split(';') if field]
+    if np.isnan(cloud_cover):
+        imputed.append('Solar Radiation (MJ/m²/day)')
+    if np.isnan(wind_speed):
+        imputed.append('UHI Intensity (°C)')
+    if np.isnan(temp_max) or np.isnan(temp_min):
+        imputed.append('Cooling Degree Days')
+    
     # Add enhanced features to base data
     enhanced_data = base_data.copy()
     enhanced_data.update({
@@ -323,15 +274,81 @@ def collect_enhanced_data(base_collector, enhanced_collector, city: Dict) -> Dic
         'Urban Sprawl Rate (%/year)': round(sprawl_rate, 1),
         'UHI Intensity (°C)': round(uhi_intensity, 2),
         'Cooling Degree Days': round(cooling_dd, 1),
+        'Imputed Fields': ';'.join(imputed),
     })
     
     return enhanced_data
 
 
+COLUMN_ORDER = [
+    'City Name', 'State', 'Latitude', 'Longitude', 'Elevation (m)',
+    'Temperature (°C)', 'Temperature Max (°C)', 'Temperature Min (°C)',
+    'UHI Intensity (°C)', 'Humidity (%)', 'Wind Speed (km/h)', 'Cloud Cover (%)',
+    'Daily Precipitation (mm)', 'Annual Rainfall (mm)', 'Cooling Degree Days',
+    'Land Cover', 'NDVI', 'Urban Greenness Ratio (%)', 'Albedo',
+    'Impervious Surface (%)', 'Building Density (buildings/km²)',
+    'Distance to Water (km)', 'Solar Radiation (MJ/m²/day)',
+    'Population', 'Population Density (people/km²)',
+    'Energy Consumption (MWh/year)', 'Traffic Density (vehicles/km² road)',
+    'Anthropogenic Heat Flux (W/m²)', 'Urban Sprawl Rate (%/year)',
+    'Air Quality Index (AQI)', 'Health Impact (Mortality Rate/100k)',
+    'Imputed Fields'
+]
+
+
+def build_enhanced_dataset(base_collector, enhanced_collector, cities: List[Dict], base_rows: List[Dict]):
+    """
+    Impute failed API fields from neighbouring cities, then derive the enhanced
+    features; returns the dataset DataFrame in COLUMN_ORDER
+    """
+    import pandas as pd
+
+    # Fill failed API fields from neighbouring cities before deriving features
+    base_rows, imputed = impute_base_rows(base_collector, base_rows)
+    print(f"\nImputed {imputed} missing weather/AQI values from neighbouring cities")
+    
+    all_data = []
+    for city, base_data in zip(cities, base_rows):
+        enhanced_data = add_enhanced_features(enhanced_collector, city, base_data)
+        all_data.append(enhanced_data)
+        print(f"    ✓ {city['name']} - UHI Intensity: {enhanced_data['UHI Intensity (°C)']}°C, "
+              f"NDVI: {enhanced_data['NDVI']}")
+    
+    # Create DataFrame
+    df = pd.DataFrame(all_data)
+    
+    # Reorder if all columns exist
+    existing_columns = [col for col in COLUMN_ORDER if col in df.columns]
+    return df[existing_columns]
+
+
+def save_dataset(df, timestamp: str = None):
+    """Save the dataset and its data quality report; returns (filename, quality_report, quality_file)"""
+    from schema import DataQualityValidator
+
+    # Save to CSV
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_dir = PROCESSED_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    filename = f'{output_dir}/uhi_dataset_{timestamp}.csv'
+    df.to_csv(filename, index=False)
+    
+    # Data quality pass over the collected dataset
+    validator = DataQualityValidator()
+    validator.update(df)
+    quality_report = validator.report()
+    report_dir = REPORTS_DIR
+    os.makedirs(report_dir, exist_ok=True)
+    quality_file = f'{report_dir}/data_quality_{timestamp}.csv'
+    quality_report.to_csv(quality_file)
+    return filename, quality_report, quality_file
+
+
 def main():
     """Main function to collect enhanced UHI data"""
     from indian_cities import get_all_cities
     from collector import UHIDataCollector
+    from schema import print_quality_summary
     
     base_collector = UHIDataCollector()
     enhanced_collector = EnhancedUHICollector()
@@ -339,7 +356,7 @@ def main():
     
     print("=" * 80)
     print("ENHANCED URBAN HEAT ISLAND DATA COLLECTION")
-    print("50 Major Indian Cities")
+    print(f"{len(cities)} Major Indian Cities")
     print("=" * 80)
     print(f"\nCollection started at: {datetime.now()}")
     print(f"Total cities to process: {len(cities)}")
@@ -357,53 +374,29 @@ def main():
     print("  • Cooling Degree Days")
     print("\n" + "=" * 80 + "\n")
     
-    all_data = []
+    base_rows = []
+    collected_cities = []
     successful = 0
     failed = 0
     
-    for i, city in enumerate(cities, 1):
+    # One batched fetch per provider instead of three rate-limited calls per city
+    print("Fetching weather, elevation and air quality for all cities...")
+    prefetched = base_collector.prefetch(cities)
+    
+    for i, (city, city_values) in enumerate(zip(cities, prefetched), 1):
         try:
             print(f"[{i}/{len(cities)}] Processing {city['name']}, {city['state']}...")
-            enhanced_data = collect_enhanced_data(base_collector, enhanced_collector, city)
-            all_data.append(enhanced_data)
+            base_rows.append(base_collector.collect_city_data(city, prefetched=city_values))
+            collected_cities.append(city)
             successful += 1
-            print(f"    ✓ Completed - UHI Intensity: {enhanced_data['UHI Intensity (°C)']}°C, "
-                  f"NDVI: {enhanced_data['NDVI']}")
+            print(f"    ✓ Collected")
         except Exception as e:
             print(f"    ✗ Failed: {e}")
             failed += 1
             continue
-        
-        time.sleep(0.5)  # Small delay between cities
-    
-    # Create DataFrame
-    df = pd.DataFrame(all_data)
-    
-    # Reorder columns for better readability
-    column_order = [
-        'City Name', 'State', 'Latitude', 'Longitude', 'Elevation (m)',
-        'Temperature (°C)', 'Temperature Max (°C)', 'Temperature Min (°C)',
-        'UHI Intensity (°C)', 'Humidity (%)', 'Wind Speed (km/h)', 'Cloud Cover (%)',
-        'Daily Precipitation (mm)', 'Annual Rainfall (mm)', 'Cooling Degree Days',
-        'Land Cover', 'NDVI', 'Urban Greenness Ratio (%)', 'Albedo',
-        'Impervious Surface (%)', 'Building Density (buildings/km²)',
-        'Distance to Water (km)', 'Solar Radiation (MJ/m²/day)',
-        'Population', 'Population Density (people/km²)',
-        'Energy Consumption (MWh/year)', 'Traffic Density (vehicles/km² road)',
-        'Anthropogenic Heat Flux (W/m²)', 'Urban Sprawl Rate (%/year)',
-        'Air Quality Index (AQI)', 'Health Impact (Mortality Rate/100k)'
-    ]
-    
-    # Reorder if all columns exist
-    existing_columns = [col for col in column_order if col in df.columns]
-    df = df[existing_columns]
     
-    # Save to CSV
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_dir = '../../data/processed'
-    os.makedirs(output_dir, exist_ok=True)
-    filename = f'{output_dir}/uhi_dataset_{timestamp}.csv'
-    df.to_csv(filename, index=False)
+    df = build_enhanced_dataset(base_collector, enhanced_collector, collected_cities, base_rows)
+    filename, quality_report, quality_file = save_dataset(df)
     
     # Print results
     print("\n" + "=" * 80)
@@ -415,6 +408,12 @@ def main():
     print(f"Collection ended at: {datetime.now()}")
     print("=" * 80)
     
+    print("\n" + "=" * 80)
+    print("DATA QUALITY")
+    print("=" * 80)
+    print_quality_summary(quality_report)
+    print(f"Quality report saved as: {quality_file}")
+    
     # Display summary statistics
     print("\n" + "=" * 80)
     print("DATASET SUMMARY STATISTICS")
@@ -443,9 +442,18 @@ def main():
                                                           'Temperature (°C)', 'Impervious Surface (%)']]
         print(top_uhi.to_string(index=False))
     
+    if METRICS.enabled:
+        print("\n" + "=" * 80)
+        print("RUN METRICS (slowest steps)")
+        print("=" * 80)
+        METRICS.summary('uhi_stage_duration_seconds')
+        print("\nHTTP requests:")
+        METRICS.summary('uhi_http_request_duration_seconds')
+    
     return df
 
 
 if __name__ == "__main__":
-    df = main()
+    from profiling import run_with_profiling
+    df = run_with_profiling(main, 'enhanced_collector')
 
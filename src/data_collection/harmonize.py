@@ -0,0 +1,222 @@
+"""
+Harmonized Dataset Loader
+Reads raw and processed UHI datasets (CSV, or Parquet with pyarrow) chunk by
+chunk and maps them onto one unified schema through declarative source
+mappings: column renames, vectorized unit conversion, dtype coercion and
+provenance tags, so heterogeneous sources combine in a single streaming pass
+"""
+
+from typing import Dict, Iterable, Iterator, List
+import argparse
+import glob
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import PROCESSED_DIR, RAW_DIR, DATASET_PATTERN
+from schema import PROCESSED_SCHEMA
+
+# Columns only some sources have, kept in the unified frame
+EXTRA_COLUMNS = {
+    'GDP per Capita (USD)': {'dtype': 'float', 'nullable': True, 'min': 0, 'unit': 'USD'},
+}
+
+# Provenance: which source mapping and file every row came from
+SOURCE_COLUMN = 'Source'
+SOURCE_FILE_COLUMN = 'Source File'
+
+UNIFIED_SCHEMA = dict(PROCESSED_SCHEMA, **EXTRA_COLUMNS)
+UNIFIED_COLUMNS = list(UNIFIED_SCHEMA) + [SOURCE_COLUMN, SOURCE_FILE_COLUMN]
+
+# Source mappings onto the unified schema
+#   signature: columns that identify the source
+#   columns:   source column -> {'target', 'scale', 'offset'}; other unified
+#              columns are taken by name when present
+#   constants: values for unified columns the source does not have
+#   excluded:  source columns left null even though the unified schema has them
+SOURCES = {
+    'processed': {
+        'signature': ['State', 'UHI Intensity (°C)'],
+        'columns': {},
+        'constants': {},
+        'excluded': [],
+    },
+    'raw': {
+        'signature': ['Energy Consumption (kWh)', 'GDP per Capita (USD)'],
+        'columns': {
+            # Annual consumption in kWh -> MWh/year
+            'Energy Consumption (kWh)': {'target': 'Energy Consumption (MWh/year)', 'scale': 0.001},
+        },
+        'constants': {},
+        # Raw coordinates are global, not Indian; they would land in the
+        # regional bands and the spatial weights as if they were Indian cities
+        'excluded': ['Latitude', 'Longitude'],
+    },
+}
+
+
+def detect_source(columns: Iterable[str]) -> str:
+    """Name of the source mapping whose signature columns are all present"""
+    columns = set(columns)
+    for name, mapping in SOURCES.items():
+        if set(mapping['signature']) <= columns:
+            return name
+    raise ValueError(f"No source mapping matches columns: {sorted(columns)}")
+
+
+def source_columns(source: str, available: Iterable[str]) -> Dict[str, Dict]:
+    """source column -> conversion for every unified column the source provides"""
+    mapping = SOURCES[source]
+    available = set(available) - set(mapping['excluded'])
+    plan = {column: conversion for column, conversion in mapping['columns'].items() if column in available}
+    targets = {conversion['target'] for conversion in plan.values()}
+    for column in UNIFIED_SCHEMA:
+        if column in available and column not in targets and column not in plan:
+            plan[column] = {'target': column}
+    return plan
+
+
+def harmonize_chunk(chunk: pd.DataFrame, source: str, source_file: str = '') -> pd.DataFrame:
+    """Map one chunk of a source onto the unified columns and dtypes"""
+    n = len(chunk)
+    targets = {conversion['target']: (column, conversion)
+               for column, conversion in source_columns(source, chunk.columns).items()}
+    constants = SOURCES[source]['constants']
+
+    unified = {}
+    for column, spec in UNIFIED_SCHEMA.items():
+        if column in targets:
+            series = chunk[targets[column][0]]
+            conversion = targets[column][1]
+        elif column in constants:
+            series, conversion = pd.Series([constants[column]] * n, index=chunk.index), {}
+        else:
+            series, conversion = pd.Series([None] * n, index=chunk.index, dtype=object), {}
+
+        if spec['dtype'] == 'float':
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            if 'scale' in conversion:
+                values = values * conversion['scale']
+            if 'offset' in conversion:
+                values = values + conversion['offset']
+            unified[column] = values
+        elif spec['dtype'] == 'category':
+            unified[column] = pd.Categorical(series, categories=spec['allowed'])
+        else:
+            unified[column] = series.astype(object).where(series.notna(), None).to_numpy()
+
+    frame = pd.DataFrame(unified)
+    frame[SOURCE_COLUMN] = pd.Categorical.from_codes(np.full(n, list(SOURCES).index(source), dtype=np.int8),
+                                                     categories=list(SOURCES))
+    frame[SOURCE_FILE_COLUMN] = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[source_file])
+    return frame
+
+
+def _read_chunks(path: str, chunksize: int, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+    """Raw chunks of a CSV (optionally .gz) or Parquet file, restricted to columns"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow is required to read Parquet sources: pip install pyarrow")
+        parquet = pq.ParquetFile(path)
+        names = [c for c in parquet.schema_arrow.names if columns is None or c in columns]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=names):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, chunksize=chunksize,
+                           usecols=(lambda c: c in columns) if columns is not None else None)
+
+
+def _header(path: str) -> List[str]:
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_harmonized(paths: Iterable[str], chunksize: int = 250000) -> Iterator[pd.DataFrame]:
+    """
+    Stream unified chunks from many files in one pass
+    Each file's source is detected from its header, and only the columns its
+    mapping uses are parsed
+    """
+    for path in paths:
+        header = _header(path)
+        source = detect_source(header)
+        needed = list(source_columns(source, header))
+        for chunk in _read_chunks(path, chunksize, needed):
+            yield harmonize_chunk(chunk, source, os.path.basename(path))
+
+
+def default_sources() -> List[str]:
+    """The raw dataset followed by every processed dataset"""
+    raw = os.path.join(RAW_DIR, 'urban_heat_island_dataset.csv')
+    processed = sorted(glob.glob(os.path.join(PROCESSED_DIR, DATASET_PATTERN)))
+    return ([raw] if os.path.exists(raw) else []) + processed
+
+
+def load_harmonized(paths: Iterable[str] = None, chunksize: int = 250000) -> pd.DataFrame:
+    """One unified DataFrame over the given files (default: raw plus all processed)"""
+    chunks = list(iter_harmonized(paths or default_sources(), chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=UNIFIED_COLUMNS)
+    frame = pd.concat(chunks, ignore_index=True)
+    # Concatenating different single-file categories falls back to object; restore category
+    frame[SOURCE_FILE_COLUMN] = frame[SOURCE_FILE_COLUMN].astype('category')
+    frame[SOURCE_COLUMN] = pd.Categorical(frame[SOURCE_COLUMN], categories=list(SOURCES))
+    return frame
+
+
+def main():
+    """Harmonize sources into one file, or summarize them"""
+    parser = argparse.ArgumentParser(description='Merge raw and processed datasets into the unified schema')
+    parser.add_argument('paths', nargs='*', help='Source files (default: raw plus all processed datasets)')
+    parser.add_argument('--output', help='Write the unified rows to this CSV (streamed)')
+    parser.add_argument('--chunksize', type=int, default=250000, help='Rows per chunk')
+    args = parser.parse_args()
+
+    paths = args.paths or default_sources()
+    print("=" * 80)
+    print("HARMONIZED DATASET")
+    print("=" * 80)
+    for path in paths:
+        print(f"  {detect_source(_header(path)):10s} {path}")
+
+    started = time.perf_counter()
+    rows = 0
+    per_source = {}
+    output = None
+    if args.output:
+        from synthetic import frame_to_csv
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        output = open(args.output, 'w', encoding='utf-8')
+    try:
+        for chunk in iter_harmonized(paths, args.chunksize):
+            if output is not None:
+                output.write(frame_to_csv(chunk, header=rows == 0))
+            rows += len(chunk)
+            for source, count in chunk[SOURCE_COLUMN].value_counts().items():
+                per_source[source] = per_source.get(source, 0) + int(count)
+    finally:
+        if output is not None:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    for source, count in per_source.items():
+        if count:
+            print(f"  {source:10s} {count:,} rows")
+    if args.output:
+        print(f"Unified dataset saved as: {args.output}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
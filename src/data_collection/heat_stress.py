@@ -0,0 +1,434 @@
+"""
+Heat-Stress Indices over Hourly Weather History
+Vectorized NumPy kernels for heat index, wet-bulb temperature, Humidex,
+apparent temperature and cooling degree-hours over (cities, hours) arrays of
+temperature, humidity and wind, with daily and seasonal rollups computed in
+one pass over blocks of cities
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import argparse
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import RAW_DIR, REPORTS_DIR
+from indian_cities import get_catalogue
+
+# Base temperature for cooling degree-hours, as in estimate_cooling_degree_days
+COOLING_BASE_C = 18.0
+
+# Heat index danger bands (°C), after the US NWS categories
+HEAT_INDEX_DANGER_C = 41.0
+HEAT_INDEX_EXTREME_C = 54.0
+# Wet-bulb temperature beyond which sustained outdoor work is unsafe
+WET_BULB_DANGER_C = 31.0
+# Humidex "dangerous" level (Environment Canada)
+HUMIDEX_DANGER = 45.0
+
+# IMD seasons by calendar month (1-12); each is contiguous within a calendar year
+SEASONS = ['Winter', 'Pre-Monsoon', 'Monsoon', 'Post-Monsoon']
+MONTH_SEASON = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3])
+
+HOURLY_VARIABLES = ['temperature_2m', 'relative_humidity_2m', 'wind_speed_10m']
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+
+# ---------------------------------------------------------------------------
+# Kernels: element-wise over arrays of any shape; results keep the input dtype
+# ---------------------------------------------------------------------------
+
+def vapour_pressure(temperature, humidity):
+    """Actual vapour pressure (hPa) from temperature (°C) and relative humidity (%), Magnus formula"""
+    t = np.asarray(temperature)
+    return np.asarray(humidity) * (6.112 / 100) * np.exp(17.62 * t / (243.12 + t))
+
+
+def heat_index(temperature, humidity):
+    """
+    US NWS heat index (°C): Steadman's simple formula below ~27°C, otherwise the
+    Rothfusz regression with the low- and high-humidity adjustments
+    Missing humidity falls back to the air temperature
+    """
+    t = np.asarray(temperature) * 1.8 + 32
+    rh = np.asarray(humidity)
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+            - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh
+            + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+    with np.errstate(invalid='ignore'):
+        dry = (rh < 13) & (t > 80) & (t < 112)
+        full = np.where(dry, full - (13 - rh) / 4 * np.sqrt(np.maximum(17 - np.abs(t - 95), 0) / 17), full)
+        humid = (rh > 85) & (t > 80) & (t < 87)
+        full = np.where(humid, full + (rh - 85) / 10 * (87 - t) / 5, full)
+        index = np.where((simple + t) / 2 >= 80, full, simple)
+    return (np.where(np.isnan(rh), t, index) - 32) / 1.8
+
+
+def wet_bulb(temperature, humidity):
+    """Wet-bulb temperature (°C) at sea-level pressure, Stull (2011); valid for RH 5-99%, -20-50°C"""
+    t = np.asarray(temperature)
+    rh = np.asarray(humidity)
+    return (t * np.arctan(0.151977 * np.sqrt(rh + 8.313659))
+            + np.arctan(t + rh) - np.arctan(rh - 1.676331)
+            + 0.00391838 * rh ** 1.5 * np.arctan(0.023101 * rh)
+            - 4.686035)
+
+
+def humidex(temperature, humidity):
+    """Humidex (Environment Canada) from temperature (°C) and relative humidity (%)"""
+    return np.asarray(temperature) + 0.5555 * (vapour_pressure(temperature, humidity) - 10.0)
+
+
+def apparent_temperature(temperature, humidity, wind_speed):
+    """Steadman's shade apparent temperature (°C) with wind in km/h, as used by the Bureau of Meteorology"""
+    wind = np.asarray(wind_speed) / 3.6
+    return np.asarray(temperature) + 0.33 * vapour_pressure(temperature, humidity) - 0.70 * wind - 4.0
+
+
+def cooling_degree_hours(temperature, base: float = COOLING_BASE_C):
+    """Degrees above the cooling base for every hour (sum / 24 = degree-days)"""
+    return np.maximum(np.asarray(temperature) - base, 0)
+
+
+# ---------------------------------------------------------------------------
+# Hourly history
+# ---------------------------------------------------------------------------
+
+class HourlyWeather:
+    """
+    Hourly temperature (°C), relative humidity (%) and wind speed (km/h) as
+    float32 (cities, hours) arrays starting at `start` (local time, hourly)
+    """
+
+    def __init__(self, names, lat, lon, start, temperature, humidity, wind_speed):
+        self.names = np.asarray(names, dtype=object)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.start = np.datetime64(start, 'h')
+        self.temperature = np.asarray(temperature, dtype=np.float32)
+        self.humidity = np.asarray(humidity, dtype=np.float32)
+        self.wind_speed = np.asarray(wind_speed, dtype=np.float32)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.temperature.shape
+
+    @property
+    def hours(self) -> np.ndarray:
+        return self.start + np.arange(self.shape[1])
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, names=self.names.astype(str), lat=self.lat, lon=self.lon,
+                            start=np.array(str(self.start)), temperature=self.temperature,
+                            humidity=self.humidity, wind_speed=self.wind_speed)
+
+    @classmethod
+    def load(cls, path: str) -> 'HourlyWeather':
+        with np.load(path) as data:
+            return cls(data['names'], data['lat'], data['lon'], str(data['start']),
+                       data['temperature'], data['humidity'], data['wind_speed'])
+
+    @classmethod
+    def from_open_meteo(cls, cities: List[Dict], start: str, end: str, batch_size: int = 10,
+                        client=None) -> 'HourlyWeather':
+        """Hourly history from the Open-Meteo archive API, several cities per request"""
+        from http_client import get_default_client
+        client = client or get_default_client()
+        hours = int((np.datetime64(end) - np.datetime64(start)) / np.timedelta64(1, 'h')) + 24
+        arrays = {v: np.full((len(cities), hours), np.nan, dtype=np.float32) for v in HOURLY_VARIABLES}
+        for offset in range(0, len(cities), batch_size):
+            batch = cities[offset:offset + batch_size]
+            params = {
+                'latitude': ','.join(str(c['lat']) for c in batch),
+                'longitude': ','.join(str(c['lon']) for c in batch),
+                'start_date': start, 'end_date': end,
+                'hourly': ','.join(HOURLY_VARIABLES),
+                'timezone': 'Asia/Kolkata',
+            }
+            try:
+                response = client.get(ARCHIVE_URL, params=params)
+                if response.status_code != 200:
+                    print(f"Archive API error for {batch[0]['name']}...: {response.status_code}")
+                    continue
+                payload = response.json()
+            except Exception as e:
+                print(f"Error fetching hourly history for {batch[0]['name']}...: {e}")
+                continue
+            for i, data in enumerate(payload if isinstance(payload, list) else [payload]):
+                hourly = data.get('hourly', {})
+                for variable in HOURLY_VARIABLES:
+                    values = np.array(hourly.get(variable) or [], dtype=float)[:hours]
+                    arrays[variable][offset + i, :len(values)] = values
+            print(f"  ✓ {min(offset + batch_size, len(cities))}/{len(cities)} cities")
+        return cls([c['name'] for c in cities], [c['lat'] for c in cities], [c['lon'] for c in cities],
+                   f"{start}T00", arrays['temperature_2m'], arrays['relative_humidity_2m'],
+                   arrays['wind_speed_10m'])
+
+    @classmethod
+    def simulate(cls, cities: List[Dict], start: str, end: str, seed: Optional[int] = None) -> 'HourlyWeather':
+        """
+        Synthetic hourly history for benchmarks and offline runs: an annual cycle
+        peaking in May, a monsoon humidity bump, a diurnal cycle and AR(1) day-to-day anomalies
+        """
+        rng = np.random.default_rng(seed)
+        hours = int((np.datetime64(end) - np.datetime64(start)) / np.timedelta64(1, 'h')) + 24
+        lat = np.array([c['lat'] for c in cities], dtype=np.float32)[:, None]
+        t = (np.datetime64(f"{start}T00", 'h') + np.arange(hours)).astype('datetime64[h]')
+        day_of_year = ((t - t.astype('datetime64[Y]')).astype(np.float32) / 24.0)[None, :]
+        hour = (np.arange(hours, dtype=np.float32) % 24)[None, :]
+
+        annual = np.cos((day_of_year - 135) / 365.25 * 2 * np.pi, dtype=np.float32)
+        monsoon = np.exp(-((day_of_year - 210) / 45) ** 2, dtype=np.float32)
+        diurnal = np.cos((hour - 15) / 24 * 2 * np.pi, dtype=np.float32)
+        # Day-to-day AR(1) anomaly (spells of hot or cool days) plus hourly noise
+        n_days = hours // 24
+        shocks = rng.standard_normal((len(cities), n_days), dtype=np.float32)
+        anomaly = np.empty_like(shocks)
+        anomaly[:, 0] = shocks[:, 0]
+        for d in range(1, n_days):
+            anomaly[:, d] = 0.8 * anomaly[:, d - 1] + 0.6 * shocks[:, d]
+        noise = np.repeat(anomaly, 24, axis=1)[:, :hours] * 1.5 \
+            + rng.standard_normal((len(cities), hours), dtype=np.float32) * 0.5
+
+        temperature = 27 + (lat - 20) * -0.3 + (4 + (lat - 8) * 0.35) * annual + 5 * diurnal + noise
+        humidity = np.clip(55 + 30 * monsoon - 18 * diurnal - (lat - 20) * 0.5 - 2 * noise, 5, 100)
+        wind = np.abs(9 + 4 * annual + 3 * diurnal + rng.standard_normal((len(cities), hours), dtype=np.float32) * 3)
+        return cls([c['name'] for c in cities], lat[:, 0], [c['lon'] for c in cities], f"{start}T00",
+                   temperature, humidity, wind)
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+
+def _day_padding(weather: HourlyWeather):
+    """(first day, leading NaN hours, trailing NaN hours) that align the series to whole days"""
+    first = weather.start.astype('datetime64[D]')
+    front = int((weather.start - first.astype('datetime64[h]')) / np.timedelta64(1, 'h'))
+    back = -(front + weather.shape[1]) % 24
+    return first, front, back
+
+
+def _whole_days(weather: HourlyWeather, arrays: List[np.ndarray]):
+    """Pad hourly arrays with NaN to whole local days; returns (first day, (cities, days, 24) views)"""
+    first, front, back = _day_padding(weather)
+    reshaped = []
+    for values in arrays:
+        if front or back:
+            values = np.pad(values, ((0, 0), (front, back)), constant_values=np.nan)
+        reshaped.append(values.reshape(values.shape[0], -1, 24))
+    return first, reshaped
+
+
+def _season_segments(days: np.ndarray):
+    """Start index, year and season code of every contiguous (year, season) run of days"""
+    months = days.astype('datetime64[M]').astype(int) % 12 + 1
+    years = days.astype('datetime64[Y]').astype(int) + 1970
+    codes = years * 4 + MONTH_SEASON[months]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return starts, years[starts], MONTH_SEASON[months[starts]]
+
+
+def daily_indices(temperature: np.ndarray, humidity: np.ndarray, wind: np.ndarray,
+                  base: float = COOLING_BASE_C) -> Dict[str, np.ndarray]:
+    """
+    (cities, days, 24) hourly blocks -> (cities, days) daily metrics
+    The hourly indices are computed and reduced straight away, so only one
+    block of cities is ever held at hourly resolution
+    """
+    present = ~np.isnan(temperature)
+    hours = present.sum(axis=2)
+    hi = heat_index(temperature, humidity)
+    wb = wet_bulb(temperature, humidity)
+    hx = humidex(temperature, humidity)
+    at = apparent_temperature(temperature, humidity, wind)
+    cdh = cooling_degree_hours(temperature, base)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'Hours': hours,
+            'Temperature Max (°C)': np.fmax.reduce(temperature, axis=2),
+            'Temperature Min (°C)': np.fmin.reduce(temperature, axis=2),
+            'Temperature Mean (°C)': np.where(hours > 0, np.where(present, temperature, 0).sum(axis=2) / hours, np.nan),
+            'Heat Index Max (°C)': np.fmax.reduce(hi, axis=2),
+            'Wet-Bulb Max (°C)': np.fmax.reduce(wb, axis=2),
+            'Humidex Max': np.fmax.reduce(hx, axis=2),
+            'Apparent Temperature Max (°C)': np.fmax.reduce(at, axis=2),
+            # Degree-hours / 24, scaled up when some hours are missing
+            'Cooling Degree Days (hourly)': np.where(hours > 0, np.where(present, cdh, 0).sum(axis=2) / hours, np.nan),
+            'Heat Index Danger Hours': (hi >= HEAT_INDEX_DANGER_C).sum(axis=2),
+            'Heat Index Extreme Hours': (hi >= HEAT_INDEX_EXTREME_C).sum(axis=2),
+            'Wet-Bulb Danger Hours': (wb >= WET_BULB_DANGER_C).sum(axis=2),
+            'Humidex Danger Hours': (hx >= HUMIDEX_DANGER).sum(axis=2),
+        }
+
+
+# Seasonal reductions of the daily metrics: (daily metric, reduction, seasonal column)
+SEASONAL_ROLLUPS = [
+    ('Temperature Max (°C)', 'mean', 'Mean Daily Max (°C)'),
+    ('Temperature Max (°C)', 'max', 'Temperature Max (°C)'),
+    ('Heat Index Max (°C)', 'mean', 'Mean Daily Max Heat Index (°C)'),
+    ('Heat Index Max (°C)', 'max', 'Heat Index Max (°C)'),
+    ('Wet-Bulb Max (°C)', 'max', 'Wet-Bulb Max (°C)'),
+    ('Humidex Max', 'max', 'Humidex Max'),
+    ('Cooling Degree Days (hourly)', 'sum', 'Cooling Degree Days'),
+    ('Heat Index Danger Hours', 'sum', 'Heat Index Danger Hours'),
+    ('Heat Index Extreme Hours', 'sum', 'Heat Index Extreme Hours'),
+    ('Wet-Bulb Danger Hours', 'sum', 'Wet-Bulb Danger Hours'),
+    ('Humidex Danger Hours', 'sum', 'Humidex Danger Hours'),
+    ('Heat Index Danger Hours', 'days', 'Heat Index Danger Days'),
+]
+
+
+def seasonal_rollup(daily: Dict[str, np.ndarray], starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """(cities, days) daily metrics -> (cities, seasons) with reduceat over contiguous season runs"""
+    valid = daily['Hours'] > 0
+    days = np.add.reduceat(valid, starts, axis=1)
+    seasonal = {'Days': days}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for metric, reduction, column in SEASONAL_ROLLUPS:
+            values = daily[metric]
+            if reduction == 'max':
+                seasonal[column] = np.fmax.reduceat(values, starts, axis=1)
+            elif reduction == 'sum':
+                seasonal[column] = np.add.reduceat(np.where(valid, values, 0), starts, axis=1)
+            elif reduction == 'mean':
+                seasonal[column] = np.add.reduceat(np.where(valid, values, 0), starts, axis=1) / days
+            elif reduction == 'days':
+                seasonal[column] = np.add.reduceat(valid & (values > 0), starts, axis=1)
+    return seasonal
+
+
+def heat_stress_rollups(weather: HourlyWeather, block: int = 16,
+                        base: float = COOLING_BASE_C) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Daily and seasonal heat-stress tables for every city in one pass over
+    blocks of `block` cities (long format: one row per city-day / city-season)
+    """
+    first, front, back = _day_padding(weather)
+    days = first + np.arange((front + weather.shape[1] + back) // 24)
+    starts, season_years, season_codes = _season_segments(days)
+    n_cities = weather.shape[0]
+    daily_parts, seasonal_parts = [], []
+    for offset in range(0, n_cities, block):
+        rows = slice(offset, offset + block)
+        _, (temperature, humidity, wind) = _whole_days(
+            weather, [weather.temperature[rows], weather.humidity[rows], weather.wind_speed[rows]])
+        daily = daily_indices(temperature, humidity, wind, base)
+        daily_parts.append(daily)
+        seasonal_parts.append(seasonal_rollup(daily, starts))
+    if not daily_parts:
+        # No cities: one empty block still gives frames with every column
+        empty = np.empty((0, len(days), 24), dtype=np.float32)
+        daily = daily_indices(empty, empty, empty, base)
+        daily_parts.append(daily)
+        seasonal_parts.append(seasonal_rollup(daily, starts))
+
+    def long_frame(parts, index_columns):
+        columns = {name: np.concatenate([part[name] for part in parts]).ravel() for name in parts[0]}
+        frame = pd.DataFrame(index_columns)
+        for name, values in columns.items():
+            frame[name] = values.astype(np.float32) if values.dtype.kind == 'f' else values
+        return frame
+
+    n_days = len(days)
+    daily = long_frame(daily_parts, {
+        'City Name': np.repeat(weather.names, n_days),
+        'Date': np.tile(days, n_cities),
+    })
+    seasonal = long_frame(seasonal_parts, {
+        'City Name': np.repeat(weather.names, len(starts)),
+        'Year': np.tile(season_years, n_cities),
+        'Season': pd.Categorical.from_codes(np.tile(season_codes, n_cities), categories=SEASONS),
+    })
+    return daily, seasonal
+
+
+def print_summary(seasonal: pd.DataFrame, top: int = 10):
+    """Cities with the most dangerous pre-monsoon heat stress"""
+    summer = seasonal[seasonal['Season'] == 'Pre-Monsoon']
+    if summer.empty:
+        summer = seasonal
+    by_city = summer.groupby('City Name', sort=False)[[
+        'Heat Index Danger Hours', 'Heat Index Danger Days', 'Wet-Bulb Danger Hours',
+        'Heat Index Max (°C)', 'Wet-Bulb Max (°C)', 'Cooling Degree Days']].agg(
+        {'Heat Index Danger Hours': 'mean', 'Heat Index Danger Days': 'mean', 'Wet-Bulb Danger Hours': 'mean',
+         'Heat Index Max (°C)': 'max', 'Wet-Bulb Max (°C)': 'max', 'Cooling Degree Days': 'mean'})
+    ranked = by_city.sort_values('Heat Index Danger Hours', ascending=False).head(top)
+    print(f"\n🔥 HIGHEST {summer['Season'].iloc[0].upper()} HEAT STRESS (per season, averaged over years):")
+    print("-" * 80)
+    for i, (city, row) in enumerate(ranked.iterrows(), 1):
+        print(f"{i:2d}. {city:20s} HI≥41°C: {row['Heat Index Danger Hours']:6.0f} h "
+              f"({row['Heat Index Danger Days']:4.0f} days), WB≥31°C: {row['Wet-Bulb Danger Hours']:4.0f} h, "
+              f"max HI {row['Heat Index Max (°C)']:.1f}°C, max WB {row['Wet-Bulb Max (°C)']:.1f}°C, "
+              f"CDD {row['Cooling Degree Days']:.0f}")
+
+
+def main():
+    """Compute heat-stress rollups for every city"""
+    parser = argparse.ArgumentParser(description='Heat-stress indices over hourly weather history')
+    today = date.today()
+    parser.add_argument('--start', default=f"{today.year - 1}-01-01", help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end', default=f"{today.year - 1}-12-31", help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--history', help='Hourly history .npz (default: fetch and cache under data/raw/)')
+    parser.add_argument('--simulate', action='store_true', help='Use synthetic hourly weather (no network)')
+    parser.add_argument('--cities', type=int, help='With --simulate: replicate the catalogue to this many cities')
+    parser.add_argument('--block', type=int, default=16, help='Cities per vectorized block')
+    parser.add_argument('--base', type=float, default=COOLING_BASE_C, help='Cooling base temperature (°C)')
+    parser.add_argument('--no-daily', action='store_true', help='Only save the seasonal table')
+    args = parser.parse_args()
+
+    cities = get_catalogue().to_records()
+    if args.simulate and args.cities:
+        cities = [dict(cities[i % len(cities)], name=f"{cities[i % len(cities)]['name']} #{i}")
+                  for i in range(args.cities)]
+
+    print("=" * 80)
+    print("HEAT-STRESS INDICES")
+    print("=" * 80)
+    started = time.perf_counter()
+    cache = args.history or os.path.join(RAW_DIR, f"hourly_weather_{args.start}_{args.end}.npz")
+    if args.simulate:
+        weather = HourlyWeather.simulate(cities, args.start, args.end, seed=42)
+    elif os.path.exists(cache):
+        print(f"Loading hourly history: {cache}")
+        weather = HourlyWeather.load(cache)
+    else:
+        print(f"Fetching hourly history {args.start} → {args.end} for {len(cities)} cities...")
+        weather = HourlyWeather.from_open_meteo(cities, args.start, args.end)
+        weather.save(cache)
+        print(f"✓ Cached to: {cache}")
+    loaded = time.perf_counter()
+    n_cities, n_hours = weather.shape
+    print(f"{n_cities:,} cities × {n_hours:,} hours ({n_cities * n_hours:,} city-hours) "
+          f"in {loaded - started:.2f}s")
+
+    daily, seasonal = heat_stress_rollups(weather, args.block, args.base)
+    computed = time.perf_counter()
+    print(f"Indices and rollups: {computed - loaded:.2f}s "
+          f"({n_cities * n_hours / max(computed - loaded, 1e-9) / 1e6:.1f}M city-hours/s)")
+    print_summary(seasonal)
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    stem = f"heat_stress_{args.start}_{args.end}"
+    seasonal_path = os.path.join(REPORTS_DIR, f"{stem}_seasonal.csv")
+    seasonal.to_csv(seasonal_path, index=False, float_format='%.2f')
+    print(f"\n✓ Seasonal rollup: {seasonal_path}")
+    if not args.no_daily:
+        daily_path = os.path.join(REPORTS_DIR, f"{stem}_daily.csv")
+        daily.to_csv(daily_path, index=False, float_format='%.2f')
+        print(f"✓ Daily rollup: {daily_path}")
+    print(f"Completed in {time.perf_counter() - started:.2f}s")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Resilient HTTP Client for the External APIs
+Shared connection pool, separate connect/read timeouts, jittered exponential
+backoff on 429/5xx and transport errors (honouring Retry-After), and a
+per-host circuit breaker so a dead endpoint fails fast instead of costing a
+full timeout for every city
+"""
+
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import functools
+import random
+import threading
+import time
+import sys
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import METRICS, instrument_session
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Transport errors that count against the host's breaker and are retried
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without a network call while a host's circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host
+    closed -> open after failure_threshold failures; open -> half-open after
+    reset_timeout seconds, where one trial request decides whether to close
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True when a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a request that says nothing about the host's health (e.g. an invalid URL)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True when this failure opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+
+def retry_after_seconds(response: requests.Response) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date); None when absent"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class ResilientClient:
+    """
+    requests wrapper used by the collectors for every external API call
+
+    GET requests are retried up to max_retries times on transport errors and
+    429/5xx responses with full-jitter exponential backoff; once a host has
+    failed failure_threshold times in a row its circuit opens and calls fail
+    immediately with CircuitOpenError until reset_timeout has passed. The
+    threshold defaults to max_retries + 1, so one call that exhausts its
+    retries opens the circuit and a dead host costs a single call's timeouts.
+    """
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 8.0,
+                 failure_threshold: Optional[int] = None, reset_timeout: float = 60.0,
+                 pool_connections: int = 8, pool_maxsize: int = 16,
+                 sleep=time.sleep):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = max_retries + 1 if failure_threshold is None else failure_threshold
+        self.reset_timeout = reset_timeout
+        self.sleep = sleep
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        # Retries are handled here (with Retry-After and the breaker), not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        instrument_session(self.session)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def get(self, url: str, params: Dict = None, timeout: Tuple[float, float] = None, **kwargs) -> requests.Response:
+        """
+        GET with retries and the host's circuit breaker
+        Returns the final response (which may still be a 429/5xx after the last
+        retry) or raises the last transport error / CircuitOpenError
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        timeout = timeout or self.timeout
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                METRICS.inc('uhi_http_short_circuited_total', host=host)
+                raise CircuitOpenError(f"circuit open for {host} after {breaker.failures} consecutive failures")
+
+            delay = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+            except TRANSIENT_ERRORS:
+                if breaker.record_failure():
+                    METRICS.inc('uhi_http_circuit_opened_total', host=host)
+                if attempt == self.max_retries or breaker.state == CircuitBreaker.OPEN:
+                    raise
+            except requests.exceptions.RequestException:
+                # Not retryable; free a half-open trial slot so the host is not stuck
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                if breaker.record_failure():
+                    METRICS.inc('uhi_http_circuit_opened_total', host=host)
+                if attempt == self.max_retries or breaker.state == CircuitBreaker.OPEN:
+                    return response
+                delay = retry_after_seconds(response)
+
+            METRICS.inc('uhi_http_retries_total', host=host)
+            self.sleep(min(self.backoff_cap, delay) if delay is not None else self.backoff(attempt))
+
+    def close(self):
+        self.session.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_client() -> ResilientClient:
+    """Process-wide client so all collectors share the pool and circuit breakers"""
+    return ResilientClient()
+
+
+def main():
+    """Exercise the client against a local flaky server and a dead endpoint"""
+    import http.server
+    import socket
+
+    class FlakyHandler(http.server.BaseHTTPRequestHandler):
+        calls = 0
+
+        def do_GET(self):
+            FlakyHandler.calls += 1
+            if self.path.startswith('/flaky') and FlakyHandler.calls % 3:
+                self.send_response(503)
+                self.send_header('Retry-After', '0')
+                self.end_headers()
+                return
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # A bound but never-accepting socket stands in for a hung endpoint
+    dead = socket.socket()
+    dead.bind(('127.0.0.1', 0))
+    dead.listen(0)
+
+    client = ResilientClient(connect_timeout=0.5, read_timeout=0.5, backoff_base=0.05)
+    print("=" * 80)
+    print("RESILIENT CLIENT SELF-CHECK")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    response = client.get(f'http://127.0.0.1:{server.server_port}/flaky')
+    print(f"Flaky endpoint: HTTP {response.status_code} after {FlakyHandler.calls} attempts "
+          f"({time.perf_counter() - started:.2f}s)")
+
+    started = time.perf_counter()
+    outcomes = []
+    for _ in range(10):
+        try:
+            client.get(f'http://127.0.0.1:{dead.getsockname()[1]}/lookup')
+            outcomes.append('ok')
+        except CircuitOpenError:
+            outcomes.append('short-circuited')
+        except requests.exceptions.RequestException as e:
+            outcomes.append(type(e).__name__)
+    print(f"Dead endpoint, 10 calls in {time.perf_counter() - started:.2f}s: {outcomes}")
+
+    server.shutdown()
+    dead.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Spatial Imputation for Failed API Fields
+Fills missing weather and AQI values from neighbouring cities using
+inverse-distance weighting over a nearest-neighbour index of city coordinates
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from indian_cities import INDIAN_CITIES
+from instrumentation import timed
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy is optional; fall back to chunked brute force
+    cKDTree = None
+
+EARTH_RADIUS_KM = 6371.0
+
+# Fields filled from API responses that may come back missing
+IMPUTABLE_COLUMNS = [
+    'Temperature (°C)',
+    'Temperature Max (°C)',
+    'Temperature Min (°C)',
+    'Humidity (%)',
+    'Wind Speed (km/h)',
+    'Cloud Cover (%)',
+    'Daily Precipitation (mm)',
+    'Air Quality Index (AQI)',
+]
+
+PROVENANCE_COLUMN = 'Imputed Fields'
+
+
+def _to_unit_vectors(lat, lon) -> np.ndarray:
+    """Convert lat/lon in degrees to 3D unit vectors"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+class CitySpatialIndex:
+    """
+    k-nearest-neighbour index over city coordinates
+    Uses a KD-tree on unit-sphere vectors when scipy is available
+    """
+
+    def __init__(self, lat: Sequence[float], lon: Sequence[float]):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.points = _to_unit_vectors(self.lat, self.lon)
+        self.tree = cKDTree(self.points) if cKDTree is not None else None
+
+    @classmethod
+    def from_cities(cls, cities: List[Dict] = None) -> 'CitySpatialIndex':
+        """Build an index over city dicts (defaults to INDIAN_CITIES)"""
+        cities = INDIAN_CITIES if cities is None else cities
+        return cls([c['lat'] for c in cities], [c['lon'] for c in cities])
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, lat, lon, k: int = 5, chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (distances_km, indices) of the k nearest indexed cities for each query point
+        Both arrays have shape (n_queries, k), nearest first
+        """
+        k = min(k, len(self))
+        queries = _to_unit_vectors(lat, lon)
+        if self.tree is not None:
+            chord, indices = self.tree.query(queries, k=k)
+            chord, indices = chord.reshape(len(queries), k), indices.reshape(len(queries), k)
+        else:
+            chord = np.empty((len(queries), k))
+            indices = np.empty((len(queries), k), dtype=np.intp)
+            for start in range(0, len(queries), chunk_size):
+                block = queries[start:start + chunk_size]
+                # Squared chord length between unit vectors is 2 - 2 cos(angle)
+                sq = np.maximum(2.0 - 2.0 * block @ self.points.T, 0.0)
+                nearest = np.argpartition(sq, k - 1, axis=1)[:, :k] if k < len(self) else \
+                    np.broadcast_to(np.arange(len(self)), sq.shape)
+                nearest_sq = np.take_along_axis(sq, nearest, axis=1)
+                order = np.argsort(nearest_sq, axis=1)
+                indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+                chord[start:start + len(block)] = np.sqrt(np.take_along_axis(nearest_sq, order, axis=1))
+
+        # Chord length on the unit sphere -> great-circle distance in km
+        distances = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+        return distances, indices
+
+
+def idw_interpolate(index: CitySpatialIndex, donor_values: np.ndarray, lat, lon,
+                    k: int = 5, power: float = 2.0) -> np.ndarray:
+    """
+    Inverse-distance weighted interpolation of donor_values (aligned with index)
+    at the query points; a donor at zero distance is taken as-is
+    """
+    distances, indices = index.query(lat, lon, k=k)
+    values = donor_values[indices]
+    with np.errstate(divide='ignore'):
+        weights = 1.0 / distances ** power
+    exact = np.isinf(weights)
+    has_exact = exact.any(axis=1)
+    weights[has_exact] = exact[has_exact].astype(float)
+    return (weights * values).sum(axis=1) / weights.sum(axis=1)
+
+
+class SpatialImputer:
+    """Fills NaN fields of a collected dataset from neighbouring cities' observations"""
+
+    def __init__(self, k: int = 5, power: float = 2.0, columns: List[str] = None):
+        self.k = k
+        self.power = power
+        self.columns = IMPUTABLE_COLUMNS if columns is None else columns
+
+    @timed('imputation')
+    def impute(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Return (filled frame, boolean mask of imputed cells)
+        The 'Imputed Fields' provenance column is extended for every filled cell
+        """
+        df = df.copy()
+        if df.empty:
+            return df, pd.DataFrame(index=df.index)
+        lat = df['Latitude'].to_numpy(dtype=float)
+        lon = df['Longitude'].to_numpy(dtype=float)
+        columns = [col for col in self.columns if col in df.columns]
+        mask = pd.DataFrame(False, index=df.index, columns=columns)
+
+        for column in columns:
+            values = df[column].to_numpy(dtype=float, na_value=np.nan, copy=True)
+            missing = np.isnan(values)
+            observed = ~missing
+            if not missing.any() or not observed.any():
+                continue
+
+            # One index over this column's donors, one batched query for all gaps
+            index = CitySpatialIndex(lat[observed], lon[observed])
+            filled = idw_interpolate(index, values[observed], lat[missing], lon[missing],
+                                     k=self.k, power=self.power)
+            values[missing] = filled
+            df[column] = values
+            mask[column] = missing
+
+        if PROVENANCE_COLUMN not in df.columns:
+            df[PROVENANCE_COLUMN] = ''
+        provenance = df[PROVENANCE_COLUMN].fillna('').to_numpy(dtype=object, copy=True)
+        for column in columns:
+            rows = mask[column].to_numpy()
+            if rows.any():
+                current = provenance[rows]
+                provenance[rows] = np.where(current == '', column, current + ';' + column)
+        df[PROVENANCE_COLUMN] = provenance
+
+        return df, mask
+
+
+def impute_missing_fields(df: pd.DataFrame, k: int = 5, power: float = 2.0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Convenience wrapper around SpatialImputer with the default column set"""
+    return SpatialImputer(k=k, power=power).impute(df)
@@ -3,6 +3,17 @@ Major Indian Cities Database
 50 major urban cities in India with geographical coordinates
 """
 
+import functools
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+from city_catalogue import CityCatalogue
+
+# Set to a CSV of name, state, lat, lon, tier records to run over another catalogue
+CATALOGUE_PATH_ENV = 'UHI_CITY_CATALOGUE'
+
 INDIAN_CITIES = [
     # Metro Cities (Tier 1)
     {"name": "Mumbai", "state": "Maharashtra", "lat": 19.0760, "lon": 72.8777, "tier": 1},
@@ -59,15 +70,27 @@ INDIAN_CITIES = [
     {"name": "Mysore", "state": "Karnataka", "lat": 12.2958, "lon": 76.6394, "tier": 2},
 ]
 
+@functools.lru_cache(maxsize=None)
+def get_catalogue():
+    """Return the active city catalogue (UHI_CITY_CATALOGUE file or the 50 cities above)"""
+    path = os.environ.get(CATALOGUE_PATH_ENV)
+    if path:
+        return CityCatalogue.from_csv(path)
+    return CityCatalogue.from_records(INDIAN_CITIES)
+
+@functools.lru_cache(maxsize=None)
+def _all_city_records():
+    """Catalogue records, materialized once"""
+    return tuple(get_catalogue().to_records())
+
 def get_all_cities():
-    """Return list of all cities"""
-    return INDIAN_CITIES
+    """Return list of all cities (the record dicts are cached and shared: treat them as read-only)"""
+    return list(_all_city_records())
 
 def get_cities_by_tier(tier):
     """Get cities by tier (1 or 2)"""
-    return [city for city in INDIAN_CITIES if city['tier'] == tier]
+    return get_catalogue().filter(tier=tier).to_records()
 
 def get_city_count():
     """Return total count of cities"""
-    return len(INDIAN_CITIES)
-
+    return len(get_catalogue())
@@ -0,0 +1,537 @@
+"""
+Pluggable Data Source Providers
+Weather, air quality, elevation, population and land cover behind one
+interface with batch fetch(points), backed either by the HTTP APIs or by
+local CSV / Parquet / NetCDF snapshots, selected by configuration
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+import functools
+import json
+import threading
+import time
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import PROJECT_ROOT
+from reference_data import get_reference_data
+
+# JSON file selecting a backend per data kind (see build_providers)
+PROVIDERS_CONFIG_ENV = 'UHI_PROVIDERS'
+
+PROVIDER_KINDS = ['weather', 'air_quality', 'elevation', 'population', 'land_cover']
+
+# Fields each kind returns, in the collector's internal naming
+PROVIDER_FIELDS = {
+    'weather': ['temperature', 'humidity', 'wind_speed', 'cloud_cover', 'precipitation_sum', 'temp_max', 'temp_min'],
+    'air_quality': ['aqi'],
+    'elevation': ['elevation'],
+    'population': ['population', 'population_density'],
+    'land_cover': ['greenness'],
+}
+
+# Column names accepted in local snapshots; processed datasets work as snapshots as-is
+FILE_COLUMN_ALIASES = {
+    'temperature': ['temperature', 'Temperature (°C)'],
+    'humidity': ['humidity', 'Humidity (%)'],
+    'wind_speed': ['wind_speed', 'Wind Speed (km/h)'],
+    'cloud_cover': ['cloud_cover', 'Cloud Cover (%)'],
+    'precipitation_sum': ['precipitation_sum', 'Daily Precipitation (mm)'],
+    'temp_max': ['temp_max', 'Temperature Max (°C)'],
+    'temp_min': ['temp_min', 'Temperature Min (°C)'],
+    'aqi': ['aqi', 'Air Quality Index (AQI)'],
+    'elevation': ['elevation', 'Elevation (m)'],
+    'population': ['population', 'Population'],
+    'population_density': ['population_density', 'Population Density (people/km²)'],
+    'greenness': ['greenness', 'Urban Greenness Ratio (%)'],
+}
+NAME_COLUMNS = ['name', 'City Name']
+LAT_COLUMNS = ['lat', 'latitude', 'Latitude']
+LON_COLUMNS = ['lon', 'longitude', 'Longitude']
+
+
+def pm25_to_aqi(pm25: float) -> int:
+    """Convert PM2.5 to AQI using simplified formula"""
+    if pm25 <= 12.0:
+        return int((50 / 12.0) * pm25)
+    elif pm25 <= 35.4:
+        return int(50 + ((100 - 50) / (35.4 - 12.1)) * (pm25 - 12.1))
+    elif pm25 <= 55.4:
+        return int(100 + ((150 - 100) / (55.4 - 35.5)) * (pm25 - 35.5))
+    elif pm25 <= 150.4:
+        return int(150 + ((200 - 150) / (150.4 - 55.5)) * (pm25 - 55.5))
+    elif pm25 <= 250.4:
+        return int(200 + ((300 - 200) / (250.4 - 150.5)) * (pm25 - 150.5))
+    else:
+        return int(300 + ((500 - 300) / (500.4 - 250.5)) * (pm25 - 250.5))
+
+
+def _point_arrays(points: Sequence[Dict]):
+    """(names, lat, lon) arrays from point dicts with name/lat/lon keys"""
+    names = np.array([p.get('name', '') for p in points], dtype=object)
+    lat = np.array([p['lat'] for p in points], dtype=float)
+    lon = np.array([p['lon'] for p in points], dtype=float)
+    return names, lat, lon
+
+
+class DataProvider:
+    """
+    Base provider: fetch(points) returns {field: array aligned with points},
+    NaN where a value is unavailable
+
+    Subclasses implement fetch_one (called concurrently by the default fetch)
+    or override fetch for natively batched or vectorized backends.
+    """
+
+    kind = None
+    max_workers = 1
+
+    @property
+    def fields(self) -> List[str]:
+        return PROVIDER_FIELDS[self.kind]
+
+    def empty(self, n: int) -> Dict[str, np.ndarray]:
+        return {field: np.full(n, np.nan) for field in self.fields}
+
+    def fetch_one(self, point: Dict) -> Dict:
+        raise NotImplementedError
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        result = self.empty(len(points))
+        if self.max_workers > 1 and len(points) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                records = list(executor.map(self.fetch_one, points))
+        else:
+            records = [self.fetch_one(point) for point in points]
+        for i, record in enumerate(records):
+            for field in self.fields:
+                result[field][i] = record.get(field, np.nan)
+        return result
+
+    def fetch_point(self, lat: float, lon: float, name: str = '') -> Dict:
+        """Single-point convenience used by the collector's per-city methods"""
+        values = self.fetch([{'name': name, 'lat': lat, 'lon': lon}])
+        return {field: values[field][0].item() for field in self.fields}
+
+
+# ---------------------------------------------------------------------------
+# HTTP providers
+# ---------------------------------------------------------------------------
+
+class OpenMeteoWeatherProvider(DataProvider):
+    """Open-Meteo forecast API (free, no key); many points per request"""
+
+    kind = 'weather'
+    url = "https://api.open-meteo.com/v1/forecast"
+
+    def __init__(self, client=None, batch_size: int = 50):
+        from http_client import get_default_client
+        self.client = client or get_default_client()
+        self.batch_size = batch_size
+
+    def _params(self, lat, lon) -> Dict:
+        return {
+            'latitude': lat,
+            'longitude': lon,
+            'current': 'temperature_2m,relative_humidity_2m,wind_speed_10m,cloud_cover',
+            'daily': 'temperature_2m_max,temperature_2m_min,precipitation_sum',
+            'timezone': 'Asia/Kolkata'
+        }
+
+    @staticmethod
+    def _parse(data: Dict) -> Dict:
+        current = data.get('current', {})
+        daily = data.get('daily', {})
+        return {
+            'temperature': current.get('temperature_2m', np.nan),
+            'humidity': current.get('relative_humidity_2m', np.nan),
+            'wind_speed': current.get('wind_speed_10m', np.nan),
+            'cloud_cover': current.get('cloud_cover', np.nan),
+            'precipitation_sum': daily.get('precipitation_sum', [np.nan])[0] if daily.get('precipitation_sum') else np.nan,
+            'temp_max': daily.get('temperature_2m_max', [np.nan])[0] if daily.get('temperature_2m_max') else np.nan,
+            'temp_min': daily.get('temperature_2m_min', [np.nan])[0] if daily.get('temperature_2m_min') else np.nan,
+        }
+
+    def fetch_one(self, point: Dict) -> Dict:
+        try:
+            response = self.client.get(self.url, params=self._params(point['lat'], point['lon']))
+            if response.status_code == 200:
+                return self._parse(response.json())
+            print(f"Weather API error for {point.get('name', '')}: {response.status_code}")
+        except Exception as e:
+            print(f"Error fetching weather for {point.get('name', '')}: {e}")
+        return {}
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        """Comma-separated coordinates fetch a whole batch in one request"""
+        if len(points) == 1:
+            return super().fetch(points)
+        result = self.empty(len(points))
+        for start in range(0, len(points), self.batch_size):
+            batch = points[start:start + self.batch_size]
+            params = self._params(','.join(f"{p['lat']}" for p in batch), ','.join(f"{p['lon']}" for p in batch))
+            try:
+                response = self.client.get(self.url, params=params)
+                payload = response.json() if response.status_code == 200 else None
+            except Exception as e:
+                print(f"Error fetching weather batch: {e}")
+                payload = None
+            if payload is None:
+                records = [self.fetch_one(p) for p in batch]
+            else:
+                records = [self._parse(d) for d in (payload if isinstance(payload, list) else [payload])]
+            for offset, record in enumerate(records):
+                for field in self.fields:
+                    result[field][start + offset] = record.get(field, np.nan)
+        return result
+
+
+class OpenAQProvider(DataProvider):
+    """OpenAQ latest PM2.5 within 50 km, converted to AQI"""
+
+    kind = 'air_quality'
+    url = "https://api.openaq.org/v2/latest"
+
+    def __init__(self, client=None, max_workers: int = 4):
+        from http_client import get_default_client
+        self.client = client or get_default_client()
+        self.max_workers = max_workers
+
+    def fetch_one(self, point: Dict) -> Dict:
+        try:
+            params = {
+                'coordinates': f"{point['lat']},{point['lon']}",
+                'radius': 50000,  # 50km radius
+                'limit': 1
+            }
+            response = self.client.get(self.url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('results'):
+                    measurements = data['results'][0].get('measurements', [])
+                    aqi = 0
+                    for m in measurements:
+                        if m.get('parameter') == 'pm25':
+                            aqi = pm25_to_aqi(m.get('value', 0))
+                            break
+                    return {'aqi': aqi if aqi > 0 else np.nan}
+        except Exception as e:
+            print(f"Error fetching AQI for {point.get('name', '')}: {e}")
+        return {'aqi': np.nan}
+
+
+class OpenElevationProvider(DataProvider):
+    """Open-Elevation lookup API; many points per request"""
+
+    kind = 'elevation'
+    url = "https://api.open-elevation.com/api/v1/lookup"
+
+    def __init__(self, client=None, batch_size: int = 100):
+        from http_client import get_default_client
+        self.client = client or get_default_client()
+        self.batch_size = batch_size
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        result = self.empty(len(points))
+        for start in range(0, len(points), self.batch_size):
+            batch = points[start:start + self.batch_size]
+            locations = '|'.join(f"{p['lat']},{p['lon']}" for p in batch)
+            try:
+                response = self.client.get(f"{self.url}?locations={locations}")
+                if response.status_code == 200:
+                    for offset, item in enumerate(response.json()['results']):
+                        result['elevation'][start + offset] = item['elevation']
+            except Exception as e:
+                print(f"Error fetching elevation: {e}")
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Local providers
+# ---------------------------------------------------------------------------
+
+class DEMElevationProvider(DataProvider):
+    """Vectorized elevation from local DEM tiles (see dem.py)"""
+
+    kind = 'elevation'
+
+    def __init__(self, dem=None, directory: str = None):
+        from dem import LocalDEM, get_local_dem
+        self.dem = dem or (LocalDEM(directory) if directory else get_local_dem())
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        if self.dem is None:
+            return self.empty(len(points))
+        _, lat, lon = _point_arrays(points)
+        return {'elevation': self.dem.elevation(lat, lon)}
+
+
+class ReferencePopulationProvider(DataProvider):
+    """Population and density from the reference registry, with registry defaults"""
+
+    kind = 'population'
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        ref = get_reference_data()
+        names, _, _ = _point_arrays(points)
+        population = ref.take('population', names, fill_value=ref.default_population)
+        density = ref.take('population_density', names, fill_value=ref.default_population_density)
+        return {'population': population, 'population_density': density}
+
+
+class EstimatedLandCoverProvider(DataProvider):
+    """
+    Urban greenness estimate until NDVI data from Sentinel-2 is wired in:
+    uniform(25, 40) for known green cities, uniform(10, 25) otherwise
+    """
+
+    kind = 'land_cover'
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        names, _, _ = _point_arrays(points)
+        is_green = get_reference_data().take('high_greenness', names, fill_value=False)
+        low = np.where(is_green, 25.0, 10.0)
+        return {'greenness': np.random.uniform(low, low + 15.0)}
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Values from a local snapshot: CSV, Parquet or NetCDF
+
+    Tabular snapshots are joined on city name when both sides have one and
+    otherwise matched to the nearest row within max_distance_km. NetCDF grids
+    are sampled at the nearest grid cell (last time step). Requires pyarrow
+    for Parquet and xarray for NetCDF.
+    """
+
+    def __init__(self, kind: str, path: str, columns: Dict[str, str] = None, max_distance_km: float = 50.0):
+        self.kind = kind
+        self.path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+        self.columns = columns or {}
+        self.max_distance_km = max_distance_km
+        self._table = None
+        self._grid = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._table is not None or self._grid is not None:
+                return
+            suffix = os.path.splitext(self.path)[1].lower()
+            if suffix in ('.nc', '.nc4', '.netcdf'):
+                import xarray as xr
+                self._grid = xr.open_dataset(self.path)
+                return
+
+            import pandas as pd
+            table = pd.read_parquet(self.path) if suffix in ('.parquet', '.pq') else pd.read_csv(self.path)
+            self._table = table
+            self._name_column = next((c for c in NAME_COLUMNS if c in table.columns), None)
+            self._lat_column = next((c for c in LAT_COLUMNS if c in table.columns), None)
+            self._lon_column = next((c for c in LON_COLUMNS if c in table.columns), None)
+            if self._lat_column and self._lon_column:
+                from imputation import CitySpatialIndex
+                self._index = CitySpatialIndex(table[self._lat_column], table[self._lon_column])
+
+    def _source_column(self, field: str, available) -> str:
+        candidates = [self.columns[field]] if field in self.columns else FILE_COLUMN_ALIASES.get(field, [field])
+        return next((c for c in candidates if c in available), None)
+
+    def _fetch_table(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        names, lat, lon = _point_arrays(points)
+        table = self._table
+        rows = np.full(len(points), -1)
+        if self._name_column is not None:
+            import pandas as pd
+            # Repeated city names (e.g. appended collection runs) resolve to the last row
+            latest = np.flatnonzero(~table[self._name_column].duplicated(keep='last').to_numpy())
+            rows = pd.Index(table[self._name_column].iloc[latest]).get_indexer(pd.Index(names))
+            rows = np.where(rows >= 0, latest[rows], -1)
+        unmatched = rows < 0
+        if unmatched.any() and self._index is not None:
+            distances, nearest = self._index.query(lat[unmatched], lon[unmatched], k=1)
+            rows[unmatched] = np.where(distances[:, 0] <= self.max_distance_km, nearest[:, 0], -1)
+
+        result = self.empty(len(points))
+        found = rows >= 0
+        for field in self.fields:
+            column = self._source_column(field, table.columns)
+            if column is not None:
+                values = table[column].to_numpy(dtype=float, na_value=np.nan)
+                result[field][found] = values[rows[found]]
+        return result
+
+    def _fetch_grid(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        import xarray as xr
+        _, lat, lon = _point_arrays(points)
+        grid = self._grid
+        lat_name = next(c for c in LAT_COLUMNS if c in grid.coords)
+        lon_name = next(c for c in LON_COLUMNS if c in grid.coords)
+        indexers = {lat_name: xr.DataArray(lat, dims='points'), lon_name: xr.DataArray(lon, dims='points')}
+
+        result = self.empty(len(points))
+        for field in self.fields:
+            variable = self._source_column(field, grid.data_vars)
+            if variable is None:
+                continue
+            data = grid[variable]
+            if 'time' in data.dims:
+                data = data.isel(time=-1)
+            result[field] = data.sel(indexers, method='nearest').to_numpy().astype(float)
+        return result
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        self._load()
+        if not points:
+            return self.empty(0)
+        return self._fetch_grid(points) if self._grid is not None else self._fetch_table(points)
+
+
+# ---------------------------------------------------------------------------
+# Combinators
+# ---------------------------------------------------------------------------
+
+class FallbackProvider(DataProvider):
+    """Ask each provider in turn for the points still missing values"""
+
+    def __init__(self, providers: List[DataProvider]):
+        self.providers = providers
+        self.kind = providers[0].kind
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        result = self.empty(len(points))
+        missing = np.ones(len(points), dtype=bool)
+        for provider in self.providers:
+            if not missing.any():
+                break
+            rows = np.flatnonzero(missing)
+            values = provider.fetch([points[i] for i in rows])
+            for field in self.fields:
+                result[field][rows] = values[field]
+            missing = np.column_stack([np.isnan(result[f]) for f in self.fields]).any(axis=1)
+        return result
+
+
+class CachingProvider(DataProvider):
+    """
+    In-memory TTL cache in front of a provider, keyed by rounded coordinates
+    All-NaN records (failed fetches) are not cached, so an outage is retried on the next call
+    """
+
+    def __init__(self, provider: DataProvider, ttl_seconds: float = 900.0, precision: int = 4):
+        self.provider = provider
+        self.kind = provider.kind
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, points: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        now = time.monotonic()
+        keys = [(round(p['lat'], self.precision), round(p['lon'], self.precision)) for p in points]
+        result = self.empty(len(points))
+        misses = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._cache.get(key)
+                if entry is not None and now - entry[0] < self.ttl_seconds:
+                    for field in self.fields:
+                        result[field][i] = entry[1][field]
+                else:
+                    misses.append(i)
+        if misses:
+            values = self.provider.fetch([points[i] for i in misses])
+            with self._lock:
+                for j, i in enumerate(misses):
+                    record = {field: values[field][j] for field in self.fields}
+                    for field in self.fields:
+                        result[field][i] = record[field]
+                    if not all(np.isnan(value) for value in record.values()):
+                        self._cache[keys[i]] = (now, record)
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+HTTP_PROVIDERS = {
+    'weather': OpenMeteoWeatherProvider,
+    'air_quality': OpenAQProvider,
+    'elevation': OpenElevationProvider,
+}
+
+DEFAULT_CONFIG = {
+    'weather': {'type': 'http'},
+    'air_quality': {'type': 'http'},
+    'elevation': {'type': 'dem', 'fallback': [{'type': 'http'}]},
+    'population': {'type': 'reference'},
+    'land_cover': {'type': 'estimate'},
+}
+
+
+def build_provider(kind: str, spec: Dict) -> DataProvider:
+    """
+    Build one provider from a spec such as
+    {"type": "file", "path": "data/snapshots/weather.parquet", "columns": {...},
+     "fallback": [{"type": "http"}], "cache_ttl": 900}
+    """
+    backend = spec.get('type', 'http')
+    if backend == 'http':
+        if kind not in HTTP_PROVIDERS:
+            raise ValueError(f"No HTTP provider for '{kind}'")
+        provider = HTTP_PROVIDERS[kind]()
+    elif backend == 'file':
+        provider = LocalFileProvider(kind, spec['path'], columns=spec.get('columns'),
+                                     max_distance_km=spec.get('max_distance_km', 50.0))
+    elif backend == 'dem' and kind == 'elevation':
+        provider = DEMElevationProvider(directory=spec.get('path'))
+    elif backend == 'reference' and kind == 'population':
+        provider = ReferencePopulationProvider()
+    elif backend == 'estimate' and kind == 'land_cover':
+        provider = EstimatedLandCoverProvider()
+    else:
+        raise ValueError(f"Unknown provider type '{backend}' for '{kind}'")
+
+    if spec.get('fallback'):
+        provider = FallbackProvider([provider] + [build_provider(kind, s) for s in spec['fallback']])
+    if spec.get('cache_ttl'):
+        provider = CachingProvider(provider, ttl_seconds=spec['cache_ttl'])
+    return provider
+
+
+def build_providers(config: Dict = None) -> Dict[str, DataProvider]:
+    """Providers for every kind; config entries override DEFAULT_CONFIG per kind"""
+    merged = dict(DEFAULT_CONFIG)
+    merged.update(config or {})
+    return {kind: build_provider(kind, merged[kind]) for kind in PROVIDER_KINDS}
+
+
+def load_provider_config(path: str = None) -> Dict:
+    """Read the provider config from path or UHI_PROVIDERS (empty when unset)"""
+    path = path or os.environ.get(PROVIDERS_CONFIG_ENV)
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def get_providers() -> Dict[str, DataProvider]:
+    """Process-wide providers built from UHI_PROVIDERS (or the defaults)"""
+    return build_providers(load_provider_config())
+
+
+def fetch_all(providers: Dict[str, DataProvider], points: Sequence[Dict],
+              kinds: Sequence[str] = PROVIDER_KINDS) -> Dict[str, Dict[str, np.ndarray]]:
+    """Fetch several kinds for the same points concurrently, one thread per kind"""
+    with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+        futures = {kind: executor.submit(providers[kind].fetch, points) for kind in kinds}
+        return {kind: future.result() for kind, future in futures.items()}
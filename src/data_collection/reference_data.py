@@ -0,0 +1,97 @@
+"""
+Static Reference Data Registry
+Loads city reference data (population, area, water proximity, greenness and
+rainfall flags) and land cover parameters once from a versioned JSON file and
+exposes them as array-backed columns keyed by city index
+"""
+
+import numpy as np
+from typing import Dict, Sequence
+import functools
+import json
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import REFERENCE_DIR
+
+DEFAULT_REFERENCE_PATH = os.path.join(REFERENCE_DIR, 'city_reference.json')
+
+# Environment variable to point the registry at an alternative reference file
+REFERENCE_PATH_ENV = 'UHI_REFERENCE_DATA'
+
+
+class ReferenceData:
+    """Array-backed reference columns with O(1) name -> index lookups"""
+
+    def __init__(self, document: Dict):
+        self.version = document['version']
+        cities = document['cities']
+
+        self.names = np.array([c['name'] for c in cities], dtype=object)
+        self.population = np.array([c['population'] for c in cities], dtype=np.int64)
+        self.area_km2 = np.array([c['area_km2'] for c in cities], dtype=float)
+        self.population_density = self.population / self.area_km2
+        self.distance_to_water_km = np.array(
+            [np.nan if c.get('distance_to_water_km') is None else c['distance_to_water_km'] for c in cities],
+            dtype=float)
+        self.water_body = np.array([c.get('water_body') or '' for c in cities], dtype=object)
+        self.high_greenness = np.array([c.get('high_greenness', False) for c in cities], dtype=bool)
+        self.high_rainfall = np.array([c.get('high_rainfall', False) for c in cities], dtype=bool)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+        defaults = document.get('defaults', {})
+        self.default_population = defaults.get('population', 1000000)
+        self.default_population_density = defaults.get('population_density', 5000)
+
+        land_cover = document['land_cover']
+        self.land_cover_types = list(land_cover)
+        self.albedo_low = np.array([lc['albedo_range'][0] for lc in land_cover.values()])
+        self.albedo_high = np.array([lc['albedo_range'][1] for lc in land_cover.values()])
+        self.impervious_base = np.array([lc['impervious_base'] for lc in land_cover.values()], dtype=float)
+        self.default_albedo = document.get('default_albedo', 0.15)
+        self.default_impervious_base = document.get('default_impervious_base', 45)
+        self._land_cover_index = {name: i for i, name in enumerate(self.land_cover_types)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def index_of(self, city_name: str) -> int:
+        """Return the city index, or -1 when the city is not in the registry"""
+        return self._index.get(city_name, -1)
+
+    def indices(self, city_names: Sequence[str]) -> np.ndarray:
+        """Vectorized index_of for many names (-1 for unknown cities)"""
+        return np.fromiter((self._index.get(name, -1) for name in city_names), dtype=np.intp, count=len(city_names))
+
+    def take(self, column: str, city_names: Sequence[str], fill_value=None) -> np.ndarray:
+        """
+        Join a reference column onto city names, filling unknown cities with fill_value
+        The default fill is NaN, which upcasts integer and boolean columns to float
+        """
+        values = getattr(self, column)
+        if fill_value is None:
+            fill_value = np.nan
+        idx = self.indices(city_names)
+        known = idx >= 0
+        result = np.full(len(idx), fill_value, dtype=np.result_type(values.dtype, np.asarray(fill_value).dtype))
+        result[known] = values[idx[known]]
+        return result
+
+    def land_cover_code(self, land_cover: str) -> int:
+        """Return the land cover index, or -1 for an unknown land cover type"""
+        return self._land_cover_index.get(land_cover, -1)
+
+
+def load_reference_data(path: str = None) -> ReferenceData:
+    """Load a reference data file (defaults to the env override or the bundled file)"""
+    path = path or os.environ.get(REFERENCE_PATH_ENV) or DEFAULT_REFERENCE_PATH
+    with open(path, encoding='utf-8') as f:
+        return ReferenceData(json.load(f))
+
+
+@functools.lru_cache(maxsize=None)
+def get_reference_data() -> ReferenceData:
+    """Return the process-wide registry, loading it on first use"""
+    return load_reference_data()
@@ -0,0 +1,224 @@
+"""
+Schema and Data Quality Validation for the Processed UHI Dataset
+Declarative column specifications plus a vectorized, chunk-friendly validator
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable
+import argparse
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import latest_dataset
+from instrumentation import timed
+
+SCHEMA_VERSION = '1.0'
+
+LAND_COVER_TYPES = ['Urban', 'Industrial', 'Green Space', 'Mixed Urban', 'Water']
+
+# Column specifications for the processed (enhanced) dataset
+# dtype: 'string', 'category' or 'float'; min/max are inclusive plausibility bounds
+PROCESSED_SCHEMA = {
+    'City Name': {'dtype': 'string', 'nullable': False},
+    'State': {'dtype': 'string', 'nullable': False},
+    'Latitude': {'dtype': 'float', 'nullable': False, 'min': 6.0, 'max': 37.5, 'unit': '°N'},
+    'Longitude': {'dtype': 'float', 'nullable': False, 'min': 68.0, 'max': 97.5, 'unit': '°E'},
+    'Elevation (m)': {'dtype': 'float', 'nullable': False, 'min': -100, 'max': 9000, 'unit': 'm'},
+    'Temperature (°C)': {'dtype': 'float', 'nullable': True, 'min': -30, 'max': 55, 'unit': '°C'},
+    'Temperature Max (°C)': {'dtype': 'float', 'nullable': True, 'min': -30, 'max': 55, 'unit': '°C'},
+    'Temperature Min (°C)': {'dtype': 'float', 'nullable': True, 'min': -40, 'max': 45, 'unit': '°C'},
+    'UHI Intensity (°C)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 15, 'unit': '°C'},
+    'Humidity (%)': {'dtype': 'float', 'nullable': True, 'min': 0, 'max': 100, 'unit': '%'},
+    'Wind Speed (km/h)': {'dtype': 'float', 'nullable': True, 'min': 0, 'max': 200, 'unit': 'km/h'},
+    'Cloud Cover (%)': {'dtype': 'float', 'nullable': True, 'min': 0, 'max': 100, 'unit': '%'},
+    'Daily Precipitation (mm)': {'dtype': 'float', 'nullable': True, 'min': 0, 'max': 1000, 'unit': 'mm'},
+    'Annual Rainfall (mm)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 12000, 'unit': 'mm'},
+    'Cooling Degree Days': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 40, 'unit': '°C·day'},
+    'Land Cover': {'dtype': 'category', 'nullable': False, 'allowed': LAND_COVER_TYPES},
+    'NDVI': {'dtype': 'float', 'nullable': False, 'min': -1, 'max': 1, 'unit': 'index'},
+    'Urban Greenness Ratio (%)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 100, 'unit': '%'},
+    'Albedo': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 1, 'unit': 'fraction'},
+    'Impervious Surface (%)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 100, 'unit': '%'},
+    'Building Density (buildings/km²)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 20000,
+                                         'unit': 'buildings/km²'},
+    'Distance to Water (km)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 2000, 'unit': 'km'},
+    'Solar Radiation (MJ/m²/day)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 40,
+                                    'unit': 'MJ/m²/day'},
+    'Population': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 50000000, 'unit': 'people'},
+    'Population Density (people/km²)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 100000,
+                                        'unit': 'people/km²'},
+    'Energy Consumption (MWh/year)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 1e9,
+                                      'unit': 'MWh/year'},
+    'Traffic Density (vehicles/km² road)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 50000,
+                                           'unit': 'vehicles/km²'},
+    'Anthropogenic Heat Flux (W/m²)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 500,
+                                       'unit': 'W/m²'},
+    'Urban Sprawl Rate (%/year)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 50, 'unit': '%/year'},
+    'Air Quality Index (AQI)': {'dtype': 'float', 'nullable': True, 'min': 0, 'max': 500, 'unit': 'AQI'},
+    'Health Impact (Mortality Rate/100k)': {'dtype': 'float', 'nullable': False, 'min': 0, 'max': 1000,
+                                            'unit': 'per 100k'},
+    # Semicolon-separated list of fields filled by fallbacks; absent in older datasets
+    'Imputed Fields': {'dtype': 'string', 'nullable': True, 'required': False},
+}
+
+PROVENANCE_COLUMN = 'Imputed Fields'
+
+
+class DataQualityValidator:
+    """
+    Accumulates per-column quality counts over whole frames or streamed chunks
+    All checks are column-wise array operations, so cost is linear in rows
+    """
+
+    def __init__(self, schema: Dict = None):
+        self.schema = schema if schema is not None else PROCESSED_SCHEMA
+        self.rows = 0
+        self.seen_columns = set()
+        self.unexpected_columns = set()
+        self.counts = {column: {'nulls': 0, 'out_of_range': 0, 'type_errors': 0, 'imputed': 0}
+                       for column in self.schema}
+
+    def update(self, df: pd.DataFrame):
+        """Add one frame (or chunk) to the running counts"""
+        self.rows += len(df)
+        self.seen_columns.update(df.columns)
+        self.unexpected_columns.update(set(df.columns) - set(self.schema))
+
+        for column, spec in self.schema.items():
+            if column not in df.columns:
+                continue
+            counts = self.counts[column]
+            series = df[column]
+
+            if spec['dtype'] == 'float':
+                if pd.api.types.is_numeric_dtype(series.dtype):
+                    values = series.to_numpy(dtype=float, na_value=np.nan)
+                    raw_null = np.isnan(values)
+                else:
+                    raw_null = series.isna().to_numpy()
+                    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                null = np.isnan(values)
+                counts['nulls'] += int(null.sum())
+                counts['type_errors'] += int((null & ~raw_null).sum())
+                with np.errstate(invalid='ignore'):
+                    out = np.zeros(len(values), dtype=bool)
+                    if 'min' in spec:
+                        out |= values < spec['min']
+                    if 'max' in spec:
+                        out |= values > spec['max']
+                counts['out_of_range'] += int(out.sum())
+            else:
+                null = series.isna().to_numpy()
+                counts['nulls'] += int(null.sum())
+                if spec['dtype'] == 'category':
+                    invalid = ~series.isin(spec['allowed']).to_numpy() & ~null
+                    counts['out_of_range'] += int(invalid.sum())
+
+        if PROVENANCE_COLUMN in df.columns:
+            self._count_imputed(df[PROVENANCE_COLUMN])
+
+    def _count_imputed(self, provenance: pd.Series):
+        """Tally imputed values per column from the distinct provenance strings"""
+        for fields, count in provenance.dropna().value_counts().items():
+            for field in str(fields).split(';'):
+                if field in self.counts:
+                    self.counts[field]['imputed'] += int(count)
+
+    def report(self) -> pd.DataFrame:
+        """Return the per-column quality report"""
+        records = []
+        for column, spec in self.schema.items():
+            counts = self.counts[column]
+            present = column in self.seen_columns
+            null_rate = counts['nulls'] / self.rows if self.rows else 0.0
+
+            if not present:
+                status = 'MISSING' if spec.get('required', True) else 'OK'
+            elif counts['type_errors'] or (counts['nulls'] and not spec['nullable']):
+                status = 'FAIL'
+            elif counts['out_of_range'] or counts['nulls'] or counts['imputed']:
+                status = 'WARN'
+            else:
+                status = 'OK'
+
+            records.append({
+                'Column': column,
+                'Dtype': spec['dtype'],
+                'Unit': spec.get('unit', ''),
+                'Rows': self.rows if present else 0,
+                'Nulls': counts['nulls'],
+                'Null Rate': round(null_rate, 4),
+                'Out of Range': counts['out_of_range'],
+                'Type Errors': counts['type_errors'],
+                'Imputed': counts['imputed'],
+                'Status': status,
+            })
+
+        report = pd.DataFrame(records).set_index('Column')
+        return report
+
+    def is_valid(self) -> bool:
+        """True when no column failed or is missing"""
+        return not self.report()['Status'].isin(['FAIL', 'MISSING']).any()
+
+
+@timed('schema')
+def validate_frame(df: pd.DataFrame, schema: Dict = None) -> pd.DataFrame:
+    """Validate a whole DataFrame and return its quality report"""
+    validator = DataQualityValidator(schema)
+    validator.update(df)
+    return validator.report()
+
+
+def validate_chunks(chunks: Iterable[pd.DataFrame], schema: Dict = None) -> pd.DataFrame:
+    """Validate a stream of DataFrame chunks and return the combined quality report"""
+    validator = DataQualityValidator(schema)
+    for chunk in chunks:
+        validator.update(chunk)
+    return validator.report()
+
+
+@timed('schema')
+def validate_csv(path: str, chunksize: int = 250000, schema: Dict = None) -> pd.DataFrame:
+    """Stream a CSV file through the validator chunk by chunk"""
+    return validate_chunks(pd.read_csv(path, chunksize=chunksize), schema)
+
+
+def print_quality_summary(report: pd.DataFrame):
+    """Print the columns that need attention from a quality report"""
+    flagged = report[report['Status'] != 'OK']
+    print(f"Columns checked: {len(report)} | OK: {(report['Status'] == 'OK').sum()} | "
+          f"Flagged: {len(flagged)}")
+    if len(flagged):
+        print(flagged[['Null Rate', 'Out of Range', 'Type Errors', 'Imputed', 'Status']].to_string())
+
+
+def main(argv=None):
+    """Validate the latest (or a given) processed dataset"""
+    parser = argparse.ArgumentParser(description='Validate a processed UHI dataset against the schema')
+    parser.add_argument('path', nargs='?', help='CSV file to validate (default: latest processed dataset)')
+    parser.add_argument('--chunksize', type=int, default=250000, help='Rows per streamed chunk')
+    args = parser.parse_args(argv)
+
+    path = args.path or latest_dataset()
+    if path is None:
+        print("No dataset found! Please run enhanced_collector.py first.")
+        return None
+
+    print("=" * 80)
+    print(f"DATA QUALITY REPORT (schema v{SCHEMA_VERSION})")
+    print("=" * 80)
+    print(f"Dataset: {path}\n")
+
+    report = validate_csv(path, chunksize=args.chunksize)
+    print(report.to_string())
+    print()
+    print_quality_summary(report)
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
@@ -0,0 +1,324 @@
+"""
+Global Sensitivity Analysis of the Derived UHI Feature Chain
+Ranks every input and coefficient of the greenness -> NDVI -> albedo -> impervious
+-> UHI chain (and the energy/traffic -> anthropogenic heat chain) by Sobol
+first-order and total indices (Saltelli sampling) and Morris elementary effects.
+Sample matrices are evaluated in large vectorized chunks, optionally across a
+process pool; results depend only on the seed, never on the number of workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+import argparse
+import warnings
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import REPORTS_DIR
+from synthetic import chunk_seeds
+from uncertainty import (_land_cover_parameters, land_cover_codes, ndvi_from_greenness, albedo_from_ndvi,
+                         impervious_from_density, uhi_intensity, traffic_density, anthropogenic_heat)
+
+# Ranges span the processed dataset; coefficients vary +/-50% around the collector's values.
+# 'log' inputs are sampled uniformly in log space, 'choice' inputs pick one of the values.
+SENSITIVITY_INPUTS = {
+    'Urban Greenness Ratio (%)': {'low': 10.0, 'high': 40.0, 'group': 'input'},
+    'NDVI Seasonal Adjustment': {'low': -0.15, 'high': 0.10, 'group': 'input'},
+    'Albedo Draw': {'low': 0.0, 'high': 1.0, 'group': 'input'},
+    'Population Density (people/km²)': {'low': 1500.0, 'high': 75000.0, 'scale': 'log', 'group': 'input'},
+    'Impervious Noise (%)': {'low': -5.0, 'high': 5.0, 'group': 'input'},
+    'Wind Speed (km/h)': {'low': 0.0, 'high': 20.0, 'group': 'input'},
+    'Energy Consumption (MWh/year)': {'low': 5e5, 'high': 1e8, 'scale': 'log', 'group': 'input'},
+    'Population': {'low': 5e5, 'high': 3.5e7, 'scale': 'log', 'group': 'input'},
+    'City Tier': {'choices': (1, 2), 'group': 'input'},
+    'UHI Base (°C)': {'low': 1.0, 'high': 3.0, 'group': 'coefficient'},
+    'Impervious Coefficient': {'low': 1.5, 'high': 4.5, 'group': 'coefficient'},
+    'Vegetation Coefficient': {'low': 2.5, 'high': 7.5, 'group': 'coefficient'},
+    'Albedo Coefficient': {'low': 2.5, 'high': 7.5, 'group': 'coefficient'},
+    'Wind Coefficient': {'low': 0.75, 'high': 2.25, 'group': 'coefficient'},
+    'Energy Heat Coefficient': {'low': 5.0, 'high': 15.0, 'group': 'coefficient'},
+    'Traffic Heat Coefficient': {'low': 2.5, 'high': 7.5, 'group': 'coefficient'},
+    'Population Heat Coefficient': {'low': 4.0, 'high': 12.0, 'group': 'coefficient'},
+}
+
+SENSITIVITY_OUTPUTS = [
+    'NDVI',
+    'Albedo',
+    'Impervious Surface (%)',
+    'UHI Intensity (°C)',
+    'Anthropogenic Heat Flux (W/m²)',
+]
+
+
+def scale_inputs(unit: np.ndarray, spec: Dict[str, dict] = SENSITIVITY_INPUTS) -> Dict[str, np.ndarray]:
+    """Map (n, d) points of the unit cube onto the input ranges"""
+    values = {}
+    for j, (name, info) in enumerate(spec.items()):
+        u = unit[:, j]
+        if 'choices' in info:
+            choices = np.asarray(info['choices'])
+            values[name] = choices[np.minimum((u * len(choices)).astype(int), len(choices) - 1)]
+        elif info.get('scale') == 'log':
+            low, high = np.log(info['low']), np.log(info['high'])
+            values[name] = np.exp(low + (high - low) * u)
+        else:
+            values[name] = info['low'] + (info['high'] - info['low']) * u
+    return values
+
+
+def evaluate_chain(unit: np.ndarray) -> np.ndarray:
+    """Evaluate the feature chain at (n, d) unit-cube points, returning (n, outputs)"""
+    x = scale_inputs(unit)
+    albedo_lookup_low, albedo_lookup_high, impervious_lookup = _land_cover_parameters()
+
+    greenness = x['Urban Greenness Ratio (%)']
+    density = x['Population Density (people/km²)']
+    codes = land_cover_codes(greenness, density)
+
+    ndvi = ndvi_from_greenness(greenness, x['NDVI Seasonal Adjustment'])
+    albedo_low, albedo_high = albedo_lookup_low[codes], albedo_lookup_high[codes]
+    albedo = albedo_from_ndvi(albedo_low + (albedo_high - albedo_low) * x['Albedo Draw'], ndvi)
+    impervious = impervious_from_density(impervious_lookup[codes], density, x['Impervious Noise (%)'])
+    uhi = uhi_intensity(impervious, ndvi, albedo, x['Wind Speed (km/h)'],
+                        base=x['UHI Base (°C)'],
+                        impervious_coef=x['Impervious Coefficient'],
+                        vegetation_coef=x['Vegetation Coefficient'],
+                        albedo_coef=x['Albedo Coefficient'],
+                        wind_coef=x['Wind Coefficient'])
+
+    traffic = traffic_density(x['Population'], x['City Tier'], density)
+    heat = anthropogenic_heat(x['Energy Consumption (MWh/year)'], x['Population'], traffic,
+                              energy_coef=x['Energy Heat Coefficient'],
+                              traffic_coef=x['Traffic Heat Coefficient'],
+                              population_coef=x['Population Heat Coefficient'])
+
+    return np.column_stack([ndvi, albedo, impervious, uhi, heat])
+
+
+def _run_chunks(func, tasks: List[tuple], jobs: int = 1) -> List[np.ndarray]:
+    """Run func over tasks, in order, in-process or across a process pool"""
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(func, *zip(*tasks)))
+    return [func(*task) for task in tasks]
+
+
+def _saltelli_chunk(seed: int, start: int, n: int, d: int) -> np.ndarray:
+    """
+    Rows [start, start + n) of the Saltelli design: A, B and the d matrices AB_i
+    (A with column i taken from B). Returns model outputs of shape (n, d + 2, outputs)
+    """
+    engine = qmc.Sobol(2 * d, scramble=True, seed=seed)
+    if start:
+        engine.fast_forward(start)
+    with warnings.catch_warnings():
+        # Chunks start on powers of two; the balance warning is about the total only
+        warnings.simplefilter('ignore', UserWarning)
+        base = engine.random(n)
+
+    a, b = base[:, :d], base[:, d:]
+    design = np.repeat(a[:, None, :], d + 2, axis=1)
+    design[:, 1] = b
+    columns = np.arange(d)
+    design[:, 2 + columns, columns] = b
+    return evaluate_chain(design.reshape(-1, d)).reshape(n, d + 2, -1)
+
+
+def _sobol_terms(outputs: np.ndarray) -> np.ndarray:
+    """
+    Per-row terms whose means give the indices: f, f^2 (over A and B), the
+    first-order numerator (Saltelli 2010) and the total numerator (Jansen)
+    """
+    f_a, f_b, f_ab = outputs[:, 0], outputs[:, 1], outputs[:, 2:]
+    n = len(outputs)
+    return np.concatenate([
+        (f_a + f_b) / 2,
+        (f_a ** 2 + f_b ** 2) / 2,
+        (f_b[:, None] * (f_ab - f_a[:, None])).reshape(n, -1),
+        (0.5 * (f_a[:, None] - f_ab) ** 2).reshape(n, -1),
+    ], axis=1)
+
+
+def sobol_indices(term_means: np.ndarray, d: int, m: int) -> tuple:
+    """
+    (S1, ST), each (..., d, m), from means of _sobol_terms; NaN for constant outputs
+    Leading axes are kept, so a whole stack of bootstrap resamples works at once
+    """
+    mean, square = term_means[..., :m], term_means[..., m:2 * m]
+    first = term_means[..., 2 * m:2 * m + d * m].reshape(term_means.shape[:-1] + (d, m))
+    total = term_means[..., 2 * m + d * m:].reshape(term_means.shape[:-1] + (d, m))
+    variance = square - mean ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.where(variance > 0, variance, np.nan)[..., None, :]
+        return first / variance, total / variance
+
+
+def sobol_analysis(n_samples: int = 2 ** 15, seed: int = 42, chunk_size: int = 2 ** 13,
+                   jobs: int = 1, n_bootstrap: int = 100, confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Sobol indices for every output, with bootstrap confidence half-widths
+    n_samples and chunk_size are rounded up to powers of two for the Sobol sequence;
+    the model is evaluated n_samples * (d + 2) times
+    """
+    d, m = len(SENSITIVITY_INPUTS), len(SENSITIVITY_OUTPUTS)
+    n_samples = 1 << max(int(np.ceil(np.log2(max(n_samples, 2)))), 1)
+    chunk_size = min(1 << max(int(np.ceil(np.log2(max(chunk_size, 2)))), 1), n_samples)
+
+    tasks = [(seed, start, chunk_size, d) for start in range(0, n_samples, chunk_size)]
+    terms = _sobol_terms(np.concatenate(_run_chunks(_saltelli_chunk, tasks, jobs)))
+    first, total = sobol_indices(terms.mean(axis=0), d, m)
+
+    # Bootstrap by resample counts: every resample's term means in one matrix product
+    first_conf = total_conf = np.full((d, m), np.nan)
+    if n_bootstrap > 1:
+        rng = np.random.default_rng(seed)
+        counts = rng.multinomial(n_samples, np.full(n_samples, 1 / n_samples), size=n_bootstrap)
+        boot_first, boot_total = sobol_indices(counts @ terms / n_samples, d, m)
+        z = ndtri(0.5 + confidence / 2)
+        first_conf, total_conf = z * boot_first.std(axis=0), z * boot_total.std(axis=0)
+
+    frames = []
+    for k, output in enumerate(SENSITIVITY_OUTPUTS):
+        frames.append(pd.DataFrame({
+            'Output': output,
+            'Input': list(SENSITIVITY_INPUTS),
+            'Group': [info['group'] for info in SENSITIVITY_INPUTS.values()],
+            'S1': first[:, k],
+            'S1 Conf': first_conf[:, k],
+            'ST': total[:, k],
+            'ST Conf': total_conf[:, k],
+        }))
+    result = pd.concat(frames, ignore_index=True)
+    result.attrs['evaluations'] = n_samples * (d + 2)
+    return result
+
+
+def morris_trajectories(n_trajectories: int, d: int, levels: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Random one-at-a-time trajectories on a `levels` grid (Morris 1991)
+    Returns (n_trajectories, d + 1, d) unit-cube points; consecutive points differ
+    in exactly one input by +/- delta = levels / (2 * (levels - 1))
+    """
+    delta = levels / (2 * (levels - 1))
+    steps = np.tril(np.ones((d + 1, d)), -1)
+    start = rng.integers(0, levels // 2, (n_trajectories, d)) / (levels - 1)
+    signs = rng.choice([-1.0, 1.0], (n_trajectories, d))
+    order = np.argsort(rng.random((n_trajectories, d)), axis=1)
+
+    # Step j moves input order[j]; the sign decides whether it goes up or down
+    moved = np.take_along_axis(steps[None].repeat(n_trajectories, axis=0),
+                               np.argsort(order, axis=1)[:, None, :].repeat(d + 1, axis=1), axis=2)
+    offset = np.where(signs > 0, 0.0, delta)
+    return start[:, None, :] + offset[:, None, :] + (signs * delta)[:, None, :] * moved
+
+
+def _morris_chunk(seq: np.random.SeedSequence, n: int, d: int, levels: int) -> np.ndarray:
+    """Elementary effects of n trajectories, shape (n, d, outputs)"""
+    points = morris_trajectories(n, d, levels, np.random.default_rng(seq))
+    values = evaluate_chain(points.reshape(-1, d)).reshape(n, d + 1, -1)
+
+    step = np.diff(points, axis=1)
+    moved = np.abs(step).argmax(axis=2)
+    delta = np.take_along_axis(step, moved[:, :, None], axis=2)
+    effects = np.diff(values, axis=1) / delta
+
+    ordered = np.empty_like(effects)
+    np.put_along_axis(ordered, moved[:, :, None].repeat(effects.shape[2], axis=2), effects, axis=1)
+    return ordered
+
+
+def morris_analysis(n_trajectories: int = 1000, levels: int = 4, seed: int = 42,
+                    chunk_size: int = 2000, jobs: int = 1) -> pd.DataFrame:
+    """
+    Morris screening: mean (mu), mean absolute (mu*) and std (sigma) of the elementary
+    effects, per unit of each input's range; the model runs n_trajectories * (d + 1) times
+    """
+    d = len(SENSITIVITY_INPUTS)
+    n_chunks = -(-n_trajectories // chunk_size)
+    tasks = [(seq, min(chunk_size, n_trajectories - i * chunk_size), d, levels)
+             for i, seq in enumerate(chunk_seeds(seed, n_chunks))]
+    effects = np.concatenate(_run_chunks(_morris_chunk, tasks, jobs))
+
+    frames = []
+    for k, output in enumerate(SENSITIVITY_OUTPUTS):
+        ee = effects[:, :, k]
+        frames.append(pd.DataFrame({
+            'Output': output,
+            'Input': list(SENSITIVITY_INPUTS),
+            'Group': [info['group'] for info in SENSITIVITY_INPUTS.values()],
+            'Mu': ee.mean(axis=0),
+            'Mu*': np.abs(ee).mean(axis=0),
+            'Sigma': ee.std(axis=0, ddof=1) if n_trajectories > 1 else np.nan,
+        }))
+    result = pd.concat(frames, ignore_index=True)
+    result.attrs['evaluations'] = n_trajectories * (d + 1)
+    return result
+
+
+def print_rankings(table: pd.DataFrame, key: str, outputs: List[str] = None, top: int = 8):
+    """Print the inputs ranked by `key` for each output"""
+    for output in outputs or SENSITIVITY_OUTPUTS:
+        rows = table[table['Output'] == output].sort_values(key, ascending=False).head(top)
+        print(f"\n{output} (ranked by {key}):")
+        print(rows.drop(columns='Output').round(4).to_string(index=False))
+
+
+def main(argv=None):
+    """Run the sensitivity analysis and save the indices"""
+    parser = argparse.ArgumentParser(description='Sobol and Morris sensitivity of the UHI feature chain')
+    parser.add_argument('--method', choices=['sobol', 'morris', 'both'], default='both')
+    parser.add_argument('--samples', type=int, default=2 ** 15,
+                        help='Sobol base samples (power of two); evaluations = samples * (inputs + 2)')
+    parser.add_argument('--trajectories', type=int, default=1000, help='Morris trajectories')
+    parser.add_argument('--levels', type=int, default=4, help='Morris grid levels (even)')
+    parser.add_argument('--bootstrap', type=int, default=100, help='Bootstrap resamples for Sobol intervals')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes')
+    parser.add_argument('--output', nargs='*', default=['UHI Intensity (°C)', 'Anthropogenic Heat Flux (W/m²)'],
+                        help='Outputs to print (all are saved)')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("GLOBAL SENSITIVITY ANALYSIS - UHI FEATURE CHAIN")
+    print("=" * 80)
+    print(f"{len(SENSITIVITY_INPUTS)} inputs, {len(SENSITIVITY_OUTPUTS)} outputs, {args.jobs} worker(s)")
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    results = {}
+
+    if args.method in ('sobol', 'both'):
+        started = time.perf_counter()
+        sobol = sobol_analysis(args.samples, seed=args.seed, jobs=args.jobs, n_bootstrap=args.bootstrap)
+        print(f"\n✓ Sobol: {sobol.attrs['evaluations']:,} evaluations in {time.perf_counter() - started:.1f}s")
+        print_rankings(sobol, 'ST', args.output)
+        filename = f'{REPORTS_DIR}/uhi_sensitivity_sobol_{timestamp}.csv'
+        sobol.to_csv(filename, index=False)
+        print(f"\n✓ Sobol indices saved to: {filename}")
+        results['sobol'] = sobol
+
+    if args.method in ('morris', 'both'):
+        started = time.perf_counter()
+        morris = morris_analysis(args.trajectories, levels=args.levels, seed=args.seed, jobs=args.jobs)
+        print(f"\n✓ Morris: {morris.attrs['evaluations']:,} evaluations in {time.perf_counter() - started:.1f}s")
+        print_rankings(morris, 'Mu*', args.output)
+        filename = f'{REPORTS_DIR}/uhi_sensitivity_morris_{timestamp}.csv'
+        morris.to_csv(filename, index=False)
+        print(f"\n✓ Morris screening saved to: {filename}")
+        results['morris'] = morris
+
+    return results
+
+
+if __name__ == "__main__":
+    results = main()
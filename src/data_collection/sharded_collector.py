@@ -0,0 +1,575 @@
+"""
+Sharded Multi-Worker UHI Data Collection
+Cities are enqueued once into a local SQLite work queue and any number of worker
+processes (on this machine, or in other terminals) lease batches of them, fetch
+through the collector's batched providers under a per-worker rate budget, and
+write results idempotently. Leases expire so a killed worker's cities are picked
+up again, failed fetches are retried with backoff, and finalize builds the
+enhanced dataset from the results exactly as enhanced_collector.py does
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Sequence
+import multiprocessing as mp
+import argparse
+import json
+import math
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import QUEUE_DIR
+
+DEFAULT_QUEUE = os.path.join(QUEUE_DIR, 'collection.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    seq INTEGER NOT NULL,
+    city TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, available_at);
+CREATE TABLE IF NOT EXISTS results (
+    task_id INTEGER PRIMARY KEY REFERENCES tasks (id),
+    row TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    completed_at REAL NOT NULL
+);
+"""
+
+TASK_STATES = ['pending', 'leased', 'done', 'failed']
+
+
+def city_key(city: Dict) -> str:
+    """Stable identity of a catalogue record, used to dedupe tasks and results"""
+    return f"{city['name']}|{city['state']}|{float(city['lat']):.4f}|{float(city['lon']):.4f}"
+
+
+def shard_of(city: Dict, shards: int) -> int:
+    """Hash partition of a city across shards (stable across processes and machines)"""
+    return zlib.crc32(city_key(city).encode('utf-8')) % shards
+
+
+def parse_shard(spec: str):
+    """Parse 'k/n' into (k, n)"""
+    index, count = (int(part) for part in spec.split('/'))
+    if not 0 <= index < count:
+        raise ValueError(f"shard index must be in [0, {count}): {spec}")
+    return index, count
+
+
+def _json_default(value):
+    """Serialize numpy scalars in result rows"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class WorkQueue:
+    """
+    Durable task queue in a single SQLite file (WAL mode)
+
+    Tasks move pending -> leased -> done, or back to pending with exponential
+    backoff on failure, and to failed once max_attempts leases are used up.
+    Every state change runs in a BEGIN IMMEDIATE transaction, so concurrent
+    workers never lease the same task twice.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE, lease_seconds: float = 300.0,
+                 max_attempts: int = 4, backoff: float = 5.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA busy_timeout=60000")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database lock up front"""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def enqueue(self, cities: Sequence[Dict], seqs: Sequence[int] = None) -> int:
+        """
+        Add cities not already queued; returns the number of new tasks
+        seqs: catalogue positions (default: list order), which fix the dataset row order
+        """
+        seqs = range(len(cities)) if seqs is None else seqs
+        rows = [(city_key(city), seq, json.dumps(city, default=_json_default))
+                for seq, city in zip(seqs, cities)]
+        with self.transaction() as db:
+            before = db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            db.executemany("INSERT OR IGNORE INTO tasks (key, seq, city) VALUES (?, ?, ?)", rows)
+            return db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] - before
+
+    def lease(self, owner: str, batch: int):
+        """
+        Lease up to batch available tasks; returns (token, tasks) where tasks are
+        (task_id, city, attempt) tuples. Expired leases are reclaimed first.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self.transaction() as db:
+            db.execute("""
+                UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                 last_error = 'lease expired (worker stopped?)',
+                                 lease_owner = NULL, lease_token = NULL, lease_expires = NULL
+                WHERE state = 'leased' AND lease_expires <= ?""", (self.max_attempts, now))
+            ids = [row[0] for row in db.execute(
+                "SELECT id FROM tasks WHERE state = 'pending' AND available_at <= ? ORDER BY id LIMIT ?",
+                (now, batch))]
+            if not ids:
+                return token, []
+            db.executemany("""
+                UPDATE tasks SET state = 'leased', attempts = attempts + 1,
+                                 lease_owner = ?, lease_token = ?, lease_expires = ?
+                WHERE id = ?""", [(owner, token, now + self.lease_seconds, task_id) for task_id in ids])
+            placeholders = ','.join('?' * len(ids))
+            tasks = db.execute(f"SELECT id, city, attempts FROM tasks WHERE id IN ({placeholders}) ORDER BY id",
+                               ids).fetchall()
+        return token, [(task_id, json.loads(city), attempts) for task_id, city, attempts in tasks]
+
+    def renew(self, token: str) -> int:
+        """Extend every lease held under token; returns the number still held"""
+        with self.transaction() as db:
+            return db.execute("UPDATE tasks SET lease_expires = ? WHERE lease_token = ? AND state = 'leased'",
+                              (time.time() + self.lease_seconds, token)).rowcount
+
+    def complete(self, task_id: int, row: Dict, worker: str) -> bool:
+        """
+        Record a result and mark the task done. Idempotent: the first result for a
+        task wins, so a worker finishing after its lease expired cannot overwrite it.
+        Returns True if this call wrote the result.
+        """
+        payload = json.dumps(row, default=_json_default)
+        with self.transaction() as db:
+            written = db.execute("INSERT OR IGNORE INTO results (task_id, row, worker, completed_at) "
+                                 "VALUES (?, ?, ?, ?)", (task_id, payload, worker, time.time())).rowcount
+            db.execute("""
+                UPDATE tasks SET state = 'done', last_error = NULL,
+                                 lease_owner = NULL, lease_token = NULL, lease_expires = NULL
+                WHERE id = ?""", (task_id,))
+        return bool(written)
+
+    def fail(self, task_id: int, token: str, error: str) -> str:
+        """
+        Release a leased task after an error: back to pending after a backoff of
+        backoff * 2^(attempt-1) seconds, or failed once attempts are used up.
+        Returns the new state (None if the lease was already lost).
+        """
+        with self.transaction() as db:
+            row = db.execute("SELECT attempts FROM tasks WHERE id = ? AND lease_token = ? AND state = 'leased'",
+                             (task_id, token)).fetchone()
+            if row is None:
+                return None
+            attempts = row[0]
+            state = 'failed' if attempts >= self.max_attempts else 'pending'
+            db.execute("""
+                UPDATE tasks SET state = ?, available_at = ?, last_error = ?,
+                                 lease_owner = NULL, lease_token = NULL, lease_expires = NULL
+                WHERE id = ?""", (state, time.time() + self.backoff * 2 ** (attempts - 1), error[:500], task_id))
+        return state
+
+    def retry_failed(self) -> int:
+        """Put failed tasks back to pending with a fresh attempt budget"""
+        with self.transaction() as db:
+            return db.execute("UPDATE tasks SET state = 'pending', attempts = 0, available_at = 0 "
+                              "WHERE state = 'failed'").rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks in each state"""
+        counts = dict.fromkeys(TASK_STATES, 0)
+        counts.update(self.connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"))
+        return counts
+
+    def next_available(self):
+        """Seconds until the next pending task becomes available (None if no work is left)"""
+        pending, earliest = self.connection.execute(
+            "SELECT COUNT(*), MIN(available_at) FROM tasks WHERE state = 'pending'").fetchone()
+        leased, expires = self.connection.execute(
+            "SELECT COUNT(*), MIN(lease_expires) FROM tasks WHERE state = 'leased'").fetchone()
+        if not pending and not leased:
+            return None
+        candidates = [t for t in (earliest, expires) if t is not None]
+        return max(0.0, min(candidates) - time.time())
+
+    def workers(self):
+        """(worker, cities, first, last) completion summary per worker"""
+        return self.connection.execute(
+            "SELECT worker, COUNT(*), MIN(completed_at), MAX(completed_at) FROM results "
+            "GROUP BY worker ORDER BY worker").fetchall()
+
+    def results(self):
+        """(key, seq, city, row) for every completed task, in catalogue order"""
+        rows = self.connection.execute(
+            "SELECT t.key, t.seq, t.city, r.row FROM results r JOIN tasks t ON t.id = r.task_id ORDER BY t.seq")
+        return [(key, seq, json.loads(city), json.loads(row)) for key, seq, city, row in rows]
+
+    def failures(self):
+        """(key, attempts, last_error) for tasks that ran out of attempts"""
+        return self.connection.execute(
+            "SELECT key, attempts, last_error FROM tasks WHERE state = 'failed' ORDER BY seq").fetchall()
+
+
+class RateBudget:
+    """
+    Token bucket limiting a worker to rate cities per second, with bursts of up
+    to burst cities. Tokens are taken per city before a batch is leased, so the
+    wait never eats into a lease; tokens for cities that were not leased are
+    given back.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, n: int = 1) -> float:
+        """Take n city tokens (at most burst), sleeping until they are available; returns seconds waited"""
+        n = min(n, self.capacity)
+        waited = 0.0
+        self._refill()
+        while self.tokens < n:
+            wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+            self._refill()
+        self.tokens -= n
+        return waited
+
+    def refund(self, n: int):
+        """Return tokens taken for cities that were not leased"""
+        self.tokens = min(self.capacity, self.tokens + n)
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Renews a batch lease in the background while the worker fetches it"""
+
+    def __init__(self, queue_path: str, token: str, lease_seconds: float):
+        super().__init__(daemon=True)
+        self.queue_path = queue_path
+        self.token = token
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        queue = WorkQueue(self.queue_path, lease_seconds=self.lease_seconds)
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                queue.renew(self.token)
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(queue_path: str = DEFAULT_QUEUE, worker: str = None, batch: int = 50,
+               rate: float = None, lease_seconds: float = 300.0, max_attempts: int = 4,
+               backoff: float = 5.0, poll: float = 1.0, verbose: bool = True) -> Dict[str, int]:
+    """
+    Lease and collect batches until no task is pending or leased
+
+    Each batch is one prefetch() call (one batched request per provider), then
+    collect_city_data per city. A city whose weather fetch failed is released
+    for retry, except on its last attempt, where the row is kept and finalize
+    imputes the missing fields from neighbouring cities as the sequential
+    collector does. Returns counts of completed, retried and failed cities.
+
+    With a rate budget the batch is capped at rate * lease_seconds / 2 cities, so
+    a batch's worth of tokens always refills well within one lease.
+    """
+    from collector import UHIDataCollector
+
+    worker = worker or worker_name()
+    queue = WorkQueue(queue_path, lease_seconds, max_attempts, backoff)
+    budget = None
+    if rate:
+        batch = max(1, min(batch, int(rate * lease_seconds / 2)))
+        budget = RateBudget(rate, burst=batch)
+    collector = UHIDataCollector()
+    stats = {'completed': 0, 'retried': 0, 'failed': 0, 'throttled_seconds': 0.0}
+
+    def release(task_id, token, error):
+        state = queue.fail(task_id, token, error)
+        stats['failed' if state == 'failed' else 'retried'] += state is not None
+
+    try:
+        while True:
+            wait = queue.next_available()
+            if wait is None:
+                break
+            if wait > 0:
+                time.sleep(min(wait, poll))
+                continue
+
+            # Throttle before leasing so no lease is held while waiting for the budget
+            if budget is not None:
+                stats['throttled_seconds'] += budget.acquire(batch)
+            token, tasks = queue.lease(worker, batch)
+            if budget is not None:
+                budget.refund(batch - len(tasks))
+            if not tasks:
+                time.sleep(0.05)
+                continue
+
+            heartbeat = LeaseHeartbeat(queue_path, token, lease_seconds)
+            heartbeat.start()
+            try:
+                cities = [city for _, city, _ in tasks]
+                try:
+                    prefetched = collector.prefetch(cities)
+                except Exception as e:
+                    print(f"[{worker}] ✗ Batch fetch failed: {e}")
+                    for task_id, _, _ in tasks:
+                        release(task_id, token, f"prefetch: {e}")
+                    continue
+
+                for (task_id, city, attempt), values in zip(tasks, prefetched):
+                    try:
+                        if math.isnan(values['weather']['temperature']) and attempt < max_attempts:
+                            raise RuntimeError('weather fetch returned no data')
+                        row = collector.collect_city_data(city, prefetched=values)
+                        queue.complete(task_id, row, worker)
+                        stats['completed'] += 1
+                    except Exception as e:
+                        release(task_id, token, str(e))
+                        if verbose:
+                            print(f"[{worker}] ✗ {city['name']} (attempt {attempt}): {e}")
+            finally:
+                heartbeat.stop()
+
+            if verbose:
+                counts = queue.counts()
+                print(f"[{worker}] batch of {len(tasks)} done - queue: {counts['done']} done, "
+                      f"{counts['pending']} pending, {counts['leased']} leased, {counts['failed']} failed")
+    finally:
+        queue.close()
+    return stats
+
+
+def _worker_process(kwargs: Dict):
+    stats = run_worker(**kwargs)
+    print(f"[{kwargs['worker']}] finished: {stats['completed']} collected, {stats['retried']} retried, "
+          f"{stats['failed']} failed, {stats['throttled_seconds']:.1f}s throttled")
+
+
+def run_workers(workers: int, **kwargs) -> int:
+    """Run workers in separate processes and wait for them; returns how many exited with an error"""
+    context = mp.get_context('spawn')
+    host = socket.gethostname()
+    processes = []
+    for i in range(workers):
+        process = context.Process(target=_worker_process, args=(dict(kwargs, worker=f"{host}-w{i}"),),
+                                  name=f"uhi-worker-{i}")
+        process.start()
+        processes.append(process)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Leases of interrupted batches expire and are picked up by the next run
+        for process in processes:
+            process.terminate()
+        raise
+    return sum(process.exitcode != 0 for process in processes)
+
+
+def enqueue_catalogue(queue: WorkQueue, shard: str = None) -> int:
+    """Enqueue the active city catalogue (optionally one hash shard of it)"""
+    from indian_cities import get_all_cities
+
+    cities = get_all_cities()
+    seqs = range(len(cities))
+    if shard:
+        index, count = parse_shard(shard)
+        seqs = [seq for seq, city in enumerate(cities) if shard_of(city, count) == index]
+        cities = [cities[seq] for seq in seqs]
+    return queue.enqueue(cities, seqs)
+
+
+def print_status(queue_paths: Sequence[str]):
+    """Print task counts, per-worker throughput and failures for each queue"""
+    for path in queue_paths:
+        queue = WorkQueue(path)
+        counts = queue.counts()
+        total = sum(counts.values())
+        print(f"\nQueue: {path}")
+        print(f"  Tasks: {total}  " + "  ".join(f"{state}: {counts[state]}" for state in TASK_STATES))
+        for worker, n, first, last in queue.workers():
+            span = last - first
+            rate = f"{n / span:.1f} cities/s" if span > 0 else "-"
+            print(f"  {worker:<30} {n:>7} cities  {rate}")
+        for key, attempts, error in queue.failures()[:20]:
+            print(f"  ✗ {key.split('|')[0]} after {attempts} attempts: {error}")
+        queue.close()
+
+
+def finalize(queue_paths: Sequence[str]):
+    """
+    Merge the results of one or more queue files (e.g. one per machine shard),
+    deduplicated by city and in catalogue order, then impute, derive the enhanced
+    features and save the dataset and quality report. Returns the DataFrame.
+    """
+    from collector import UHIDataCollector
+    from enhanced_collector import EnhancedUHICollector, build_enhanced_dataset, save_dataset
+    from schema import print_quality_summary
+
+    merged = {}
+    failures = []
+    incomplete = 0
+    for path in queue_paths:
+        queue = WorkQueue(path)
+        for key, seq, city, row in queue.results():
+            merged.setdefault(key, (seq, city, row))
+        failures.extend(queue.failures())
+        counts = queue.counts()
+        incomplete += counts['pending'] + counts['leased']
+        queue.close()
+
+    if not merged:
+        print("No completed cities in the queue! Run workers first.")
+        return None
+
+    ordered = sorted(merged.values(), key=lambda item: item[0])
+    cities = [city for _, city, _ in ordered]
+    base_rows = [row for _, _, row in ordered]
+
+    df = build_enhanced_dataset(UHIDataCollector(), EnhancedUHICollector(), cities, base_rows)
+    filename, quality_report, quality_file = save_dataset(df)
+
+    print("\n" + "=" * 80)
+    print("SHARDED COLLECTION FINALIZED")
+    print("=" * 80)
+    print(f"Cities in dataset: {len(df)}")
+    print(f"Failed cities: {len(failures)}")
+    for key, attempts, error in failures:
+        print(f"  ✗ {key.split('|')[0]} after {attempts} attempts: {error}")
+    if incomplete:
+        print(f"⚠ {incomplete} cities are still pending or leased; finalize again once workers finish")
+    print(f"Dataset saved as: {filename}")
+    print_quality_summary(quality_report)
+    print(f"Quality report saved as: {quality_file}")
+    return df
+
+
+def main(argv=None):
+    """Sharded collection CLI: run, work, status, finalize"""
+    parser = argparse.ArgumentParser(description='Sharded multi-worker UHI data collection')
+    parser.add_argument('command', choices=['run', 'work', 'status', 'finalize'],
+                        help='run: enqueue, collect with --workers processes and finalize; '
+                             'work: one worker on an existing queue; status; finalize: build the dataset')
+    parser.add_argument('--queue', action='append',
+                        help=f'Queue file (repeatable for status/finalize; default: {DEFAULT_QUEUE})')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for run')
+    parser.add_argument('--batch', type=int, default=50,
+                        help='Cities leased per batch (capped at rate * lease / 2 with --rate)')
+    parser.add_argument('--rate', type=float, help='Per-worker budget in cities/second (default: unlimited)')
+    parser.add_argument('--lease', type=float, default=300.0, help='Lease lifetime in seconds')
+    parser.add_argument('--max-attempts', type=int, default=4, help='Leases per city before it is marked failed')
+    parser.add_argument('--backoff', type=float, default=5.0, help='Base retry backoff in seconds')
+    parser.add_argument('--shard', help='Enqueue only hash shard k/n of the catalogue (e.g. 0/3)')
+    parser.add_argument('--fresh', action='store_true', help='Delete the queue file before enqueueing')
+    parser.add_argument('--retry-failed', action='store_true', help='Give failed cities a fresh attempt budget')
+    parser.add_argument('--no-finalize', action='store_true', help='With run: leave finalizing to a later call')
+    parser.add_argument('--quiet', action='store_true', help='Only print worker summaries')
+    args = parser.parse_args(argv)
+
+    queue_paths = args.queue or [DEFAULT_QUEUE]
+    if args.command in ('run', 'work') and len(queue_paths) > 1:
+        parser.error(f"{args.command} takes a single --queue")
+    queue_path = queue_paths[0]
+
+    if args.command == 'status':
+        print_status(queue_paths)
+        return None
+    if args.command == 'finalize':
+        return finalize(queue_paths)
+
+    if args.fresh and args.command == 'run':
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(queue_path + suffix):
+                os.remove(queue_path + suffix)
+    queue = WorkQueue(queue_path, args.lease, args.max_attempts, args.backoff)
+    if args.command == 'run':
+        added = enqueue_catalogue(queue, args.shard)
+        print(f"Enqueued {added} new cities" + (f" (shard {args.shard})" if args.shard else ""))
+    if args.retry_failed:
+        print(f"Re-queued {queue.retry_failed()} failed cities")
+    counts = queue.counts()
+    queue.close()
+
+    worker_args = dict(queue_path=queue_path, batch=args.batch, rate=args.rate, lease_seconds=args.lease,
+                       max_attempts=args.max_attempts, backoff=args.backoff, verbose=not args.quiet)
+
+    if args.command == 'work':
+        stats = run_worker(**worker_args)
+        print(f"Finished: {stats['completed']} collected, {stats['retried']} retried, {stats['failed']} failed")
+        return None
+
+    print("=" * 80)
+    print("SHARDED UHI DATA COLLECTION")
+    print("=" * 80)
+    print(f"Queue: {queue_path}")
+    print(f"Tasks: {sum(counts.values())} ({counts['pending']} pending, {counts['done']} already done)")
+    print(f"Workers: {args.workers}, batch {args.batch}, "
+          f"rate {f'{args.rate:g} cities/s per worker' if args.rate else 'unlimited'}")
+    print(f"Collection started at: {datetime.now()}")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    errors = run_workers(args.workers, **worker_args)
+    elapsed = time.perf_counter() - started
+    print(f"\nWorkers finished in {elapsed:.1f}s" + (f" ({errors} exited with an error)" if errors else ""))
+    print_status([queue_path])
+
+    if args.no_finalize:
+        return None
+    return finalize([queue_path])
+
+
+if __name__ == "__main__":
+    df = main()
@@ -0,0 +1,359 @@
+"""
+Synthetic UHI Dataset Generator
+Fits a Gaussian copula (empirical marginals plus a rank correlation matrix)
+to the raw urban heat island dataset and the latest processed dataset, then
+streams any number of statistically similar rows in the processed schema to
+CSV or Parquet in seeded, vectorized chunks without holding the output in memory
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, List
+import argparse
+import gzip
+import itertools
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from paths import RAW_DIR, SYNTHETIC_DIR, latest_dataset
+from schema import PROCESSED_SCHEMA, PROVENANCE_COLUMN, validate_frame, print_quality_summary
+from imputation import CitySpatialIndex
+
+RAW_DATASET = os.path.join(RAW_DIR, 'urban_heat_island_dataset.csv')
+
+# Raw coordinates are global, not Indian; geography is fitted from the processed data only
+RAW_EXCLUDED_COLUMNS = ['Latitude', 'Longitude']
+
+# Land cover categories are ordered by their mean of this column before they
+# are mapped onto a latent normal, so the copula can carry their association
+CATEGORY_ORDER_COLUMN = 'Temperature (°C)'
+
+QUANTILE_POINTS = 1001
+
+# Fewest rows observing both columns for a frame to define their correlation
+MIN_PAIR_ROWS = 10
+
+
+def normal_scores(values: np.ndarray) -> np.ndarray:
+    """Rank-based normal scores, NaN where the value is missing"""
+    scores = np.full(len(values), np.nan)
+    present = ~np.isnan(values)
+    ranks = pd.Series(values[present]).rank(method='average').to_numpy()
+    scores[present] = ndtri((ranks - 0.5) / present.sum())
+    return scores
+
+
+def nearest_correlation(corr: np.ndarray, shrinkage: float) -> np.ndarray:
+    """Shrink towards the identity and clip eigenvalues so the matrix is a valid correlation"""
+    corr = (1 - shrinkage) * np.nan_to_num(corr) + shrinkage * np.eye(len(corr))
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    corr = (eigenvectors * np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(corr))
+    return corr / np.outer(scale, scale)
+
+
+class CopulaModel:
+    """
+    Gaussian copula over the processed schema
+
+    Numeric columns keep an empirical quantile function and a null rate;
+    Land Cover is a latent normal cut into its category frequencies; the
+    dependence between all of them is one correlation matrix of normal scores.
+    State follows the nearest real city to each generated coordinate.
+    """
+
+    def __init__(self, columns: List[str], quantiles: np.ndarray, null_rates: np.ndarray,
+                 integral: np.ndarray, categories: List[str], category_cdf: np.ndarray,
+                 correlation: np.ndarray, city_lat: np.ndarray, city_lon: np.ndarray, city_states: np.ndarray):
+        self.columns = columns
+        self.quantiles = quantiles
+        self.null_rates = null_rates
+        self.integral = integral
+        self.categories = categories
+        self.category_cdf = category_cdf
+        self.correlation = correlation
+        self.cholesky = np.linalg.cholesky(correlation)
+        self.city_lat = city_lat
+        self.city_lon = city_lon
+        self.city_states = city_states
+        self._index = None
+
+    @classmethod
+    def fit(cls, frames: List[pd.DataFrame], cities: pd.DataFrame, shrinkage: float = 0.05) -> 'CopulaModel':
+        """
+        Fit marginals and null rates on the first frame that has each column,
+        and each pairwise rank correlation on the first frame that observes
+        the pair; the primary frame sets scales and dependence, later frames
+        only fill in what it lacks (e.g. AQI in the raw dataset)
+        """
+        columns = [c for c, spec in PROCESSED_SCHEMA.items()
+                   if spec['dtype'] == 'float' and any(c in f.columns and f[c].notna().any() for f in frames)]
+        blocks = [f.reindex(columns=columns).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+                  for f in frames]
+
+        probs = np.linspace(0, 1, QUANTILE_POINTS)
+        quantiles, null_rates, integral = [], [], []
+        for j in range(len(columns)):
+            block = next(b for b in blocks if not np.isnan(b[:, j]).all())
+            values = block[:, j][~np.isnan(block[:, j])]
+            quantiles.append(np.quantile(values, probs))
+            null_rates.append(np.isnan(block[:, j]).mean())
+            integral.append(np.allclose(values, np.round(values)))
+        quantiles, null_rates, integral = np.vstack(quantiles), np.array(null_rates), np.array(integral)
+
+        # Land cover: order categories by CATEGORY_ORDER_COLUMN, then score each row by the
+        # midpoint of its category's interval on the cumulative frequency scale
+        primary = frames[0]
+        land_cover = primary['Land Cover']
+        order = (primary.groupby('Land Cover')[CATEGORY_ORDER_COLUMN].mean().sort_values().index.tolist()
+                 if CATEGORY_ORDER_COLUMN in primary.columns else sorted(land_cover.dropna().unique()))
+        frequencies = land_cover.value_counts(normalize=True).reindex(order).to_numpy()
+        category_cdf = np.cumsum(frequencies)
+        midpoints = dict(zip(order, ndtri(category_cdf - frequencies / 2)))
+
+        # Rank correlations per frame; each pair comes from the first frame observing it
+        correlation = np.full((len(columns) + 1, len(columns) + 1), np.nan)
+        for frame, block in zip(frames, blocks):
+            land_cover_scores = (frame['Land Cover'].map(midpoints).to_numpy(dtype=float)
+                                 if 'Land Cover' in frame.columns else np.full(len(frame), np.nan))
+            scores = np.column_stack([normal_scores(block[:, j]) for j in range(len(columns))]
+                                     + [land_cover_scores])
+            frame_corr = pd.DataFrame(scores).corr(min_periods=MIN_PAIR_ROWS).to_numpy()
+            correlation = np.where(np.isnan(correlation), frame_corr, correlation)
+        correlation = nearest_correlation(correlation, shrinkage)
+
+        return cls(columns, quantiles, null_rates, integral, order, category_cdf, correlation,
+                   cities['Latitude'].to_numpy(dtype=float), cities['Longitude'].to_numpy(dtype=float),
+                   cities['State'].to_numpy(dtype=object))
+
+    def sample(self, n: int, rng: np.random.Generator, start: int = 0) -> pd.DataFrame:
+        """n rows in the processed schema; start numbers the synthetic city names"""
+        z = rng.standard_normal((n, len(self.columns) + 1)) @ self.cholesky.T
+        u = ndtr(z)
+        probs = np.linspace(0, 1, QUANTILE_POINTS)
+
+        out = {}
+        for j, column in enumerate(self.columns):
+            values = np.interp(u[:, j], probs, self.quantiles[j])
+            if self.integral[j]:
+                values = np.round(values)
+            spec = PROCESSED_SCHEMA[column]
+            values = np.clip(values, spec.get('min', -np.inf), spec.get('max', np.inf))
+            if self.null_rates[j] > 0 and spec['nullable']:
+                values[rng.random(n) < self.null_rates[j]] = np.nan
+            out[column] = values
+
+        # Keep the daily range consistent with the current temperature
+        if {'Temperature (°C)', 'Temperature Max (°C)', 'Temperature Min (°C)'} <= out.keys():
+            out['Temperature Max (°C)'] = np.fmax(out['Temperature Max (°C)'], out['Temperature (°C)'])
+            out['Temperature Min (°C)'] = np.fmin(out['Temperature Min (°C)'], out['Temperature (°C)'])
+
+        codes = np.minimum(np.searchsorted(self.category_cdf, u[:, -1]), len(self.categories) - 1)
+        land_cover = pd.Categorical.from_codes(codes, categories=self.categories)
+
+        if self._index is None:
+            self._index = CitySpatialIndex(self.city_lat, self.city_lon)
+        _, nearest = self._index.query(out['Latitude'], out['Longitude'], k=1)
+
+        frame = {
+            'City Name': 'Synthetic City ' + pd.Series(np.arange(start, start + n)).astype(str),
+            'State': self.city_states[nearest[:, 0]],
+            'Land Cover': land_cover,
+        }
+        frame.update(out)
+        frame[PROVENANCE_COLUMN] = ''
+        return pd.DataFrame(frame)[[c for c in PROCESSED_SCHEMA if c in frame]]
+
+
+def load_model(raw_path: str = RAW_DATASET, processed_path: str = None, shrinkage: float = 0.05) -> CopulaModel:
+    """
+    Fit the copula on the latest (or given) processed dataset, which sets the
+    marginals, with the raw dataset adding its rows to the correlation estimate
+    """
+    processed_path = processed_path or latest_dataset()
+    if processed_path is None:
+        raise FileNotFoundError("No processed dataset found; run enhanced_collector.py first")
+    processed = pd.read_csv(processed_path)
+    frames = [processed]
+    if raw_path and os.path.exists(raw_path):
+        frames.append(pd.read_csv(raw_path).drop(columns=RAW_EXCLUDED_COLUMNS, errors='ignore'))
+    return CopulaModel.fit(frames, processed, shrinkage=shrinkage)
+
+
+def chunk_seeds(seed: int, n_chunks: int) -> List[np.random.SeedSequence]:
+    """Independent per-chunk streams: output depends only on seed and chunk size"""
+    return np.random.SeedSequence(seed).spawn(n_chunks)
+
+
+def generate(model: CopulaModel, rows: int, chunk_size: int = 250000, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """Yield the synthetic dataset chunk by chunk"""
+    n_chunks = -(-rows // chunk_size)
+    for i, seq in enumerate(chunk_seeds(seed, n_chunks)):
+        start = i * chunk_size
+        yield model.sample(min(chunk_size, rows - start), np.random.default_rng(seq), start=start)
+
+
+def frame_to_csv(frame: pd.DataFrame, header: bool = True, decimals: int = 4) -> str:
+    """
+    CSV text for a chunk, several times faster than DataFrame.to_csv
+    Floats are rounded to decimals and formatted column-wise by numpy; NaN is
+    written as an empty field and text is quoted only where it needs to be
+    """
+    columns = []
+    for name, series in frame.items():
+        if pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy()
+            missing = np.isnan(values)
+            if not missing.any() and np.array_equal(values, np.round(values)):
+                text = values.astype(np.int64).astype(str)
+            else:
+                text = values.round(decimals).astype(str)
+                text[missing] = ''
+        else:
+            text = series.astype(str).to_numpy(dtype=str)
+            needs_quotes = np.char.find(text, ',') >= 0
+            needs_quotes |= np.char.find(text, '"') >= 0
+            if needs_quotes.any():
+                text = text.astype(object)
+                text[needs_quotes] = ['"' + t.replace('"', '""') + '"' for t in text[needs_quotes]]
+            text = np.where(series.isna().to_numpy(), '', text)
+        columns.append(text.tolist())
+    lines = map(','.join, zip(*columns))
+    body = '\n'.join(lines) + '\n'
+    return (','.join(frame.columns) + '\n' + body) if header else body
+
+
+def _render_csv_chunk(model: CopulaModel, seq: np.random.SeedSequence, start: int, size: int,
+                      header: bool, decimals: int) -> bytes:
+    """Generate one chunk and format it as CSV (runs in worker processes)"""
+    chunk = model.sample(size, np.random.default_rng(seq), start=start)
+    return frame_to_csv(chunk, header=header, decimals=decimals).encode('utf-8')
+
+
+def write_csv(model: CopulaModel, path: str, rows: int, chunk_size: int, seed: int,
+              jobs: int = 1, decimals: int = 4):
+    """
+    Stream chunks to CSV (gzip when the path ends in .gz)
+    With jobs > 1, chunks are generated and formatted in worker processes and
+    written in order, so the file is identical to a single-process run; at most
+    2 * jobs rendered chunks are in flight, so a slow writer bounds memory
+    """
+    n_chunks = -(-rows // chunk_size)
+    tasks = [(seq, i * chunk_size, min(chunk_size, rows - i * chunk_size), i == 0)
+             for i, seq in enumerate(chunk_seeds(seed, n_chunks))]
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wb') as f:
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                pending = iter(tasks)
+                window = deque(executor.submit(_render_csv_chunk, model, *task, decimals)
+                               for task in itertools.islice(pending, 2 * jobs))
+                done = 0
+                while window:
+                    f.write(window.popleft().result())
+                    for task in itertools.islice(pending, 1):
+                        window.append(executor.submit(_render_csv_chunk, model, *task, decimals))
+                    done += 1
+                    yield done * chunk_size
+        else:
+            for done, task in enumerate(tasks, 1):
+                f.write(_render_csv_chunk(model, *task, decimals))
+                yield done * chunk_size
+
+
+def write_parquet(model: CopulaModel, path: str, rows: int, chunk_size: int, seed: int):
+    """Stream chunks to Parquet, one row group per chunk (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet output: pip install pyarrow")
+    writer = None
+    try:
+        for done, chunk in enumerate(generate(model, rows, chunk_size, seed), 1):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table)
+            yield done * chunk_size
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def print_comparison(model: CopulaModel, reference: pd.DataFrame, sample: pd.DataFrame):
+    """Means, standard deviations and the largest correlation gaps, reference vs synthetic"""
+    columns = [c for c in model.columns if c in reference.columns]
+    print(f"\n{'Column':40s} {'ref mean':>12s} {'syn mean':>12s} {'ref std':>12s} {'syn std':>12s}")
+    for column in columns:
+        ref, syn = reference[column], sample[column]
+        print(f"{column:40s} {ref.mean():12.4g} {syn.mean():12.4g} {ref.std():12.4g} {syn.std():12.4g}")
+
+    gaps = (reference[columns].corr(method='spearman') - sample[columns].corr(method='spearman')).abs()
+    upper = gaps.where(np.triu(np.ones(gaps.shape, dtype=bool), k=1)).stack()
+    print(f"\nSpearman correlation gap: mean {upper.mean():.3f}, max {upper.max():.3f}")
+    for (a, b), gap in upper.nlargest(5).items():
+        print(f"  {gap:.3f}  {a} ~ {b}")
+
+
+def main():
+    """Generate a synthetic dataset"""
+    parser = argparse.ArgumentParser(description='Stream a synthetic UHI dataset in the processed schema')
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows to generate')
+    parser.add_argument('--output', help='Output path (.csv, .csv.gz or .parquet); '
+                                         'default data/synthetic/synthetic_uhi_dataset_<rows>.csv')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--chunk-size', type=int, default=250000, help='Rows generated per chunk')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for CSV output')
+    parser.add_argument('--processed', help='Processed dataset to fit (default: latest)')
+    parser.add_argument('--raw', default=RAW_DATASET, help='Raw dataset to fit alongside it')
+    parser.add_argument('--shrinkage', type=float, default=0.05,
+                        help='Shrinkage of the fitted correlation towards the identity')
+    parser.add_argument('--check', action='store_true',
+                        help='Validate the first chunk and compare it with the fitted data')
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(SYNTHETIC_DIR, f'synthetic_uhi_dataset_{args.rows}.csv')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    print("=" * 80)
+    print("SYNTHETIC UHI DATASET")
+    print("=" * 80)
+    started = time.perf_counter()
+    model = load_model(args.raw, args.processed, args.shrinkage)
+    print(f"Fitted {len(model.columns)} numeric columns and {len(model.categories)} land cover types "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    if args.check:
+        sample = model.sample(min(args.rows, args.chunk_size), np.random.default_rng(args.seed))
+        print_quality_summary(validate_frame(sample))
+        print_comparison(model, pd.read_csv(args.processed or latest_dataset()), sample)
+
+    print(f"\nWriting {args.rows:,} rows to {output} (seed {args.seed}) at {datetime.now()}")
+    started = time.perf_counter()
+    if output.endswith('.parquet'):
+        progress = write_parquet(model, output, args.rows, args.chunk_size, args.seed)
+    else:
+        progress = write_csv(model, output, args.rows, args.chunk_size, args.seed, jobs=args.jobs)
+    for done in progress:
+        done = min(done, args.rows)
+        elapsed = time.perf_counter() - started
+        print(f"  {done:>12,} rows  {elapsed:8.1f}s  {done / elapsed:>10,.0f} rows/s")
+
+    print("=" * 80)
+    print(f"Done: {args.rows:,} rows in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(output) / 1024 ** 2:,.1f} MiB)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Monte Carlo Uncertainty Propagation for Derived UHI Features
+Runs N vectorized replicates of the greenness -> NDVI -> albedo -> impervious -> UHI
+feature chain and reports mean and percentile bands per city and per feature
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Sequence
+import argparse
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from reference_data import get_reference_data
+from paths import REPORTS_DIR, latest_dataset
+from schema import LAND_COVER_TYPES
+
+FEATURE_COLUMNS = [
+    'Urban Greenness Ratio (%)',
+    'NDVI',
+    'Albedo',
+    'Impervious Surface (%)',
+    'UHI Intensity (°C)',
+]
+
+
+def _land_cover_parameters():
+    """Per-code (albedo_low, albedo_high, impervious_base) arrays from the reference registry"""
+    ref = get_reference_data()
+    codes = np.array([ref.land_cover_code(lc) for lc in LAND_COVER_TYPES])
+    return ref.albedo_low[codes], ref.albedo_high[codes], ref.impervious_base[codes]
+
+
+def land_cover_codes(greenness, population_density):
+    """Vectorized calculate_land_cover_type, returning codes into LAND_COVER_TYPES"""
+    greenness = np.asarray(greenness)
+    population_density = np.broadcast_to(population_density, greenness.shape)
+    code = LAND_COVER_TYPES.index
+    return np.select(
+        [greenness > 30, population_density > 15000, population_density > 10000],
+        [code('Green Space'), code('Urban'), code('Industrial')],
+        default=code('Mixed Urban'),
+    )
+
+
+def seasonal_ndvi_bounds(lat):
+    """Return (low, high) arrays of the seasonal NDVI adjustment by latitude band"""
+    lat = np.asarray(lat, dtype=float)
+    low = np.select([lat < 15, lat > 28], [-0.05, -0.15], default=-0.1)
+    high = np.select([lat < 15, lat > 28], [0.1, 0.05], default=0.05)
+    return low, high
+
+
+def ndvi_from_greenness(greenness, seasonal):
+    """Vectorized estimate_ndvi given the seasonal adjustment draw"""
+    return np.clip((np.asarray(greenness) / 100) * 0.6 + seasonal, 0.05, 0.85)
+
+
+def albedo_from_ndvi(base_albedo, ndvi):
+    """Vectorized estimate_albedo given the base albedo draw"""
+    return np.clip(base_albedo + (ndvi - 0.3) * 0.1, 0.05, 0.40)
+
+
+def impervious_from_density(base_impervious, population_density, noise):
+    """Vectorized estimate_impervious_surface given the uniform(-5, 5) noise draw"""
+    population_density = np.asarray(population_density, dtype=float)
+    density_factor = np.select(
+        [population_density > 20000, population_density > 10000, population_density > 5000],
+        [15, 10, 5],
+        default=0,
+    )
+    return np.clip(base_impervious + density_factor + noise, 20, 90)
+
+
+def uhi_intensity(impervious_surface, ndvi, albedo, wind_speed,
+                  base=2.0, impervious_coef=3.0, vegetation_coef=5.0,
+                  albedo_coef=5.0, wind_coef=1.5):
+    """
+    UHI intensity from surface properties and wind (vectorized; scalars work too)
+    Missing wind drops the wind term
+    """
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    wind_factor = np.where(np.isnan(wind_speed), 0.0, -(wind_speed / 10) * wind_coef)
+    uhi = (base
+           + (impervious_surface / 100) * impervious_coef
+           - ndvi * vegetation_coef
+           - (albedo - 0.15) * albedo_coef
+           + wind_factor)
+    return np.clip(uhi, 0.5, 10)
+
+
+def traffic_density(population, tier, population_density):
+    """Traffic density in vehicles per km² of road (vectorized; scalars work too)"""
+    population = np.asarray(population, dtype=float)
+    population_density = np.asarray(population_density, dtype=float)
+    ownership = np.where(np.asarray(tier) == 1, 0.25, 0.15)
+    ownership = ownership * np.select([population_density > 20000, population_density > 10000], [1.3, 1.1],
+                                      default=1.0)
+    road_area = population / 5000 * 0.12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.where(road_area > 0, population * ownership / road_area, 1000.0)
+    return np.clip(density, 100, 10000)
+
+
+def anthropogenic_heat(energy_consumption, population, traffic,
+                       energy_coef=10.0, traffic_coef=5.0, population_coef=8.0):
+    """
+    Anthropogenic heat flux in W/m² (vectorized; scalars work too)
+    """
+    heat = (np.asarray(energy_consumption, dtype=float) / 1000000 * energy_coef
+            + np.asarray(traffic, dtype=float) / 1000 * traffic_coef
+            + np.asarray(population, dtype=float) / 1000000 * population_coef)
+    return np.clip(heat, 5, 200)
+
+
+def sample_feature_chain(city_names, lat, population_density, wind_speed,
+                         n_replicates: int, rng: np.random.Generator) -> dict:
+    """
+    Draw n_replicates of the whole feature chain for a block of cities
+    Returns a dict of (n_replicates, cities) arrays keyed by feature column
+    """
+    shape = (n_replicates, len(city_names))
+    is_green = get_reference_data().take('high_greenness', city_names, fill_value=False)
+    albedo_lookup_low, albedo_lookup_high, impervious_lookup = _land_cover_parameters()
+
+    # Greenness: uniform(25, 40) for known green cities, uniform(10, 25) otherwise
+    green_low = np.where(is_green, 25.0, 10.0)
+    greenness = green_low + 15.0 * rng.random(shape)
+
+    codes = land_cover_codes(greenness, population_density)
+
+    season_low, season_high = seasonal_ndvi_bounds(lat)
+    seasonal = season_low + (season_high - season_low) * rng.random(shape)
+    ndvi = ndvi_from_greenness(greenness, seasonal)
+
+    albedo_low, albedo_high = albedo_lookup_low[codes], albedo_lookup_high[codes]
+    base_albedo = albedo_low + (albedo_high - albedo_low) * rng.random(shape)
+    albedo = albedo_from_ndvi(base_albedo, ndvi)
+
+    noise = rng.uniform(-5, 5, shape)
+    impervious = impervious_from_density(impervious_lookup[codes], population_density, noise)
+
+    uhi = uhi_intensity(impervious, ndvi, albedo, wind_speed)
+
+    return dict(zip(FEATURE_COLUMNS, (greenness, ndvi, albedo, impervious, uhi)))
+
+
+def propagate_uncertainty(df: pd.DataFrame, n_replicates: int = 10000,
+                          percentiles: Sequence[float] = (5, 50, 95),
+                          seed: Optional[int] = None,
+                          max_chunk_bytes: int = 256 * 1024 * 1024) -> pd.DataFrame:
+    """
+    Propagate estimator noise through the derived feature chain
+
+    Cities are processed in blocks sized so that the (n_replicates, block) working
+    arrays stay under max_chunk_bytes. Returns one row per city and feature with
+    Mean, Std and the requested percentile bands.
+    """
+    rng = np.random.default_rng(seed)
+
+    names = df['City Name'].to_numpy()
+    lat = df['Latitude'].to_numpy(dtype=float)
+    density = df['Population Density (people/km²)'].to_numpy(dtype=float)
+    wind = df['Wind Speed (km/h)'].to_numpy(dtype=float)
+
+    # Roughly a dozen float64 (n_replicates, block) arrays are alive at once
+    bytes_per_city = n_replicates * 8 * 12
+    block = max(1, int(max_chunk_bytes // bytes_per_city))
+
+    frames = []
+    for start in range(0, len(df), block):
+        stop = min(start + block, len(df))
+        chain = sample_feature_chain(names[start:stop], lat[start:stop], density[start:stop],
+                                     wind[start:stop], n_replicates, rng)
+        for feature, values in chain.items():
+            bands = np.percentile(values, percentiles, axis=0)
+            stats = {
+                'City Name': names[start:stop],
+                'Feature': feature,
+                'Mean': values.mean(axis=0),
+                'Std': values.std(axis=0),
+            }
+            for q, band in zip(percentiles, bands):
+                stats[f'P{q:g}'] = band
+            frames.append(pd.DataFrame(stats))
+
+    result = pd.concat(frames, ignore_index=True)
+    # Group rows city by city, in dataset order, with features in chain order
+    result['Feature'] = pd.Categorical(result['Feature'], categories=FEATURE_COLUMNS)
+    result['City Name'] = pd.Categorical(result['City Name'], categories=pd.unique(names))
+    result = result.sort_values(['City Name', 'Feature'], kind='stable').reset_index(drop=True)
+    result['City Name'] = result['City Name'].astype(object)
+    result['Feature'] = result['Feature'].astype(object)
+    return result
+
+
+def main(argv=None):
+    """Run the uncertainty mode on the latest processed dataset"""
+    parser = argparse.ArgumentParser(description='Monte Carlo uncertainty bands for UHI features')
+    parser.add_argument('--replicates', type=int, default=10000, help='Monte Carlo replicates per city')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible bands')
+    args = parser.parse_args(argv)
+
+    latest = latest_dataset()
+    if latest is None:
+        print("No dataset found! Please run enhanced_collector.py first.")
+        return None
+
+    print(f"Loading dataset: {latest}")
+    df = pd.read_csv(latest)
+
+    print(f"Propagating {args.replicates:,} replicates across {len(df)} cities...")
+    started = datetime.now()
+    bands = propagate_uncertainty(df, n_replicates=args.replicates, seed=args.seed)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_dir = REPORTS_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    filename = f'{output_dir}/uhi_uncertainty_bands_{timestamp}.csv'
+    bands.to_csv(filename, index=False)
+
+    print(f"✓ Completed in {elapsed:.2f}s")
+    print(f"✓ Uncertainty bands saved to: {filename}")
+
+    uhi = bands[bands['Feature'] == 'UHI Intensity (°C)']
+    print("\nUHI Intensity bands (widest 10 cities):")
+    widest = uhi.assign(Width=uhi['P95'] - uhi['P5']).nlargest(10, 'Width')
+    print(widest[['City Name', 'Mean', 'P5', 'P50', 'P95']].round(2).to_string(index=False))
+
+    return bands
+
+
+if __name__ == "__main__":
+    bands = main()
@@ -0,0 +1,252 @@
+"""
+Run Instrumentation
+Timers and counters for HTTP calls, collector stages and analysis steps, with
+Prometheus text or JSON export. Recording is off unless enabled, in which case
+wrapped functions cost one attribute check per call.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Sequence, Tuple
+from urllib.parse import urlsplit
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# Set to a .prom or .json path to record metrics for the run and write them at exit
+METRICS_FILE_ENV = 'UHI_METRICS_FILE'
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    """Cumulative bucket counts plus count/sum/max for one label set"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and labels"""
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Add value to a counter"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation (seconds) in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def describe(self, name: str, text: str):
+        """Set the HELP text used in the Prometheus export"""
+        self.help[name] = text
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly snapshot of every metric"""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), 'count': h.count,
+                           'sum': round(h.sum, 6), 'max': round(h.max, 6),
+                           'mean': round(h.sum / h.count, 6) if h.count else 0.0}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return {'generated': datetime.now().isoformat(timespec='seconds'),
+                'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            escaped = ('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in items)
+            return '{' + ','.join(escaped) + '}'
+
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f'# HELP {name} {self.help[name]}')
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{fmt(labels)} {value:g}')
+
+        for (name, labels), h in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f'# HELP {name} {self.help[name]}')
+                lines.append(f'# TYPE {name} histogram')
+            cumulative = 0
+            for bound, count in zip(list(h.buckets) + ['+Inf'], h.counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else f'{bound:g}'
+                lines.append(f'{name}_bucket{fmt(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{fmt(labels)} {h.sum:.6f}')
+            lines.append(f'{name}_count{fmt(labels)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> str:
+        """Write metrics to path; .json gets JSON, anything else Prometheus text"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+            else:
+                f.write(self.to_prometheus())
+        return path
+
+    def summary(self, name: str, top: int = 10):
+        """Print the label sets of a histogram with the most total time"""
+        rows = sorted(((h.sum, h.count, h.max, dict(labels))
+                       for (metric, labels), h in self.histograms.items() if metric == name),
+                      key=lambda r: r[0], reverse=True)[:top]
+        for total, count, worst, labels in rows:
+            label = ' '.join(f'{k}={v}' for k, v in labels.items())
+            print(f"  {label:55s} {count:6d} calls  {total:8.3f}s total  {worst:7.3f}s max")
+
+
+METRICS = MetricsRegistry()
+
+METRICS.describe('uhi_http_request_duration_seconds', 'HTTP request latency by host, method and status')
+METRICS.describe('uhi_http_requests_total', 'HTTP requests by host and status')
+METRICS.describe('uhi_http_response_bytes_total', 'Response body bytes received by host')
+METRICS.describe('uhi_http_cache_hits_total', 'HTTP responses served from a cache by host')
+METRICS.describe('uhi_stage_duration_seconds', 'Time spent in collector, analysis and pipeline steps')
+METRICS.describe('uhi_stage_errors_total', 'Exceptions raised by collector, analysis and pipeline steps')
+
+
+def timed(component: str, stage: str = None, registry: MetricsRegistry = METRICS) -> Callable:
+    """
+    Decorator recording a call's duration in uhi_stage_duration_seconds
+    Exceptions are counted in uhi_stage_errors_total and re-raised
+    """
+    def decorator(func):
+        label = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                registry.inc('uhi_stage_errors_total', component=component, stage=label)
+                raise
+            finally:
+                registry.observe('uhi_stage_duration_seconds', time.perf_counter() - started,
+                                 component=component, stage=label)
+        return wrapper
+    return decorator
+
+
+def instrument_methods(component: str, exclude: Sequence[str] = ()) -> Callable:
+    """Class decorator applying timed() to every public method"""
+    def decorator(cls):
+        for name, value in list(vars(cls).items()):
+            if callable(value) and not name.startswith('_') and name not in exclude:
+                setattr(cls, name, timed(component, name)(value))
+        return cls
+    return decorator
+
+
+def instrument_session(session, registry: MetricsRegistry = METRICS):
+    """
+    Wrap session.request to record host, status, latency, response bytes and
+    cache hits (responses from requests-cache expose from_cache)
+    """
+    if getattr(session, '_uhi_instrumented', False):
+        return session
+    send = session.request
+
+    @functools.wraps(send)
+    def request(method, url, *args, **kwargs):
+        if not registry.enabled:
+            return send(method, url, *args, **kwargs)
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = send(method, url, *args, **kwargs)
+            status = str(response.status_code)
+            registry.inc('uhi_http_response_bytes_total', len(response.content), host=host)
+            if getattr(response, 'from_cache', False):
+                registry.inc('uhi_http_cache_hits_total', host=host)
+            return response
+        finally:
+            registry.observe('uhi_http_request_duration_seconds', time.perf_counter() - started,
+                             host=host, method=method.upper(), status=status)
+            registry.inc('uhi_http_requests_total', host=host, status=status)
+
+    session.request = request
+    session._uhi_instrumented = True
+    return session
+
+
+def enable(path: str = None):
+    """Start recording; when path is given, metrics are written there at exit"""
+    METRICS.enabled = True
+    if path:
+        atexit.register(METRICS.write, path)
+
+
+def enable_from_env():
+    """Enable recording when UHI_METRICS_FILE is set (called on import)"""
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path and not METRICS.enabled:
+        enable(path)
+
+
+enable_from_env()
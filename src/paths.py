@@ -0,0 +1,42 @@
+"""
+Project Path Configuration
+Resolves data, output and dashboard directories from the project root so that
+scripts and the pipeline runner work from any working directory
+"""
+
+import glob
+import os
+
+# Environment overrides (e.g. to run the pipeline against a scratch copy of the data)
+PROJECT_ROOT_ENV = 'UHI_PROJECT_ROOT'
+DATA_DIR_ENV = 'UHI_DATA_DIR'
+OUTPUT_DIR_ENV = 'UHI_OUTPUT_DIR'
+
+PROJECT_ROOT = os.path.abspath(os.environ.get(PROJECT_ROOT_ENV)
+                               or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DATA_DIR = os.path.abspath(os.environ.get(DATA_DIR_ENV) or os.path.join(PROJECT_ROOT, 'data'))
+RAW_DIR = os.path.join(DATA_DIR, 'raw')
+SYNTHETIC_DIR = os.path.join(DATA_DIR, 'synthetic')
+PROCESSED_DIR = os.path.join(DATA_DIR, 'processed')
+REFERENCE_DIR = os.path.join(DATA_DIR, 'reference')
+
+OUTPUT_DIR = os.path.abspath(os.environ.get(OUTPUT_DIR_ENV) or os.path.join(PROJECT_ROOT, 'outputs'))
+REPORTS_DIR = os.path.join(OUTPUT_DIR, 'reports')
+VISUALIZATIONS_DIR = os.path.join(OUTPUT_DIR, 'visualizations')
+PROFILES_DIR = os.path.join(OUTPUT_DIR, 'profiles')
+ALERTS_DIR = os.path.join(OUTPUT_DIR, 'alerts')
+TILES_DIR = os.path.join(OUTPUT_DIR, 'tiles')
+QUEUE_DIR = os.path.join(OUTPUT_DIR, 'queue')
+
+DASHBOARD_DIR = os.path.join(PROJECT_ROOT, 'web_dashboard')
+DOCS_DIR = os.path.join(PROJECT_ROOT, 'docs')
+DOCUMENTATION_DIR = os.path.join(PROJECT_ROOT, 'documentation')
+
+DATASET_PATTERN = '*uhi_dataset*.csv'
+
+
+def latest_dataset(data_dir: str = None) -> str:
+    """Return the most recent processed dataset, or None when there is none"""
+    files = glob.glob(os.path.join(data_dir or PROCESSED_DIR, DATASET_PATTERN))
+    return max(files) if files else None
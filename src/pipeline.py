@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Urban Heat Island Pipeline Runner
+Runs collect -> enrich / validate / analyze -> render -> publish as a stage DAG.
+Each stage declares its inputs and outputs; a stage is skipped when the hash of
+its inputs matches the last successful run and its outputs still exist, and
+independent stages run in parallel.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Add stage module directories to path for imports
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC_DIR)
+sys.path.append(os.path.join(SRC_DIR, 'data_collection'))
+sys.path.append(os.path.join(SRC_DIR, 'analysis'))
+import paths
+from instrumentation import METRICS, enable as enable_metrics, timed
+
+sys.path.append(paths.DASHBOARD_DIR)
+
+STATE_PATH = os.path.join(paths.OUTPUT_DIR, '.pipeline_state.json')
+STATE_VERSION = 1
+
+# Stage results
+RAN = 'ran'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+
+
+def files(*patterns: str) -> Callable[[], List[str]]:
+    """Input spec: every file matching the glob patterns"""
+    def resolve():
+        matches = set()
+        for pattern in patterns:
+            matches.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        return sorted(matches)
+    return resolve
+
+
+def latest(pattern: str) -> Callable[[], List[str]]:
+    """Input spec: only the newest file matching the glob pattern"""
+    def resolve():
+        matches = glob.glob(pattern)
+        return [max(matches)] if matches else []
+    return resolve
+
+
+def code(*modules: str) -> Callable[[], List[str]]:
+    """Input spec: source files under src/, so code changes invalidate a stage"""
+    return files(*(os.path.join(SRC_DIR, module) for module in modules))
+
+
+class Stage:
+    """A pipeline step with declared dependencies, inputs and output patterns"""
+
+    def __init__(self, name: str, func: Callable[[], None], deps: Sequence[str] = (),
+                 inputs: Sequence[Callable[[], List[str]]] = (), outputs: Sequence[str] = (),
+                 max_age_hours: float = None, description: str = ''):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.max_age_hours = max_age_hours
+        self.description = description
+
+    def input_files(self) -> List[str]:
+        """Resolve the input specs to a sorted list of files"""
+        resolved = set()
+        for spec in self.inputs:
+            resolved.update(spec())
+        return sorted(resolved)
+
+    def output_files(self) -> List[str]:
+        """Newest file matching each output pattern"""
+        produced = []
+        for pattern in self.outputs:
+            matches = glob.glob(pattern)
+            if matches:
+                produced.append(max(matches, key=os.path.getmtime))
+        return produced
+
+
+class FileHasher:
+    """
+    Content hashes for input files
+    Hashes are reused while a file's size and mtime are unchanged, so large
+    unchanged datasets are not re-read on every run
+    """
+
+    def __init__(self, cache: Dict[str, Dict] = None):
+        self.cache = dict(cache or {})
+        self._lock = threading.Lock()
+
+    def hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        key = os.path.relpath(path, paths.PROJECT_ROOT)
+        with self._lock:
+            entry = self.cache.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        with self._lock:
+            self.cache[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                               'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def hash_inputs(self, stage: Stage) -> str:
+        """Combined hash of the stage name and its input files' paths and contents"""
+        digest = hashlib.sha256(stage.name.encode('utf-8'))
+        for path in stage.input_files():
+            digest.update(os.path.relpath(path, paths.PROJECT_ROOT).encode('utf-8'))
+            digest.update(self.hash_file(path).encode('ascii'))
+        return digest.hexdigest()
+
+
+class PipelineRunner:
+    """Schedules stages in dependency order, skipping the ones that are up to date"""
+
+    def __init__(self, stages: List[Stage], state_path: str = STATE_PATH, jobs: int = 4,
+                 force: Sequence[str] = (), dry_run: bool = False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.jobs = jobs
+        self.force = set(force)
+        self.dry_run = dry_run
+        self.state = self._load_state()
+        self.hasher = FileHasher(self.state.get('files'))
+        self._lock = threading.Lock()
+
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {unknown}")
+        self.order = self._topological_order()
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                return state
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+
+    def _save_state(self):
+        with self._lock:
+            self.state['files'] = self.hasher.cache
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f'{self.state_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.state_path)
+
+    def _topological_order(self) -> List[str]:
+        """Stage names in dependency order (declaration order among peers)"""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def select(self, targets: Sequence[str] = None) -> List[str]:
+        """The target stages plus everything they depend on, in run order"""
+        if not targets:
+            return list(self.order)
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stages: {unknown}")
+        wanted = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.order if name in wanted]
+
+    def is_up_to_date(self, stage: Stage, input_hash: str) -> str:
+        """Return '' when the stage can be skipped, otherwise the reason it must run"""
+        if stage.name in self.force:
+            return 'forced'
+        record = self.state['stages'].get(stage.name)
+        if record is None:
+            return 'never run'
+        if record['input_hash'] != input_hash:
+            return 'inputs changed'
+        missing = [p for p in record.get('outputs', [])
+                   if not os.path.exists(os.path.join(paths.PROJECT_ROOT, p))]
+        if missing:
+            return f'{len(missing)} output(s) missing'
+        if stage.max_age_hours is not None:
+            age_hours = (time.time() - record['finished']) / 3600
+            if age_hours > stage.max_age_hours:
+                return f'older than {stage.max_age_hours:g}h'
+        return ''
+
+    def _execute(self, stage: Stage, input_hash: str) -> float:
+        started = time.time()
+        timed('pipeline', stage.name)(stage.func)()
+        finished = time.time()
+        outputs = [os.path.relpath(p, paths.PROJECT_ROOT) for p in stage.output_files()]
+        with self._lock:
+            self.state['stages'][stage.name] = {
+                'input_hash': input_hash,
+                'outputs': outputs,
+                'finished': finished,
+                'duration': round(finished - started, 3),
+            }
+        self._save_state()
+        return finished - started
+
+    def run(self, targets: Sequence[str] = None) -> Dict[str, str]:
+        """
+        Run the selected stages, returning name -> ran/skipped/failed/blocked
+        A stage starts once all of its dependencies have finished; stages
+        whose dependencies failed are blocked.
+        """
+        selected = self.select(targets)
+        results = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while len(results) < len(selected):
+                progressed = False
+                for name in selected:
+                    if name in results or name in running.values():
+                        continue
+                    stage = self.stages[name]
+                    dep_results = [results.get(dep) for dep in stage.deps if dep in selected]
+                    if any(r in (FAILED, BLOCKED) for r in dep_results):
+                        results[name] = BLOCKED
+                        print(f"[{name}] ✗ blocked by a failed dependency")
+                        progressed = True
+                        continue
+                    if any(r is None for r in dep_results):
+                        continue
+
+                    input_hash = self.hasher.hash_inputs(stage)
+                    reason = self.is_up_to_date(stage, input_hash)
+                    # Inputs produced upstream in a dry run do not exist yet
+                    if not reason and self.dry_run and RAN in dep_results:
+                        reason = 'upstream changes'
+                    if not reason:
+                        results[name] = SKIPPED
+                        print(f"[{name}] ✓ up to date, skipped")
+                        progressed = True
+                        continue
+                    if self.dry_run:
+                        results[name] = RAN
+                        print(f"[{name}] would run ({reason})")
+                        progressed = True
+                        continue
+
+                    print(f"[{name}] → running ({reason})")
+                    running[executor.submit(self._execute, stage, input_hash)] = name
+                    progressed = True
+
+                if progressed or not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        elapsed = future.result()
+                        results[name] = RAN
+                        print(f"[{name}] ✓ finished in {elapsed:.1f}s")
+                    except Exception as e:
+                        results[name] = FAILED
+                        print(f"[{name}] ✗ failed: {e}")
+
+        if not self.dry_run:
+            self._save_state()
+        return results
+
+
+# ---------------------------------------------------------------------------
+# Stage implementations (imports are local so unused stages cost nothing)
+# ---------------------------------------------------------------------------
+
+def _require_dataset() -> str:
+    dataset = paths.latest_dataset()
+    if dataset is None:
+        raise FileNotFoundError(f"no processed dataset in {paths.PROCESSED_DIR}")
+    return dataset
+
+
+def run_collect():
+    """Collect weather, AQI and derived features for all cities"""
+    from enhanced_collector import main as collect_main
+    df = collect_main()
+    if df is None or df.empty:
+        raise RuntimeError("collection produced no rows")
+
+
+def run_enrich():
+    """Monte Carlo uncertainty bands for the derived features"""
+    from uncertainty import main as uncertainty_main
+    if uncertainty_main([]) is None:
+        raise RuntimeError("uncertainty propagation produced no output")
+
+
+def run_validate():
+    """Schema validation of the latest dataset; fails the stage on FAIL/MISSING columns"""
+    from schema import validate_csv, print_quality_summary
+    dataset = _require_dataset()
+    report = validate_csv(dataset)
+    stem = os.path.splitext(os.path.basename(dataset))[0]
+    os.makedirs(paths.REPORTS_DIR, exist_ok=True)
+    report.to_csv(os.path.join(paths.REPORTS_DIR, f'data_quality_{stem}.csv'))
+    print_quality_summary(report)
+    failed = report.index[report['Status'].isin(['FAIL', 'MISSING'])].tolist()
+    if failed:
+        raise RuntimeError(f"schema validation failed for: {', '.join(failed)}")
+
+
+def run_analyze():
+    """Statistics, spatial hotspots, figures and the summary report"""
+    # Stages run in worker threads, so render figures without a GUI backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import analyzer
+    df = analyzer.load_dataset(_require_dataset())
+    state = analyzer.analysis_state(df)
+    analyzer.basic_statistics(state)
+    analyzer.correlation_analysis(state)
+    analyzer.regional_analysis(state)
+    analyzer.land_cover_analysis(state)
+    analyzer.top_bottom_cities(state)
+    local = analyzer.spatial_analysis(df)
+    if local is not None:
+        os.makedirs(paths.REPORTS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(paths.REPORTS_DIR, f'spatial_hotspots_{timestamp}.csv')
+        columns = [c for c in ['City Name', 'State', 'Latitude', 'Longitude'] if c in df.columns]
+        df[columns].join(local, how='inner').to_csv(output, index=False)
+    analyzer.create_visualizations(df)
+    analyzer.export_summary(df)
+
+
+def run_cluster():
+    """UHI typologies of the latest dataset with cluster profiles"""
+    from clustering import main as clustering_main
+    if clustering_main([]) is None:
+        raise RuntimeError("clustering produced no output")
+
+
+def run_render():
+    """Dashboard chart data bundle and figure images"""
+    import analyzer
+    dataset = _require_dataset()
+    df = analyzer.load_dataset(dataset)
+    analyzer.build_dashboard_data(df, dataset_name=os.path.basename(dataset))
+
+
+def run_publish():
+    """Incremental static site build into docs/"""
+    from publish import SitePublisher
+    changes = SitePublisher().publish()
+    print(f"Published: {len(changes['written'])} written, {len(changes['removed'])} removed, "
+          f"{len(changes['unchanged'])} unchanged")
+
+
+def build_stages() -> List[Stage]:
+    """The project's stage DAG"""
+    dataset = latest(os.path.join(paths.PROCESSED_DIR, paths.DATASET_PATTERN))
+    figures = [latest(os.path.join(paths.VISUALIZATIONS_DIR, f'{kind}_*.png'))
+               for kind in ['uhi_factors_analysis', 'uhi_correlation_matrix', 'top_cities_uhi', 'ndvi_vs_uhi']]
+    return [
+        Stage('collect', run_collect,
+              inputs=[code('data_collection/*collector.py', 'data_collection/indian_cities.py',
+                           'data_collection/imputation.py'),
+                      files(os.path.join(paths.REFERENCE_DIR, '*.json'))],
+              outputs=[os.path.join(paths.PROCESSED_DIR, paths.DATASET_PATTERN)],
+              max_age_hours=24,
+              description='Collect the city dataset (re-collected at most daily)'),
+        Stage('enrich', run_enrich, deps=['collect'],
+              inputs=[dataset, code('data_collection/uncertainty.py', 'data_collection/reference_data.py')],
+              outputs=[os.path.join(paths.REPORTS_DIR, 'uhi_uncertainty_bands_*.csv')],
+              description='Monte Carlo uncertainty bands'),
+        Stage('validate', run_validate, deps=['collect'],
+              inputs=[dataset, code('data_collection/schema.py')],
+              outputs=[os.path.join(paths.REPORTS_DIR, 'data_quality_*.csv')],
+              description='Schema and data quality checks'),
+        Stage('analyze', run_analyze, deps=['collect'],
+              inputs=[dataset, code('analysis/analyzer.py'), code('analysis/incremental.py'),
+                      code('analysis/spatial.py')],
+              outputs=[os.path.join(paths.VISUALIZATIONS_DIR, '*.png'),
+                       os.path.join(paths.REPORTS_DIR, 'uhi_analysis_summary_*.txt'),
+                       os.path.join(paths.REPORTS_DIR, 'spatial_hotspots_*.csv')],
+              description='Statistics, spatial hotspots, figures and summary report'),
+        Stage('cluster', run_cluster, deps=['collect'],
+              inputs=[dataset, code('analysis/clustering.py', 'analysis/incremental.py')],
+              outputs=[os.path.join(paths.REPORTS_DIR, 'uhi_typologies_*.csv'),
+                       os.path.join(paths.REPORTS_DIR, 'uhi_typology_profiles_*.csv')],
+              description='City typology clustering (mini-batch k-means)'),
+        Stage('render', run_render, deps=['validate', 'analyze'],
+              inputs=[dataset, code('analysis/analyzer.py')] + figures,
+              outputs=[os.path.join(paths.DASHBOARD_DIR, 'static', 'data', 'manifest.json')],
+              description='Dashboard chart data bundle'),
+        Stage('publish', run_publish, deps=['render'],
+              inputs=[files(os.path.join(paths.DASHBOARD_DIR, 'index.html'),
+                            os.path.join(paths.DASHBOARD_DIR, 'publish.py'),
+                            os.path.join(paths.DASHBOARD_DIR, 'static', '**', '*'),
+                            os.path.join(paths.DOCUMENTATION_DIR, '*.md')),
+                      dataset],
+              outputs=[os.path.join(paths.DOCS_DIR, 'index.html')],
+              description='Static site build into docs/'),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the Urban Heat Island pipeline')
+    parser.add_argument('stages', nargs='*', help='Target stages (default: all); dependencies are included')
+    parser.add_argument('--force', nargs='*', metavar='STAGE',
+                        help='Re-run the given stages (all selected stages when no names are given)')
+    parser.add_argument('--dry-run', action='store_true', help='Show which stages would run')
+    parser.add_argument('--jobs', type=int, default=4, help='Maximum stages running in parallel')
+    parser.add_argument('--list', action='store_true', help='List stages and exit')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='Record timings and HTTP metrics; .json for JSON, otherwise Prometheus text')
+    args = parser.parse_args(argv)
+
+    stages = build_stages()
+    if args.list:
+        for stage in stages:
+            deps = f" (after {', '.join(stage.deps)})" if stage.deps else ''
+            print(f"{stage.name:10s} {stage.description}{deps}")
+        return {}
+
+    if args.metrics:
+        enable_metrics(args.metrics)
+
+    runner = PipelineRunner(stages, jobs=args.jobs, dry_run=args.dry_run)
+    selected = runner.select(args.stages)
+    if args.force is not None:
+        runner.force = set(args.force or selected)
+
+    print("=" * 80)
+    print("URBAN HEAT ISLAND PIPELINE")
+    print("=" * 80)
+    print(f"Project root: {paths.PROJECT_ROOT}")
+    print(f"Stages: {' → '.join(selected)}")
+    print(f"Started at: {datetime.now()}")
+    print("=" * 80 + "\n")
+
+    started = time.time()
+    results = runner.run(selected)
+
+    print("\n" + "=" * 80)
+    print("PIPELINE SUMMARY")
+    print("=" * 80)
+    for name in selected:
+        print(f"  {name:10s} {results.get(name, '-')}")
+    print(f"\nTotal time: {time.time() - started:.1f}s")
+    if METRICS.enabled:
+        print("\nSlowest steps:")
+        METRICS.summary('uhi_stage_duration_seconds')
+    print("=" * 80)
+    return results
+
+
+if __name__ == "__main__":
+    results = main()
+    sys.exit(1 if any(r in (FAILED, BLOCKED) for r in results.values()) else 0)
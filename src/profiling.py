@@ -0,0 +1,208 @@
+"""
+Profiling Hooks for the Collection and Analysis Entry Points
+Runs an entry point under cProfile, a sampling stack profiler or tracemalloc
+and writes the reports to outputs/profiles, including flamegraph-compatible
+collapsed stacks (flamegraph.pl, speedscope) and top allocation sites
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Callable, List
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from paths import PROFILES_DIR
+
+PROFILE_MODES = ['cprofile', 'sample', 'tracemalloc']
+
+
+def _frame_label(code) -> str:
+    """module:function label for a code object"""
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{os.path.splitext(os.path.basename(code.co_filename))[0]}:{name}'
+
+
+def write_collapsed(stacks: Counter, path: str) -> str:
+    """Write 'frame;frame;frame count' lines, heaviest first"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{";".join(stack)} {int(count)}\n')
+    return path
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the target thread's stack
+    every interval seconds, so overhead does not grow with call counts
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def top_self(self, limit: int = 30) -> List:
+        """(frame, samples) where the frame was on top of the stack"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        return leaves.most_common(limit)
+
+    def top_inclusive(self, limit: int = 30) -> List:
+        """(frame, samples) where the frame was anywhere on the stack"""
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack):
+                inclusive[label] += count
+        return inclusive.most_common(limit)
+
+
+def profile_call(func: Callable, mode: str, name: str, output_dir: str = PROFILES_DIR,
+                 interval: float = 0.005, frames: int = 10, top: int = 30):
+    """
+    Run func() under the chosen profiler and write its reports
+    Returns (func result, dict of report paths)
+
+    tracemalloc's overhead grows with the number of traceback frames kept;
+    frames=10 is enough to attribute allocations to project code.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}' (expected one of {PROFILE_MODES})")
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, f"{name}_{mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    reports = {}
+    started = time.perf_counter()
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func)
+        finally:
+            reports['stats'] = f'{prefix}.prof'
+            profiler.dump_stats(reports['stats'])
+            text = io.StringIO()
+            stats = pstats.Stats(profiler, stream=text).strip_dirs()
+            text.write(f"Wall time: {time.perf_counter() - started:.3f}s\n\n")
+            stats.sort_stats('cumulative').print_stats(top)
+            stats.sort_stats('tottime').print_stats(top)
+            reports['report'] = f'{prefix}.txt'
+            with open(reports['report'], 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+
+    elif mode == 'sample':
+        sampler = StackSampler(interval=interval)
+        sampler.start()
+        try:
+            result = func()
+        finally:
+            sampler.stop()
+            reports['collapsed'] = write_collapsed(sampler.stacks, f'{prefix}.collapsed')
+            reports['report'] = f'{prefix}.txt'
+            with open(reports['report'], 'w', encoding='utf-8') as f:
+                f.write(f"Wall time: {time.perf_counter() - started:.3f}s\n")
+                f.write(f"Samples: {sampler.samples} every {interval * 1000:g} ms\n\n")
+                for title, rows in [('Self (top of stack)', sampler.top_self(top)),
+                                    ('Inclusive (anywhere on stack)', sampler.top_inclusive(top))]:
+                    f.write(f"{title}:\n")
+                    for label, count in rows:
+                        f.write(f"  {100 * count / max(sampler.samples, 1):6.1f}%  {count:7d}  {label}\n")
+                    f.write("\n")
+
+    else:
+        tracemalloc.start(frames)
+        try:
+            result = func()
+        finally:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # Live allocations by traceback, as a memory flamegraph weighted in KiB
+            stacks = Counter()
+            for stat in snapshot.statistics('traceback'):
+                stack = tuple(f'{os.path.splitext(os.path.basename(fr.filename))[0]}:{fr.lineno}'
+                              for fr in reversed(stat.traceback))
+                stacks[stack] += max(1, stat.size // 1024)
+            reports['collapsed'] = write_collapsed(stacks, f'{prefix}.collapsed')
+
+            reports['report'] = f'{prefix}.txt'
+            with open(reports['report'], 'w', encoding='utf-8') as f:
+                f.write(f"Wall time: {time.perf_counter() - started:.3f}s\n")
+                f.write(f"Traced memory: {current / 1024 ** 2:.1f} MiB live, {peak / 1024 ** 2:.1f} MiB peak\n\n")
+                f.write(f"Top {top} allocation sites (live at exit):\n")
+                for stat in snapshot.statistics('lineno')[:top]:
+                    frame = stat.traceback[0]
+                    f.write(f"  {stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  "
+                            f"{frame.filename}:{frame.lineno}\n")
+
+    return result, reports
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add --profile and its options to an entry point's parser"""
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='Profile this run and write reports to outputs/profiles')
+    parser.add_argument('--profile-interval', type=float, default=0.005,
+                        help='Sampling interval in seconds for --profile sample')
+    parser.add_argument('--profile-frames', type=int, default=10,
+                        help='Traceback depth kept by --profile tracemalloc (deeper is slower)')
+    parser.add_argument('--profile-dir', default=PROFILES_DIR, help='Directory for profile reports')
+
+
+def run_with_profiling(main: Callable, name: str, argv: List[str] = None,
+                       parser: argparse.ArgumentParser = None):
+    """
+    Entry point wrapper: parse the profiling options and run main() under the
+    requested profiler (or directly when --profile is not given)
+    When the entry point passes its own parser, main(args) receives the parsed options
+    """
+    target = main
+    if parser is None:
+        parser = argparse.ArgumentParser(description=f'Run {name}')
+    else:
+        target = lambda: main(args)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.profile:
+        return target()
+
+    result, reports = profile_call(target, args.profile, name, output_dir=args.profile_dir,
+                                   interval=args.profile_interval, frames=args.profile_frames)
+    print("\n" + "=" * 80)
+    print(f"PROFILE ({args.profile})")
+    print("=" * 80)
+    for kind, path in reports.items():
+        print(f"  {kind:10s} {path}")
+    print("=" * 80)
+    return result
@@ -0,0 +1,85 @@
+"""
+Startup-Time Benchmark for the Entry Points
+Times fresh interpreter launches of each entry point (import plus --help,
+or a full text-only analysis) and lists the heaviest imports reported by
+python -X importtime, so import-time regressions are easy to spot
+"""
+
+from typing import Dict, List
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import os
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# label -> (working directory under src/, arguments after the interpreter)
+ENTRY_POINTS = {
+    'analyzer --help': ('analysis', ['analyzer.py', '--help']),
+    'collector import': ('data_collection', ['-c', 'import collector']),
+    'enhanced_collector import': ('data_collection', ['-c', 'import enhanced_collector']),
+    'pipeline --list': ('.', ['pipeline.py', '--list']),
+}
+
+# Full runs, opt-in because they read the latest dataset and write a summary report
+RUN_ENTRY_POINTS = {
+    'analyzer --text-only': ('analysis', ['analyzer.py', '--text-only']),
+}
+
+
+def time_launch(cwd: str, args: List[str], repeat: int) -> List[float]:
+    """Wall-clock seconds for repeat fresh launches"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=os.path.join(SRC_DIR, cwd),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def heaviest_imports(cwd: str, args: List[str], top: int = 8) -> List:
+    """(cumulative seconds, module) for the top-level imports of one launch"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=os.path.join(SRC_DIR, cwd),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports are the ones indented by exactly one space
+        if name.startswith(' ') and not name.startswith('  '):
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    """Benchmark entry point startup"""
+    parser = argparse.ArgumentParser(description='Startup-time benchmark for the entry points')
+    parser.add_argument('--repeat', type=int, default=5, help='Launches per entry point')
+    parser.add_argument('--imports', action='store_true', help='Show the heaviest imports of each entry point')
+    parser.add_argument('--run', action='store_true',
+                        help='Also time a full text-only analysis (writes a summary report)')
+    args = parser.parse_args()
+
+    entry_points: Dict = dict(ENTRY_POINTS)
+    if args.run:
+        entry_points.update(RUN_ENTRY_POINTS)
+
+    print("=" * 80)
+    print(f"STARTUP BENCHMARK ({args.repeat} launches each, {sys.executable})")
+    print("=" * 80)
+    print(f"{'Entry point':32s} {'median':>9s} {'min':>9s} {'max':>9s}")
+    for label, (cwd, launch_args) in entry_points.items():
+        timings = time_launch(cwd, launch_args, args.repeat)
+        print(f"{label:32s} {statistics.median(timings):8.3f}s {min(timings):8.3f}s {max(timings):8.3f}s")
+        if args.imports:
+            for seconds, module in heaviest_imports(cwd, launch_args):
+                print(f"    {seconds:7.3f}s  {module}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/bin/bash
+#
+# Publish the web dashboard to docs/ (GitHub Pages)
+# Usage: bash publish_dashboard.sh [--dry-run] [--force]
+#
+
+echo "================================================"
+echo "Publishing Urban Heat Island Dashboard"
+echo "================================================"
+echo ""
+
+# Navigate to the dashboard directory
+cd "$(dirname "$0")/../web_dashboard" || exit 1
+
+# Build docs/ from web_dashboard/, writing only changed files
+python3 publish.py "$@"
+
+echo ""
+echo "================================================"
+echo "Publish complete!"
+echo "Commit docs/ to update GitHub Pages"
+echo "================================================"
@@ -0,0 +1,14 @@
+#!/bin/bash
+#
+# Run the full UHI pipeline (collect → enrich/validate/analyze → render → publish)
+# Stages whose inputs are unchanged since the last run are skipped
+# Usage: bash run_pipeline.sh [stage ...] [--force [stage ...]] [--dry-run]
+#
+
+echo "================================================"
+echo "Urban Heat Island Pipeline"
+echo "================================================"
+echo ""
+
+# Paths are resolved from the project root, so no cd is needed
+python "$(dirname "$0")/../src/pipeline.py" "$@"
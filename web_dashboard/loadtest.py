@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Load-Testing Harness for the Dashboard Server
+Simulates N concurrent browsers that load the dashboard page and its assets
+(CSS/JS, figure images, data bundle and, when served, map tiles) over
+persistent connections with per-browser HTTP caching, then reports
+requests/second, latency percentiles and error rates. Works against any
+server (server.py with or without tiles, a plain static server, published docs/)
+and can compare a run with a saved baseline to catch throughput regressions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List
+from urllib.parse import urljoin, urlsplit
+import http.client
+import argparse
+import random
+import json
+import math
+import signal
+import subprocess
+import threading
+import time
+import sys
+import os
+
+# Shared path configuration lives in src/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import paths
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Server modes that --launch can start locally: (working directory, command after the interpreter)
+SERVER_MODES = {
+    'dashboard': (DASHBOARD_DIR, ['server.py', '--no-browser', '--host', '127.0.0.1', '--port', '{port}']),
+    'dashboard-no-tiles': (DASHBOARD_DIR, ['server.py', '--no-browser', '--no-tiles',
+                                           '--host', '127.0.0.1', '--port', '{port}']),
+    'static': (DASHBOARD_DIR, ['-m', 'http.server', '--bind', '127.0.0.1', '{port}']),
+    'docs': (paths.DOCS_DIR, ['-m', 'http.server', '--bind', '127.0.0.1', '{port}']),
+}
+
+# Browsers open up to six connections per host
+BROWSER_CONNECTIONS = 6
+
+# Viewport of a map client, in tiles, and the area it pans over (south, west, north, east)
+TILE_VIEWPORT = (4, 3)
+TILE_ZOOMS = (5, 8)
+INDIA_BOUNDS = (8.0, 69.0, 34.0, 92.0)
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+class AssetParser(HTMLParser):
+    """Collects same-origin stylesheets, scripts and images referenced by a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and attrs.get('rel') == 'stylesheet':
+            url = attrs.get('href')
+        elif tag in ('script', 'img'):
+            url = attrs.get('src')
+        else:
+            return
+        if url and not urlsplit(url).scheme and not url.startswith('//') and url not in self.assets:
+            self.assets.append(url)
+
+
+def resource_kind(path: str) -> str:
+    """Reporting bucket of a request path"""
+    path = urlsplit(path).path
+    if path.startswith('/tiles/'):
+        return 'tile'
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('', '.html'):
+        return 'html'
+    if extension in ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp'):
+        return 'image'
+    return {'.css': 'css', '.js': 'js', '.json': 'data'}.get(extension, 'other')
+
+
+def _get(base_url: str, path: str):
+    """One-off GET used for discovery; returns (status, body)"""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def discover_page(base_url: str) -> dict:
+    """
+    Fetch the page once and list what a browser loads with it: the assets in the
+    HTML, the data manifest and bundle that script.js fetches, and tile metadata
+    when the server has a tile endpoint
+    """
+    page = urlsplit(base_url).path or '/'
+    status, body = _get(base_url, page)
+    if status != 200:
+        raise RuntimeError(f"{base_url} returned HTTP {status}")
+
+    parser = AssetParser()
+    parser.feed(body.decode('utf-8', errors='replace'))
+    assets = [urlsplit(urljoin(page, url)).path for url in parser.assets]
+
+    manifest_path = urljoin(page, 'static/data/manifest.json')
+    status, body = _get(base_url, manifest_path)
+    if status == 200:
+        manifest = json.loads(body)
+        assets.append(manifest_path)
+        for url in [manifest.get('data')] + list(manifest.get('figures', {}).values()):
+            path = url and urlsplit(urljoin(page, url)).path
+            if path and path not in assets:
+                assets.append(path)
+
+    tiles = None
+    status, body = _get(base_url, urljoin(page, 'tiles/layers.json'))
+    if status == 200:
+        tiles = json.loads(body)
+        tiles['prefix'] = urljoin(page, 'tiles/')
+
+    return {'page': page, 'assets': assets, 'tiles': tiles}
+
+
+class Browser:
+    """
+    One simulated browser: a page view fetches the HTML, then its assets over up to
+    BROWSER_CONNECTIONS keep-alive connections, honouring Cache-Control max-age and
+    revalidating stale entries with If-None-Match / If-Modified-Since
+    """
+
+    def __init__(self, base_url: str, site: dict, rng: random.Random, samples: list, counters: dict,
+                 lock: threading.Lock, tiles_per_visit: int = 0, timeout: float = 10.0):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.site = site
+        self.rng = rng
+        self.samples = samples
+        self.counters = counters
+        self.lock = lock
+        self.tiles_per_visit = tiles_per_visit if site['tiles'] else 0
+        self.timeout = timeout
+        self.cache = {}
+        self.local = threading.local()
+        self.pool = ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def fetch(self, path: str):
+        """GET one resource through the browser cache, recording a latency sample"""
+        now = time.monotonic()
+        entry = self.cache.get(path)
+        if entry is not None and now < entry['expires']:
+            self._count('cache_hits')
+            return
+
+        headers = {'Accept-Encoding': 'identity'}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        conn = self._connection()
+        started = time.perf_counter()
+        status, size, error = 0, 0, None
+        for attempt in range(2):
+            reused = conn.sock is not None
+            if not reused:
+                self._count('connections')
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                status, size, error = response.status, len(body), None
+                if status == 200 or status == 304:
+                    self._remember(path, response)
+                break
+            except (OSError, http.client.HTTPException) as e:
+                error = type(e).__name__
+                conn.close()
+                # Like browsers, retry once when the server closed an idle keep-alive connection
+                if not (reused and isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError,
+                                                  BrokenPipeError))):
+                    break
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.samples.append((resource_kind(path), latency, status, size, error))
+
+    def _remember(self, path: str, response: http.client.HTTPResponse):
+        entry = self.cache.setdefault(path, {})
+        entry['etag'] = response.getheader('ETag') or entry.get('etag')
+        entry['last_modified'] = response.getheader('Last-Modified') or entry.get('last_modified')
+        max_age = 0
+        for directive in (response.getheader('Cache-Control') or '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name == 'max-age' and value.isdigit():
+                max_age = int(value)
+            elif name in ('no-cache', 'no-store'):
+                max_age = 0
+                break
+        entry['expires'] = time.monotonic() + max_age
+
+    def _tile_paths(self) -> List[str]:
+        """Tiles of a map viewport at a random zoom and position over India"""
+        tiles = self.site['tiles']
+        layer = self.rng.choice(list(tiles['layers']))
+        z = self.rng.randint(*TILE_ZOOMS)
+        n = 2 ** z
+        south, west, north, east = INDIA_BOUNDS
+        lat, lon = self.rng.uniform(south, north), self.rng.uniform(west, east)
+        cx = int((lon + 180) / 360 * n)
+        cy = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+        width, height = TILE_VIEWPORT
+        paths = [f"{tiles['prefix']}{layer}/{z}/{x}/{y}.png?v={tiles['version']}"
+                 for x in range(cx - width // 2, cx - width // 2 + width)
+                 for y in range(cy - height // 2, cy - height // 2 + height) if 0 <= x < n and 0 <= y < n]
+        return paths[:self.tiles_per_visit]
+
+    def visit(self, new_visitor: bool):
+        """One page view; a new visitor starts with an empty cache"""
+        if new_visitor:
+            self.cache.clear()
+        self.fetch(self.site['page'])
+        list(self.pool.map(self.fetch, self.site['assets']))
+        if self.tiles_per_visit:
+            list(self.pool.map(self.fetch, self._tile_paths()))
+        self._count('visits')
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def run_browsers(base_url: str, site: dict, browsers: int, duration: float, think: float = 1.0,
+                 ramp_up: float = 0.0, new_visitor_rate: float = 0.3, tiles_per_visit: int = 0,
+                 seed: int = 0, timeout: float = 10.0) -> dict:
+    """Run `browsers` browser threads for `duration` seconds in this process"""
+    samples, counters, lock = [], {}, threading.Lock()
+    started = time.monotonic()
+    deadline = started + duration
+
+    def browse(index: int):
+        rng = random.Random(seed * 100003 + index)
+        browser = Browser(base_url, site, rng, samples, counters, lock, tiles_per_visit, timeout)
+        time.sleep(ramp_up * index / max(browsers, 1))
+        first = True
+        try:
+            while time.monotonic() < deadline:
+                browser.visit(new_visitor=first or rng.random() < new_visitor_rate)
+                first = False
+                if think > 0:
+                    time.sleep(min(rng.expovariate(1 / think), max(deadline - time.monotonic(), 0)))
+        finally:
+            browser.close()
+
+    threads = [threading.Thread(target=browse, args=(i,), daemon=True) for i in range(browsers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'samples': samples, 'counters': counters, 'elapsed': time.monotonic() - started}
+
+
+def _run_process(task: tuple) -> dict:
+    return run_browsers(*task)
+
+
+def load_test(base_url: str, browsers: int = 50, duration: float = 30.0, processes: int = 1,
+              think: float = 1.0, ramp_up: float = 0.0, new_visitor_rate: float = 0.3,
+              tiles_per_visit: int = 0, seed: int = 42, timeout: float = 10.0) -> dict:
+    """Discover the page, drive the browsers (split across processes) and summarize"""
+    site = discover_page(base_url)
+    processes = max(1, min(processes, browsers))
+    shares = [browsers // processes + (i < browsers % processes) for i in range(processes)]
+    tasks = [(base_url, site, share, duration, think, ramp_up, new_visitor_rate, tiles_per_visit, seed + i,
+              timeout) for i, share in enumerate(shares)]
+
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_run_process, tasks))
+    else:
+        results = [_run_process(tasks[0])]
+
+    samples = [sample for result in results for sample in result['samples']]
+    counters = {}
+    for result in results:
+        for key, value in result['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+    summary = summarize(samples, max(result['elapsed'] for result in results), counters)
+    summary['target'] = base_url
+    summary['config'] = {'browsers': browsers, 'duration': duration, 'processes': processes, 'think': think,
+                         'ramp_up': ramp_up, 'new_visitor_rate': new_visitor_rate,
+                         'tiles_per_visit': tiles_per_visit if site['tiles'] else 0,
+                         'assets': len(site['assets'])}
+    return summary
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not ordered:
+        return float('nan')
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    stats = {f'p{q}': _percentile(ordered, q) * 1000 for q in LATENCY_PERCENTILES}
+    stats['mean'] = sum(ordered) / len(ordered) * 1000 if ordered else float('nan')
+    stats['max'] = ordered[-1] * 1000 if ordered else float('nan')
+    return stats
+
+
+def summarize(samples: list, elapsed: float, counters: dict) -> dict:
+    """Throughput, latency (ms) and status breakdown, overall and per resource kind"""
+    def block(rows):
+        statuses = {}
+        for _, _, status, _, error in rows:
+            key = error or (str(status) if status in (200, 304) else f'{status // 100}xx')
+            statuses[key] = statuses.get(key, 0) + 1
+        failed = sum(count for key, count in statuses.items() if key not in ('200', '304'))
+        return {
+            'requests': len(rows),
+            'rps': len(rows) / elapsed if elapsed > 0 else 0.0,
+            'error_rate': failed / len(rows) if rows else 0.0,
+            'bytes': sum(row[3] for row in rows),
+            'statuses': statuses,
+            'latency_ms': _latency_stats([row[1] for row in rows]),
+        }
+
+    kinds = sorted({row[0] for row in samples})
+    summary = block(samples)
+    summary['elapsed'] = elapsed
+    summary['visits'] = counters.get('visits', 0)
+    summary['cache_hits'] = counters.get('cache_hits', 0)
+    summary['connections'] = counters.get('connections', 0)
+    summary['by_kind'] = {kind: block([row for row in samples if row[0] == kind]) for kind in kinds}
+    return summary
+
+
+def print_report(summary: dict):
+    """Console report of a load test"""
+    config = summary['config']
+    print(f"\nTarget: {summary['target']}")
+    print(f"{config['browsers']} browsers in {config['processes']} process(es), {summary['elapsed']:.1f}s, "
+          f"think {config['think']}s, {config['assets']} assets per page")
+    print(f"\nPage views:      {summary['visits']:,}")
+    print(f"Requests:        {summary['requests']:,} ({summary['rps']:,.1f}/s, "
+          f"{summary['bytes'] / max(summary['elapsed'], 1e-9) / 1024 ** 2:,.2f} MiB/s)")
+    print(f"Cache hits:      {summary['cache_hits']:,} (served without a request)")
+    reuse = summary['requests'] / summary['connections'] if summary['connections'] else float('nan')
+    print(f"Connections:     {summary['connections']:,} ({reuse:.1f} requests per connection)")
+    print(f"Error rate:      {summary['error_rate']:.2%}")
+    print(f"Statuses:        {', '.join(f'{k}: {v:,}' for k, v in sorted(summary['statuses'].items()))}")
+
+    header = f"{'Kind':<8}{'Requests':>10}{'Req/s':>10}{'Errors':>9}" + \
+        ''.join(f"{f'p{q} ms':>10}" for q in LATENCY_PERCENTILES) + f"{'max ms':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for kind, block in [('all', summary)] + sorted(summary['by_kind'].items()):
+        latency = block['latency_ms']
+        print(f"{kind:<8}{block['requests']:>10,}{block['rps']:>10,.1f}{block['error_rate']:>9.2%}"
+              + ''.join(f"{latency[f'p{q}']:>10.1f}" for q in LATENCY_PERCENTILES) + f"{latency['max']:>10.1f}")
+
+
+def compare_with_baseline(summary: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """Regressions beyond tolerance: lower throughput, higher p95 latency or more errors"""
+    regressions = []
+    if summary['rps'] < baseline['rps'] * (1 - tolerance):
+        regressions.append(f"throughput {summary['rps']:.1f}/s vs baseline {baseline['rps']:.1f}/s")
+    p95, base_p95 = summary['latency_ms']['p95'], baseline['latency_ms']['p95']
+    if p95 > base_p95 * (1 + tolerance):
+        regressions.append(f"p95 latency {p95:.1f} ms vs baseline {base_p95:.1f} ms")
+    if summary['error_rate'] > baseline['error_rate'] + 0.001:
+        regressions.append(f"error rate {summary['error_rate']:.2%} vs baseline {baseline['error_rate']:.2%}")
+    return regressions
+
+
+def launch_server(mode: str, port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """Start a local server in the given mode and wait until it answers"""
+    cwd, args = SERVER_MODES[mode]
+    # A new session lets stop_server reach the server's worker processes too
+    process = subprocess.Popen([sys.executable] + [arg.format(port=port) for arg in args], cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {process.returncode}")
+        try:
+            _get(f'http://127.0.0.1:{port}/', '/')
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{mode} server did not start within {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen):
+    """Terminate a launched server and its process group"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the UHI dashboard server')
+    parser.add_argument('--url', default='http://localhost:8000/', help='Dashboard page URL')
+    parser.add_argument('--launch', choices=list(SERVER_MODES),
+                        help='Start a local server in this mode and test it instead of --url')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --launch')
+    parser.add_argument('--browsers', type=int, default=50, help='Concurrent simulated browsers')
+    parser.add_argument('--duration', type=float, default=30.0, help='Test duration in seconds')
+    parser.add_argument('--processes', type=int, default=1, help='Load generator processes')
+    parser.add_argument('--think', type=float, default=1.0,
+                        help='Mean think time between page views in seconds (0 = back-to-back)')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='Seconds over which browsers start')
+    parser.add_argument('--new-visitors', type=float, default=0.3,
+                        help='Fraction of repeat page views that start with an empty cache')
+    parser.add_argument('--tiles', type=int, default=12, help='Map tiles per page view when tiles are served')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Save the summary as JSON (e.g. to use as a baseline)')
+    parser.add_argument('--baseline', help='Compare with a saved summary and exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print(" Urban Heat Island Dashboard - Load Test")
+    print("=" * 80)
+
+    server = None
+    url = args.url
+    try:
+        if args.launch:
+            print(f"\nStarting {args.launch} server on port {args.port}...")
+            server = launch_server(args.launch, args.port)
+            url = f'http://127.0.0.1:{args.port}/'
+        summary = load_test(url, browsers=args.browsers, duration=args.duration, processes=args.processes,
+                            think=args.think, ramp_up=args.ramp_up, new_visitor_rate=args.new_visitors,
+                            tiles_per_visit=args.tiles, seed=args.seed, timeout=args.timeout)
+    except (OSError, RuntimeError) as e:
+        print(f"\nError: {e}")
+        return 2
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    if args.launch:
+        summary['mode'] = args.launch
+    print_report(summary)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n✓ Summary saved to: {args.json}")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_with_baseline(summary, json.load(f), args.tolerance)
+        if regressions:
+            print("\n✗ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            status = 1
+        else:
+            print(f"\n✓ Within {args.tolerance:.0%} of baseline")
+    print("\n" + "=" * 80)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Static Site Publisher for the Urban Heat Island Dashboard
+Builds docs/ (GitHub Pages) from web_dashboard/ plus the latest dataset and
+documentation, fingerprinting assets, minifying CSS/JS and writing gzip
+variants. Only files whose content changed since the last publish are written.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always written
+    brotli = None
+
+# Shared path configuration lives in src/
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+import paths
+
+DASHBOARD_DIR = Path(paths.DASHBOARD_DIR)
+DEFAULT_OUTPUT_DIR = Path(paths.DOCS_DIR)
+PROCESSED_DIR = Path(paths.PROCESSED_DIR)
+DOCUMENTATION_DIR = Path(paths.DOCUMENTATION_DIR)
+
+PUBLISH_MANIFEST = '.publish-manifest.json'
+REPOSITORY_URL = 'https://github.com/Arvind-55555/India-Urban-Heat-Island'
+
+# Text formats that get precompressed variants
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.json', '.csv', '.md'}
+
+# Directories whose contents are fully owned by the publisher
+MANAGED_DIRS = ['static', 'data', 'documentation']
+
+
+def content_hash(data: bytes, length: int = 10) -> str:
+    """Short sha256 hex digest used for fingerprinted file names"""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def fingerprint_name(path: str, data: bytes) -> str:
+    """static/css/style.css -> static/css/style.<hash>.css"""
+    stem, suffix = os.path.splitext(path)
+    return f'{stem}.{content_hash(data)}{suffix}'
+
+
+def minify_css(text: str) -> str:
+    """Strip comments and collapse whitespace around CSS punctuation"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+# Lexical states of the JS line scanner
+JS_CODE, JS_STRING, JS_TEMPLATE, JS_REGEX, JS_BLOCK_COMMENT = 'code', 'string', 'template', 'regex', 'comment'
+
+# A '/' after one of these (or at the start) begins a regex literal rather than a division
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^') | {''}
+
+
+def js_line_states(text: str) -> List[tuple]:
+    """
+    Split JS into lines with the lexical state at the start and end of each
+    (code, string, template, regex or block comment), tracking quotes, template
+    literals with nested ${...}, regex literals and comments
+    """
+    lines = []
+    state, quote, previous = JS_CODE, '', ''
+    braces = []  # open-brace counts of the ${...} expressions we are inside
+    for line in text.split('\n'):
+        start = state
+        i, n = 0, len(line)
+        while i < n:
+            char = line[i]
+            if state == JS_BLOCK_COMMENT:
+                end = line.find('*/', i)
+                if end < 0:
+                    break
+                state, i = JS_CODE, end + 2
+                continue
+            if state in (JS_STRING, JS_TEMPLATE, JS_REGEX):
+                if char == '\\':
+                    i += 2
+                    continue
+                if state == JS_REGEX and char == '[':
+                    close = line.find(']', i + 1)
+                    i = n if close < 0 else close + 1
+                    continue
+                if state == JS_TEMPLATE and line.startswith('${', i):
+                    braces.append(0)
+                    state, previous, i = JS_CODE, '{', i + 2
+                    continue
+                if char == quote:
+                    state, previous = JS_CODE, 'x'
+                i += 1
+                continue
+            # Code
+            if char.isspace():
+                i += 1
+                continue
+            if line.startswith('//', i):
+                break
+            if line.startswith('/*', i):
+                state, i = JS_BLOCK_COMMENT, i + 2
+                continue
+            if char in '\'"`':
+                state, quote = (JS_TEMPLATE if char == '`' else JS_STRING), char
+            elif char == '/' and previous in JS_REGEX_PRECEDERS:
+                state, quote = JS_REGEX, '/'
+            elif char == '{' and braces:
+                braces[-1] += 1
+            elif char == '}' and braces:
+                if braces[-1] == 0:
+                    braces.pop()
+                    state, quote = JS_TEMPLATE, '`'
+                    i += 1
+                    continue
+                braces[-1] -= 1
+            previous = char
+            i += 1
+        # Only template literals, block comments and backslash-continued strings span lines
+        if state in (JS_STRING, JS_REGEX) and not line.endswith('\\'):
+            state = JS_CODE
+        lines.append((line, start, state))
+    return lines
+
+
+def minify_js(text: str) -> str:
+    """
+    Conservative JS minification: drop indentation, blank lines and comments
+    that take up whole lines. Lines inside template literals and multi-line
+    strings are kept verbatim, and trailing whitespace is only removed when the
+    line ends in code.
+    """
+    lines = []
+    for line, start, end in js_line_states(text):
+        if start == JS_BLOCK_COMMENT:
+            # Continuation of a comment: drop it unless code follows the comment's end
+            if end == JS_BLOCK_COMMENT or not line[line.index('*/') + 2:].strip():
+                continue
+            line = line[line.index('*/') + 2:]
+        elif start != JS_CODE:
+            lines.append(line)
+            continue
+        stripped = line.strip() if end in (JS_CODE, JS_BLOCK_COMMENT) else line.lstrip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        if stripped.startswith('/*') and (end == JS_BLOCK_COMMENT or not stripped[stripped.index('*/') + 2:].strip()):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines) + '\n'
+
+
+def compressed_variants(path: str, data: bytes) -> Dict[str, bytes]:
+    """Return {path.gz: ..., path.br: ...} for compressible text files"""
+    if os.path.splitext(path)[1] not in COMPRESSIBLE_SUFFIXES:
+        return {}
+    # mtime=0 keeps the gzip bytes stable so unchanged files are not rewritten
+    variants = {f'{path}.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[f'{path}.br'] = brotli.compress(data)
+    return variants
+
+
+def latest_dataset(name: str = None) -> Path:
+    """Return the dataset named in the dashboard manifest, or the newest processed CSV"""
+    if name and (PROCESSED_DIR / name).exists():
+        return PROCESSED_DIR / name
+    latest = paths.latest_dataset(str(PROCESSED_DIR))
+    return Path(latest) if latest else None
+
+
+class SitePublisher:
+    """Builds the published site in memory, then syncs it to the output directory"""
+
+    def __init__(self, output_dir: Path = DEFAULT_OUTPUT_DIR, minify: bool = True):
+        self.output_dir = Path(output_dir)
+        self.minify = minify
+        self.files = {}
+
+    def add(self, path: str, data: bytes, compress: bool = True):
+        """Stage an output file (and its compressed variants)"""
+        self.files[path] = data
+        if compress:
+            self.files.update(compressed_variants(path, data))
+
+    def add_asset(self, path: str, data: bytes) -> str:
+        """Stage a fingerprinted asset and return its published path"""
+        published = fingerprint_name(path, data)
+        self.add(published, data)
+        return published
+
+    def build(self) -> Dict[str, bytes]:
+        """Assemble every output file of the site"""
+        self.files = {}
+        renames = {}
+
+        css_path = 'static/css/style.css'
+        css = (DASHBOARD_DIR / css_path).read_text(encoding='utf-8')
+        renames[css_path] = self.add_asset(css_path, (minify_css(css) if self.minify else css).encode('utf-8'))
+
+        js_path = 'static/js/script.js'
+        js = (DASHBOARD_DIR / js_path).read_text(encoding='utf-8')
+        renames[js_path] = self.add_asset(js_path, (minify_js(js) if self.minify else js).encode('utf-8'))
+
+        # Dashboard data manifest keeps its name (script.js fetches it uncached);
+        # the data bundle it points to is already fingerprinted by the analyzer
+        manifest_path = DASHBOARD_DIR / 'static' / 'data' / 'manifest.json'
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+
+        html = (DASHBOARD_DIR / 'index.html').read_text(encoding='utf-8')
+        # Point data-figure images at the manifest's current figures; older PNGs
+        # named in the markup may have been pruned by the analyzer
+        figures = manifest.get('figures', {})
+        html = re.sub(r'<img src="[^"]*" data-figure="([^"]+)"',
+                      lambda m: (f'<img src="{figures[m.group(1)]}" data-figure="{m.group(1)}"'
+                                 if m.group(1) in figures else m.group(0)),
+                      html)
+        images = set(re.findall(r'src="(static/images/[^"]+)"', html))
+        images.update(manifest.get('figures', {}).values())
+        for image in sorted(images):
+            source = DASHBOARD_DIR / image
+            if source.exists():
+                renames[image] = self.add_asset(image, source.read_bytes())
+
+        if manifest:
+            bundle = manifest.get('data')
+            if bundle and (DASHBOARD_DIR / bundle).exists():
+                self.add(bundle, (DASHBOARD_DIR / bundle).read_bytes())
+            manifest['figures'] = {kind: renames.get(path, path)
+                                   for kind, path in manifest.get('figures', {}).items()}
+            self.add('static/data/manifest.json', json.dumps(manifest, indent=2).encode('utf-8'))
+
+        # Latest processed dataset for the download button
+        dataset = latest_dataset(manifest.get('dataset'))
+        if dataset is not None:
+            self.add(f'data/{dataset.name}', dataset.read_bytes())
+            html = re.sub(r'href="\.\./data/processed/[^"]+\.csv"', f'href="data/{dataset.name}"', html)
+
+        for doc in sorted(DOCUMENTATION_DIR.glob('*.md')):
+            self.add(f'documentation/{doc.name}', doc.read_bytes(), compress=False)
+
+        # Links that point outside web_dashboard/ locally
+        html = html.replace('href="../docs/', 'href="documentation/')
+        html = html.replace('href="../README.md"', f'href="{REPOSITORY_URL}" target="_blank"')
+        for source, published in renames.items():
+            html = html.replace(f'"{source}"', f'"{published}"')
+        self.add('index.html', html.encode('utf-8'))
+
+        # Serve the site as-is on GitHub Pages
+        self.add('.nojekyll', b'', compress=False)
+        return self.files
+
+    def _load_previous(self) -> Dict[str, str]:
+        """Path -> sha256 of the files written by the previous publish"""
+        path = self.output_dir / PUBLISH_MANIFEST
+        if not path.exists():
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+
+    def _stale_files(self, previous: Dict[str, str]) -> List[str]:
+        """Files from a previous publish (or leftovers in managed dirs) no longer produced"""
+        candidates = set(previous)
+        for directory in MANAGED_DIRS:
+            root = self.output_dir / directory
+            if root.exists():
+                candidates.update(p.relative_to(self.output_dir).as_posix()
+                                  for p in root.rglob('*') if p.is_file())
+        return sorted(path for path in candidates if path not in self.files)
+
+    def publish(self, force: bool = False, dry_run: bool = False) -> Dict[str, List[str]]:
+        """
+        Sync the built site into output_dir
+        A file is written only when its content hash differs from the last publish
+        (or it is missing on disk); files no longer produced are removed.
+        """
+        if not self.files:
+            self.build()
+        previous = {} if force else self._load_previous()
+        hashes = {path: hashlib.sha256(data).hexdigest() for path, data in self.files.items()}
+
+        changes = {'written': [], 'unchanged': [], 'removed': []}
+        for path, data in sorted(self.files.items()):
+            target = self.output_dir / path
+            if previous.get(path) == hashes[path] and target.exists() and target.stat().st_size == len(data):
+                changes['unchanged'].append(path)
+                continue
+            changes['written'].append(path)
+            if not dry_run:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+
+        for path in self._stale_files(previous):
+            changes['removed'].append(path)
+            if not dry_run:
+                (self.output_dir / path).unlink(missing_ok=True)
+
+        if not dry_run:
+            for directory in MANAGED_DIRS:
+                self._remove_empty_dirs(self.output_dir / directory)
+            with open(self.output_dir / PUBLISH_MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump({'files': hashes}, f, indent=2, sort_keys=True)
+
+        return changes
+
+    @staticmethod
+    def _remove_empty_dirs(root: Path):
+        """Remove directories left empty after pruning"""
+        if not root.exists():
+            return
+        for directory in sorted((p for p in root.rglob('*') if p.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish the dashboard to docs/ for GitHub Pages')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT_DIR), help='Output directory (default: docs/)')
+    parser.add_argument('--force', action='store_true', help='Rewrite every file regardless of hashes')
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without writing')
+    parser.add_argument('--no-minify', action='store_true', help='Publish CSS/JS unminified')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(" Urban Heat Island Dashboard - Static Site Publisher")
+    print("=" * 80)
+
+    publisher = SitePublisher(Path(args.output), minify=not args.no_minify)
+    files = publisher.build()
+    changes = publisher.publish(force=args.force, dry_run=args.dry_run)
+
+    print(f"\nOutput directory: {publisher.output_dir}")
+    print(f"Site files: {len(files)} ({sum(len(d) for d in files.values()) / 1024:.1f} KB)")
+    for label in ['written', 'removed']:
+        paths = changes[label]
+        print(f"\n{'Would be ' if args.dry_run else ''}{label.capitalize()}: {len(paths)}")
+        for path in paths:
+            print(f"  • {path}")
+    print(f"\nUnchanged: {len(changes['unchanged'])}")
+    print("\n" + "=" * 80)
+    return changes
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() is not None else 1)
@@ -2,10 +2,13 @@
 """
 Simple HTTP Server for Urban Heat Island Dashboard
 Run this script to view the dashboard in your web browser
+Also serves XYZ map tiles of the UHI surfaces at /tiles/<layer>/<z>/<x>/<y>.png
 """
 
 import http.server
-import socketserver
+import argparse
+import json
+import re
 import webbrowser
 import os
 import sys
@@ -15,8 +18,16 @@ from pathlib import Path
 PORT = 8000
 HOST = 'localhost'
 
+TILE_ROUTE = re.compile(r'^/tiles/(\w+)/(\d+)/(\d+)/(\d+)\.png$')
+
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Custom handler to serve files correctly"""
+
+    # Keep-alive lets browsers reuse connections for the page's assets and tiles
+    protocol_version = 'HTTP/1.1'
+
+    # TileService shared by all request threads (None when tiles are disabled)
+    tiles = None
     
     def end_headers(self):
         # Enable CORS for local development
@@ -29,9 +40,89 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Serve index.html for root path
         if self.path == '/':
             self.path = '/index.html'
+        if self.path.split('?')[0].startswith('/tiles/'):
+            return self.send_tile(self.path.split('?')[0])
         return super().do_GET()
 
+    def send_tile(self, path):
+        """Serve tile metadata or a PNG tile from the tile service"""
+        if self.tiles is None:
+            return self.send_error(404, 'Map tiles are disabled')
+        if path == '/tiles/layers.json':
+            return self.send_bytes(json.dumps(self.tiles.layers()).encode('utf-8'), 'application/json',
+                                   'no-cache')
+
+        match = TILE_ROUTE.match(path)
+        if not match:
+            return self.send_error(404, 'Unknown tile path')
+        layer, z, x, y = match.group(1), *map(int, match.groups()[1:])
+        try:
+            self.tiles.validate(layer, z, x, y)
+        except (KeyError, ValueError) as e:
+            return self.send_error(404, f'No such tile: {e}')
+
+        # Tiles are immutable per dataset version, so clients may revalidate cheaply
+        etag = f'"{self.tiles.version}-{layer}-{z}-{x}-{y}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            return self.end_headers()
+        try:
+            data = self.tiles.get(layer, z, x, y)
+        except (KeyError, ValueError) as e:
+            return self.send_error(404, f'No such tile: {e}')
+        except Exception as e:
+            print(f"Error rendering tile {layer}/{z}/{x}/{y}: {e}")
+            return self.send_error(500, 'Tile rendering failed')
+        self.send_bytes(data, 'image/png', 'public, max-age=3600', etag)
+
+    def send_bytes(self, data, content_type, cache_control, etag=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', cache_control)
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Tile requests arrive by the dozen while panning; keep the console readable
+        if not self.path.startswith('/tiles/'):
+            super().log_message(format, *args)
+
+
+class DashboardServer(http.server.ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for many concurrent browsers"""
+
+    # socketserver's default of 5 drops connections once a few browsers open six each
+    request_queue_size = 128
+
+
+def start_tiles(source=None, workers=None):
+    """Create the tile service, or return None when its dependencies are missing"""
+    try:
+        from tiles import TileService
+    except ImportError as e:
+        print(f"Map tiles disabled ({e}); install numpy, pandas and scipy to enable them")
+        return None
+    try:
+        return TileService(source, workers=workers)
+    except FileNotFoundError as e:
+        print(f"Map tiles disabled: {e}")
+        return None
+
 def main():
+    parser = argparse.ArgumentParser(description='Serve the UHI dashboard and its map tiles')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--no-browser', action='store_true', help='Do not open a browser')
+    parser.add_argument('--no-tiles', action='store_true', help='Serve the static dashboard only')
+    parser.add_argument('--tile-source', help='City dataset CSV or gridded .npz (default: latest dataset)')
+    parser.add_argument('--tile-workers', type=int, default=None,
+                        help='Tile render processes (default: all cores, 0 renders in the request thread)')
+    args = parser.parse_args()
+
     # Change to the web_dashboard directory
     dashboard_dir = Path(__file__).parent
     os.chdir(dashboard_dir)
@@ -39,17 +130,24 @@ def main():
     print("=" * 80)
     print(" Urban Heat Island Dashboard - Web Server")
     print("=" * 80)
-    print(f"\nStarting server on http://{HOST}:{PORT}")
+    print(f"\nStarting server on http://{args.host}:{args.port}")
     print(f"Dashboard directory: {dashboard_dir}")
+
+    tiles = None if args.no_tiles else start_tiles(args.tile_source, args.tile_workers)
+    if tiles is not None:
+        print(f"Map tiles: {tiles.source} (version {tiles.version}), cache in {tiles.cache_dir}")
+    CustomHTTPRequestHandler.tiles = tiles
+
     print("\nPress Ctrl+C to stop the server")
     print("=" * 80 + "\n")
     
-    # Create server
-    with socketserver.TCPServer((HOST, PORT), CustomHTTPRequestHandler) as httpd:
-        # Open browser automatically
-        url = f"http://{HOST}:{PORT}"
-        print(f"Opening browser at {url}...")
-        webbrowser.open(url)
+    # Create server (one thread per connection, so map panning does not queue behind slow tiles)
+    with DashboardServer((args.host, args.port), CustomHTTPRequestHandler) as httpd:
+        url = f"http://{args.host}:{args.port}"
+        if not args.no_browser:
+            # Open browser automatically
+            print(f"Opening browser at {url}...")
+            webbrowser.open(url)
         
         try:
             print(f"\n✓ Server running at {url}")
@@ -60,6 +158,8 @@ def main():
             print("\n\n" + "=" * 80)
             print("Server stopped by user")
             print("=" * 80)
+            if tiles is not None:
+                tiles.close()
             sys.exit(0)
 
 if __name__ == "__main__":
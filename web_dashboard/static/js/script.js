@@ -44,18 +44,254 @@ document.querySelectorAll('.overview-card, .viz-card, .insight-card, .recommenda
     observer.observe(card);
 });
 
+// Built-in chart data, used when the data bundle cannot be fetched
+// (for example when index.html is opened directly from disk)
+const DEFAULT_DASHBOARD_DATA = {
+    uhi_distribution: {
+        labels: ['0-1°C', '1-2°C', '2-3°C', '3-4°C', '>4°C'],
+        counts: [5, 10, 23, 12, 0]
+    },
+    regional: {
+        labels: ['North (>28°N)', 'North-Central (23-28°N)', 'Central (15-23°N)', 'South (<15°N)'],
+        avg_uhi: [2.87, 2.29, 2.44, 1.49]
+    },
+    land_cover: {
+        labels: ['Industrial', 'Urban', 'Mixed Urban', 'Green Space'],
+        avg_uhi: [3.31, 2.98, 2.12, 0.91],
+        avg_ndvi: [0.09, 0.09, 0.10, 0.22]
+    },
+    top_factors: {
+        labels: ['Impervious Surfaces', 'Building Density', 'NDVI (Vegetation)', 'Albedo', 'Urban Greenness', 'Wind Speed'],
+        correlations: [0.742, 0.704, -0.704, -0.699, -0.657, -0.543]
+    }
+};
+
+// Point figure images at the files listed in the manifest
+function applyFigureSources(figures) {
+    document.querySelectorAll('img[data-figure]').forEach(img => {
+        const src = figures[img.dataset.figure];
+        if (src) {
+            img.src = src;
+        }
+    });
+}
+
+// Number formats for data-format on [data-summary] elements
+const SUMMARY_FORMATS = {
+    int: value => String(Math.round(value)),
+    millions: value => Math.round(value / 1e6) + 'M',
+    percent: value => Number(value.toFixed(1)) + '%',
+    celsius: value => value.toFixed(2) + '°C',
+    celsius1: value => value.toFixed(1) + '°C',
+    ratio: value => value.toFixed(1) + '×'
+};
+
+function formatSummary(value, format) {
+    if (typeof value !== 'number') {
+        return String(value);
+    }
+    return (SUMMARY_FORMATS[format] || SUMMARY_FORMATS.int)(value);
+}
+
+// Small helper for the ranking and factor lists
+function createElement(tag, className, text) {
+    const element = document.createElement(tag);
+    if (className) {
+        element.className = className;
+    }
+    if (text !== undefined) {
+        element.textContent = text;
+    }
+    return element;
+}
+
+function crisisCity(entry, rank) {
+    const item = createElement('div', 'crisis-city');
+    item.appendChild(createElement('span', 'rank', '#' + rank));
+    const info = createElement('div', 'city-info');
+    info.appendChild(createElement('strong', '', entry.city));
+    const impervious = entry.impervious == null ? '' : ` - ${Math.round(entry.impervious)}% impervious`;
+    info.appendChild(createElement('span', '', entry.value.toFixed(2) + '°C' + impervious));
+    item.appendChild(info);
+    return item;
+}
+
+function successCity(entry) {
+    const item = createElement('div', 'success-city');
+    const badge = createElement('div', 'city-badge');
+    badge.appendChild(createElement('i', 'fas fa-medal'));
+    badge.appendChild(createElement('span', '', entry.city));
+    const metrics = createElement('div', 'city-metrics');
+    metrics.appendChild(createElement('span', 'metric', entry.value.toFixed(2) + '°C'));
+    const details = [];
+    if (entry.greenness != null) {
+        details.push(`${Math.round(entry.greenness)}% greenness`);
+    }
+    if (entry.ndvi != null) {
+        details.push(`NDVI: ${entry.ndvi.toFixed(2)}`);
+    }
+    metrics.appendChild(createElement('span', 'detail', details.join(', ')));
+    item.appendChild(badge);
+    item.appendChild(metrics);
+    return item;
+}
+
+function contributor(label, correlation) {
+    const item = createElement('div', 'contributor-item');
+    const bar = createElement('div', correlation < 0 ? 'contributor-bar green' : 'contributor-bar');
+    bar.style.width = (Math.abs(correlation) * 100).toFixed(1) + '%';
+    bar.appendChild(createElement('span', 'contributor-label', label));
+    bar.appendChild(createElement('span', 'contributor-value', (correlation > 0 ? '+' : '') + correlation.toFixed(3)));
+    item.appendChild(bar);
+    return item;
+}
+
+// Fill the page's headline numbers, rankings and regional cards from the data bundle.
+// Elements keep their built-in text when the bundle lacks a value.
+function applyDashboardText(data) {
+    const summary = data.summary || {};
+    document.querySelectorAll('[data-summary]').forEach(element => {
+        const value = summary[element.dataset.summary];
+        if (value != null) {
+            element.textContent = formatSummary(value, element.dataset.format);
+        }
+    });
+
+    const rankings = data.rankings || {};
+    document.querySelectorAll('[data-ranking]').forEach(container => {
+        const entries = (rankings[container.dataset.ranking] || []).slice(0, Number(container.dataset.count) || 3);
+        if (!entries.length) {
+            return;
+        }
+        const render = container.classList.contains('crisis-cities') ? crisisCity : successCity;
+        container.replaceChildren(...entries.map((entry, i) => render(entry, i + 1)));
+    });
+
+    const factors = data.top_factors;
+    document.querySelectorAll('[data-factors]').forEach(container => {
+        if (!factors || !factors.labels.length) {
+            return;
+        }
+        const count = Number(container.dataset.factors) || 3;
+        container.replaceChildren(...factors.labels.slice(0, count)
+            .map((label, i) => contributor(label, factors.correlations[i])));
+    });
+
+    const regional = data.regional;
+    document.querySelectorAll('[data-region]').forEach(card => {
+        const index = regional ? regional.labels.indexOf(card.dataset.region) : -1;
+        if (index < 0) {
+            return;
+        }
+        const avg = regional.avg_uhi[index];
+        if (avg != null) {
+            card.querySelector('.avg-uhi').textContent = `Avg UHI: ${avg.toFixed(2)}°C`;
+        }
+        if (regional.cities) {
+            const count = regional.cities[index];
+            card.querySelector('.cities-count').textContent = `${count} ${count === 1 ? 'city' : 'cities'}`;
+        }
+    });
+}
+
+// Load the fingerprinted chart data bundle via the (uncached) manifest
+async function loadDashboardData() {
+    try {
+        const manifestResponse = await fetch('static/data/manifest.json', { cache: 'no-cache' });
+        if (!manifestResponse.ok) {
+            throw new Error('manifest ' + manifestResponse.status);
+        }
+        const manifest = await manifestResponse.json();
+        applyFigureSources(manifest.figures || {});
+
+        const dataResponse = await fetch(manifest.data);
+        if (!dataResponse.ok) {
+            throw new Error('data bundle ' + dataResponse.status);
+        }
+        return await dataResponse.json();
+    } catch (error) {
+        console.warn('Using built-in chart data:', error.message);
+        return DEFAULT_DASHBOARD_DATA;
+    }
+}
+
 // Chart.js Interactive Visualizations
-document.addEventListener('DOMContentLoaded', function() {
+document.addEventListener('DOMContentLoaded', async function() {
+    initUhiMap();
+    const data = await loadDashboardData();
+    applyDashboardText(data);
+    renderCharts(data);
+    // Start the stat counters only once the final numbers are in place
+    document.querySelectorAll('.stat-insight').forEach(box => statsObserver.observe(box));
+});
+
+// UHI surface map from the tile endpoint of server.py (hidden on static hosting)
+async function initUhiMap() {
+    const section = document.getElementById('uhiMapSection');
+    if (!section || typeof L === 'undefined') {
+        return;
+    }
+    let meta;
+    try {
+        const response = await fetch('tiles/layers.json', { cache: 'no-cache' });
+        if (!response.ok) {
+            return;
+        }
+        meta = await response.json();
+    } catch (error) {
+        return;
+    }
+    section.hidden = false;
+
+    const map = L.map('uhiMap', { minZoom: 4, maxZoom: meta.max_zoom }).setView([22.5, 79.0], 5);
+    L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        attribution: '&copy; OpenStreetMap contributors',
+        maxZoom: 19
+    }).addTo(map);
+
+    const controls = document.getElementById('uhiMapLayers');
+    const legend = document.getElementById('uhiMapLegend');
+    let overlay = null;
+
+    function showLayer(name) {
+        const layer = meta.layers[name];
+        if (overlay) {
+            map.removeLayer(overlay);
+        }
+        // The dataset version keeps browser caches from mixing tiles of different datasets
+        overlay = L.tileLayer(`tiles/${name}/{z}/{x}/{y}.png?v=${meta.version}`, {
+            maxZoom: meta.max_zoom
+        }).addTo(map);
+        controls.querySelectorAll('button').forEach(button => {
+            button.classList.toggle('active', button.dataset.layer === name);
+        });
+        legend.innerHTML = `
+            <strong>${layer.label}</strong>
+            <div class="map-legend-bar" style="background: linear-gradient(to right, ${layer.colors.join(', ')})"></div>
+            <div class="map-legend-range"><span>${layer.range[0]}</span><span>${layer.range[1]}</span></div>`;
+    }
+
+    Object.entries(meta.layers).forEach(([name, layer]) => {
+        const button = document.createElement('button');
+        button.dataset.layer = name;
+        button.textContent = layer.label;
+        button.addEventListener('click', () => showLayer(name));
+        controls.appendChild(button);
+    });
+    showLayer(Object.keys(meta.layers)[0]);
+}
+
+function renderCharts(data) {
     // Chart 1: UHI Intensity Distribution
     const uhiDistCtx = document.getElementById('uhiDistribution');
     if (uhiDistCtx) {
         new Chart(uhiDistCtx, {
             type: 'bar',
             data: {
-                labels: ['0-1°C', '1-2°C', '2-3°C', '3-4°C', '>4°C'],
+                labels: data.uhi_distribution.labels,
                 datasets: [{
                     label: 'Number of Cities',
-                    data: [5, 19, 16, 10, 0],
+                    data: data.uhi_distribution.counts,
                     backgroundColor: [
                         'rgba(16, 185, 129, 0.8)',
                         'rgba(59, 130, 246, 0.8)',
@@ -111,10 +347,10 @@ document.addEventListener('DOMContentLoaded', function() {
         new Chart(regionalCtx, {
             type: 'doughnut',
             data: {
-                labels: ['North (>28°N)', 'North-Central (23-28°N)', 'Central (15-23°N)', 'South (<15°N)'],
+                labels: data.regional.labels,
                 datasets: [{
                     label: 'Average UHI Intensity',
-                    data: [2.87, 2.29, 2.44, 1.49],
+                    data: data.regional.avg_uhi,
                     backgroundColor: [
                         'rgba(239, 68, 68, 0.8)',
                         'rgba(245, 158, 11, 0.8)',
@@ -160,17 +396,17 @@ document.addEventListener('DOMContentLoaded', function() {
         new Chart(landCoverCtx, {
             type: 'bar',
             data: {
-                labels: ['Industrial', 'Urban', 'Mixed Urban', 'Green Space'],
+                labels: data.land_cover.labels,
                 datasets: [{
                     label: 'Avg UHI Intensity (°C)',
-                    data: [3.31, 2.98, 2.12, 0.91],
+                    data: data.land_cover.avg_uhi,
                     backgroundColor: 'rgba(239, 68, 68, 0.8)',
                     borderColor: 'rgb(239, 68, 68)',
                     borderWidth: 2,
                     yAxisID: 'y'
                 }, {
                     label: 'Avg NDVI',
-                    data: [0.09, 0.09, 0.10, 0.22],
+                    data: data.land_cover.avg_ndvi,
                     backgroundColor: 'rgba(16, 185, 129, 0.8)',
                     borderColor: 'rgb(16, 185, 129)',
                     borderWidth: 2,
@@ -221,19 +457,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const topFactorsCtx = document.getElementById('topFactors');
     if (topFactorsCtx) {
         new Chart(topFactorsCtx, {
-            type: 'horizontalBar',
+            type: 'bar',
             data: {
-                labels: [
-                    'Impervious Surfaces',
-                    'Building Density',
-                    'NDVI (Vegetation)',
-                    'Albedo',
-                    'Urban Greenness',
-                    'Wind Speed'
-                ],
+                labels: data.top_factors.labels,
                 datasets: [{
                     label: 'Correlation Coefficient',
-                    data: [0.742, 0.704, -0.704, -0.699, -0.657, -0.543],
+                    data: data.top_factors.correlations,
                     backgroundColor: function(context) {
                         const value = context.parsed.x;
                         return value > 0 ? 'rgba(239, 68, 68, 0.8)' : 'rgba(16, 185, 129, 0.8)';
@@ -272,20 +501,24 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     }
-});
+}
 
-// Counter Animation for Stats
+// Counter Animation for Stats (keeps the decimals and unit of the final text, e.g. "3.6×")
 function animateCounter(element, target, duration = 2000) {
+    const text = element.textContent.trim();
+    const number = text.match(/^-?\d+(?:\.(\d+))?/);
+    const decimals = number && number[1] ? number[1].length : 0;
+    const suffix = number ? text.slice(number[0].length) : '';
     let start = 0;
     const increment = target / (duration / 16);
     
     const timer = setInterval(() => {
         start += increment;
         if (start >= target) {
-            element.textContent = Math.round(target);
+            element.textContent = text;
             clearInterval(timer);
         } else {
-            element.textContent = Math.round(start);
+            element.textContent = start.toFixed(decimals) + suffix;
         }
     }, 16);
 }
@@ -306,8 +539,6 @@ const statsObserver = new IntersectionObserver((entries) => {
     });
 }, { threshold: 0.5 });
 
-const statBoxes = document.querySelectorAll('.stat-insight');
-statBoxes.forEach(box => statsObserver.observe(box));
 
 // Highlight active section in navigation
 window.addEventListener('scroll', () => {
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+XYZ Map Tiles for UHI Surfaces
+Renders 256px PNG tiles (Web Mercator) of UHI intensity, NDVI and impervious
+surface, either interpolated from city values (inverse-distance weighting) or
+sampled from a gridded .npz array. Tiles are rendered in a process pool and
+cached in an LRU memory cache and on disk, keyed by layer, dataset version and z/x/y.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+import argparse
+import multiprocessing
+import struct
+import threading
+import time
+import zlib
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Shared path configuration lives in src/
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src' / 'data_collection'))
+import paths
+from imputation import CitySpatialIndex, EARTH_RADIUS_KM
+from publish import content_hash
+
+TILE_SIZE = 256
+MAX_ZOOM = 14
+
+# Layer name -> dataset column (or .npz key), colour range and colour ramp stops
+LAYERS = {
+    'uhi': {
+        'column': 'UHI Intensity (°C)',
+        'label': 'UHI Intensity (°C)',
+        'range': (0.5, 5.0),
+        'colors': ['#313695', '#74add1', '#ffffbf', '#f46d43', '#a50026'],
+    },
+    'ndvi': {
+        'column': 'NDVI',
+        'label': 'NDVI',
+        'range': (0.0, 0.4),
+        'colors': ['#8c510a', '#dfc27d', '#f6e8c3', '#80cdc1', '#01665e'],
+    },
+    'impervious': {
+        'column': 'Impervious Surface (%)',
+        'label': 'Impervious Surface (%)',
+        'range': (30.0, 90.0),
+        'colors': ['#f7f7f7', '#cccccc', '#969696', '#636363', '#252525'],
+    },
+}
+
+# Surface opacity, and the distance band (km) over which city surfaces fade out
+TILE_OPACITY = 200
+FADE_KM = (150.0, 400.0)
+
+
+def _encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (h, w, 4) uint8 array as PNG with the standard library only"""
+    height, width = rgba.shape[:2]
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, -1)], axis=1)
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+EMPTY_TILE = _encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+def colour_table(colors) -> np.ndarray:
+    """256-entry RGB lookup table interpolated between hex colour stops"""
+    stops = np.array([[int(c[i:i + 2], 16) for i in (1, 3, 5)] for c in colors], dtype=float)
+    positions = np.linspace(0, 1, len(stops))
+    grid = np.linspace(0, 1, 256)
+    return np.stack([np.interp(grid, positions, stops[:, channel]) for channel in range(3)], axis=1).astype(np.uint8)
+
+
+COLOUR_TABLES = {name: colour_table(layer['colors']) for name, layer in LAYERS.items()}
+
+
+def tile_lat_lon(z: int, x: int, y: int, size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude (rows) and longitude (columns) of the pixel centres of tile z/x/y"""
+    n = 2 ** z
+    offsets = (np.arange(size) + 0.5) / size
+    lon = (x + offsets) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lat, lon
+
+
+def tile_edge_lat_lon(z: int, x: int, y: int, step: int, size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude of a lattice every `step` pixels, including both tile edges"""
+    n = 2 ** z
+    offsets = np.arange(0, size + 1, step) / size
+    lon = (x + offsets) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lat, lon
+
+
+def _upsample(lattice: np.ndarray, step: int) -> np.ndarray:
+    """Bilinear interpolation of a lattice (every `step` pixels) to pixel centres"""
+    position = (np.arange((lattice.shape[0] - 1) * step) + 0.5) / step
+    lower = position.astype(int)
+    weight = position - lower
+    rows = lattice[lower] * (1 - weight)[:, None] + lattice[lower + 1] * weight[:, None]
+    return rows[:, lower] * (1 - weight) + rows[:, lower + 1] * weight
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of tile z/x/y in degrees"""
+    n = 2 ** z
+    west, east = x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+    north = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n)))))
+    south = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n)))))
+    return south, west, north, east
+
+
+def _haversine_km(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(min(a, 1.0))))
+
+
+class CitySurface:
+    """
+    Inverse-distance weighted surface over city values
+    Opacity fades out between FADE_KM[0] and FADE_KM[1] from the nearest city
+    """
+
+    # The surface is smooth at pixel scale: sample every 4 pixels and upsample
+    render_step = 4
+
+    def __init__(self, df: pd.DataFrame, k: int = 8, power: float = 2.0, fade_km: Tuple[float, float] = FADE_KM):
+        self.index = CitySpatialIndex(df['Latitude'].to_numpy(dtype=float), df['Longitude'].to_numpy(dtype=float))
+        self.values = {name: df[layer['column']].to_numpy(dtype=float)
+                       for name, layer in LAYERS.items() if layer['column'] in df.columns}
+        self.k = k
+        self.power = power
+        self.fade_km = fade_km
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'CitySurface':
+        columns = ['Latitude', 'Longitude'] + [layer['column'] for layer in LAYERS.values()]
+        return cls(pd.read_csv(path, usecols=lambda c: c in columns))
+
+    def covers(self, z: int, x: int, y: int) -> bool:
+        """Cheap test whether any pixel of the tile can be visible"""
+        south, west, north, east = tile_bounds(z, x, y)
+        centre_lat, centre_lon = (south + north) / 2, (west + east) / 2
+        half_diagonal = _haversine_km(centre_lat, centre_lon, north, east)
+        nearest, _ = self.index.query([centre_lat], [centre_lon], k=1)
+        return nearest[0, 0] - half_diagonal < self.fade_km[1]
+
+    def sample(self, layer: str, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (values, alpha in [0, 1]) at the given points"""
+        distances, indices = self.index.query(lat, lon, k=self.k)
+        values = self.values[layer]
+        valid = ~np.isnan(values[indices])
+        with np.errstate(divide='ignore'):
+            weights = np.where(valid, 1.0 / np.maximum(distances, 1e-6) ** self.power, 0.0)
+        total = weights.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            result = (weights * np.nan_to_num(values[indices])).sum(axis=1) / total
+        near, far = self.fade_km
+        alpha = np.clip((far - distances[:, 0]) / (far - near), 0.0, 1.0)
+        return result, np.where(total > 0, alpha, 0.0)
+
+
+class GridSurface:
+    """
+    Regular latitude/longitude grid loaded from an .npz file with 1-D 'lat' and
+    'lon' arrays (ascending) and one (lat, lon) array per layer name; NaN = no data
+    """
+
+    render_step = 1
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, values: Dict[str, np.ndarray]):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.values = {name: np.asarray(grid, dtype=float) for name, grid in values.items() if name in LAYERS}
+
+    @classmethod
+    def load(cls, path: str) -> 'GridSurface':
+        with np.load(path) as data:
+            return cls(data['lat'], data['lon'], {name: data[name] for name in data.files if name in LAYERS})
+
+    def covers(self, z: int, x: int, y: int) -> bool:
+        south, west, north, east = tile_bounds(z, x, y)
+        return (south <= self.lat[-1] and north >= self.lat[0]
+                and west <= self.lon[-1] and east >= self.lon[0])
+
+    def sample(self, layer: str, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bilinear interpolation; points outside the grid are transparent"""
+        grid = self.values[layer]
+        fi = np.interp(lat, self.lat, np.arange(len(self.lat)), left=np.nan, right=np.nan)
+        fj = np.interp(lon, self.lon, np.arange(len(self.lon)), left=np.nan, right=np.nan)
+        inside = ~(np.isnan(fi) | np.isnan(fj))
+        fi, fj = np.nan_to_num(fi), np.nan_to_num(fj)
+        i0 = np.minimum(fi.astype(int), len(self.lat) - 2)
+        j0 = np.minimum(fj.astype(int), len(self.lon) - 2)
+        di, dj = fi - i0, fj - j0
+        result = (grid[i0, j0] * (1 - di) * (1 - dj) + grid[i0 + 1, j0] * di * (1 - dj)
+                  + grid[i0, j0 + 1] * (1 - di) * dj + grid[i0 + 1, j0 + 1] * di * dj)
+        alpha = (inside & ~np.isnan(result)).astype(float)
+        return result, alpha
+
+
+def load_surface(source: str):
+    """City CSV -> CitySurface, .npz grid -> GridSurface"""
+    if str(source).endswith('.npz'):
+        return GridSurface.load(source)
+    return CitySurface.from_csv(source)
+
+
+def render_tile(surface, layer: str, z: int, x: int, y: int) -> bytes:
+    """Render one PNG tile of a layer"""
+    if layer not in surface.values or not surface.covers(z, x, y):
+        return EMPTY_TILE
+    step = surface.render_step
+    if step > 1:
+        lat, lon = tile_edge_lat_lon(z, x, y, step)
+    else:
+        lat, lon = tile_lat_lon(z, x, y)
+    grid_lat, grid_lon = np.meshgrid(lat, lon, indexing='ij')
+    values, alpha = surface.sample(layer, grid_lat.ravel(), grid_lon.ravel())
+    if not alpha.any():
+        return EMPTY_TILE
+    if step > 1:
+        shape = (len(lat), len(lon))
+        values = _upsample(np.nan_to_num(values).reshape(shape), step).ravel()
+        alpha = _upsample(alpha.reshape(shape), step).ravel()
+
+    low, high = LAYERS[layer]['range']
+    scaled = np.clip((np.nan_to_num(values, nan=low) - low) / (high - low), 0.0, 1.0)
+    rgba = np.empty((TILE_SIZE * TILE_SIZE, 4), dtype=np.uint8)
+    rgba[:, :3] = COLOUR_TABLES[layer][(scaled * 255).astype(np.uint8)]
+    rgba[:, 3] = (alpha * TILE_OPACITY).astype(np.uint8)
+    return _encode_png(rgba.reshape(TILE_SIZE, TILE_SIZE, 4))
+
+
+# Per-process surface for pool workers (loaded once by the initializer)
+_WORKER_SURFACE = None
+
+
+def _init_worker(source: str):
+    global _WORKER_SURFACE
+    _WORKER_SURFACE = load_surface(source)
+
+
+def _render_in_worker(layer: str, z: int, x: int, y: int) -> bytes:
+    return render_tile(_WORKER_SURFACE, layer, z, x, y)
+
+
+class TileService:
+    """
+    Serves tiles from an LRU memory cache, then the disk cache, then the render pool
+    Concurrent requests for the same missing tile share one render
+    """
+
+    def __init__(self, source: str = None, workers: int = None, memory_tiles: int = 4096,
+                 cache_dir: str = None, max_zoom: int = MAX_ZOOM):
+        self.source = source or paths.latest_dataset()
+        if self.source is None:
+            raise FileNotFoundError("No dataset found! Please run enhanced_collector.py first.")
+        self.version = content_hash(Path(self.source).read_bytes())
+        self.surface = load_surface(self.source)
+        self.cache_dir = Path(cache_dir or paths.TILES_DIR)
+        self.memory_tiles = memory_tiles
+        self.max_zoom = max_zoom
+
+        self.memory = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = {'memory': 0, 'disk': 0, 'rendered': 0, 'empty': 0}
+
+        workers = os.cpu_count() if workers is None else workers
+        # Spawned (not forked) workers do not inherit the server's listening socket
+        self.executor = (ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.source,),
+                                             mp_context=multiprocessing.get_context('spawn'))
+                         if workers > 0 else None)
+
+    def layers(self) -> dict:
+        """Layer metadata for map clients (legend ranges and colours)"""
+        return {
+            'version': self.version,
+            'max_zoom': self.max_zoom,
+            'layers': {name: {'label': layer['label'], 'range': layer['range'], 'colors': layer['colors']}
+                       for name, layer in LAYERS.items() if name in self.surface.values},
+        }
+
+    def _disk_path(self, layer: str, z: int, x: int, y: int) -> Path:
+        return self.cache_dir / layer / self.version / str(z) / str(x) / f'{y}.png'
+
+    def _remember(self, key: tuple, data: bytes):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_tiles:
+                self.memory.popitem(last=False)
+
+    def _count(self, source: str):
+        with self.lock:
+            self.stats[source] += 1
+
+    def validate(self, layer: str, z: int, x: int, y: int):
+        """Raise KeyError/ValueError for an unknown layer or out-of-range coordinates"""
+        if layer not in LAYERS or layer not in self.surface.values:
+            raise KeyError(layer)
+        if not (0 <= z <= self.max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f'tile out of range: {z}/{x}/{y}')
+
+    def get(self, layer: str, z: int, x: int, y: int) -> bytes:
+        """Return PNG bytes for a tile; raises KeyError/ValueError for unknown layers or coordinates"""
+        self.validate(layer, z, x, y)
+
+        key = (layer, z, x, y)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats['memory'] += 1
+                return self.memory[key]
+
+        # Tiles far from any data are served without touching disk or the pool
+        if not self.surface.covers(z, x, y):
+            self._count('empty')
+            return EMPTY_TILE
+
+        path = self._disk_path(layer, z, x, y)
+        if path.exists():
+            data = path.read_bytes()
+            self._remember(key, data)
+            self._count('disk')
+            return data
+
+        with self.lock:
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.pending[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            if self.executor is not None:
+                data = self.executor.submit(_render_in_worker, layer, z, x, y).result()
+            else:
+                data = render_tile(self.surface, layer, z, x, y)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            temp.write_bytes(data)
+            os.replace(temp, path)
+            self._remember(key, data)
+            self._count('rendered')
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    """Pre-render (seed) the tile cache for a zoom range over India"""
+    parser = argparse.ArgumentParser(description='Render UHI map tiles into the disk cache')
+    parser.add_argument('--source', help='City dataset CSV or gridded .npz (default: latest dataset)')
+    parser.add_argument('--layers', nargs='*', default=list(LAYERS), choices=list(LAYERS))
+    parser.add_argument('--min-zoom', type=int, default=4)
+    parser.add_argument('--max-zoom', type=int, default=7)
+    parser.add_argument('--bounds', type=float, nargs=4, default=[6.0, 68.0, 37.5, 98.0],
+                        metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'))
+    parser.add_argument('--workers', type=int, default=None, help='Render processes (default: all cores)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(" Urban Heat Island Dashboard - Tile Cache Seeder")
+    print("=" * 80)
+
+    service = TileService(args.source, workers=args.workers)
+    south, west, north, east = args.bounds
+    started = time.perf_counter()
+    count = 0
+    try:
+        # Requests come from threads, like concurrent map clients; rendering happens in the pool
+        with ThreadPoolExecutor(max_workers=2 * (os.cpu_count() or 1)) as requests:
+            for z in range(args.min_zoom, args.max_zoom + 1):
+                n = 2 ** z
+                x0, x1 = int((west + 180) / 360 * n), int((east + 180) / 360 * n)
+                y0 = int((1 - np.arcsinh(np.tan(np.radians(north))) / np.pi) / 2 * n)
+                y1 = int((1 - np.arcsinh(np.tan(np.radians(south))) / np.pi) / 2 * n)
+                tiles = [(layer, z, x, y) for layer in args.layers
+                         for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+                list(requests.map(lambda tile: service.get(*tile), tiles))
+                count += len(tiles)
+                print(f"  zoom {z:>2}: {count:>7,} tiles  {time.perf_counter() - started:7.1f}s")
+    finally:
+        service.close()
+
+    print(f"\n✓ Source: {service.source} (version {service.version})")
+    print(f"✓ Cache: {service.cache_dir}")
+    print(f"✓ {service.stats['rendered']:,} rendered, {service.stats['disk']:,} already cached, "
+          f"{service.stats['empty']:,} empty")
+    return service.stats
+
+
+if __name__ == "__main__":
+    main()